@@ -1,6 +1,4 @@
 from qsa.cli import main
 
-
 if __name__ == "__main__":
     main()
-
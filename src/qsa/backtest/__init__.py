@@ -1,2 +1 @@
 """Backtest engine and metrics."""
-
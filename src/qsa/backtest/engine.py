@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Sequence
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
 
 from qsa.backtest.costs import estimate_commission, estimate_slippage
 from qsa.backtest.metrics import annualized_sharpe, max_drawdown, total_return
+from qsa.backtest.records import EquityLog, TradeLog
 from qsa.portfolio.risk import clamp_target_position
 from qsa.portfolio.sizing import shares_for_unit_signal
-from qsa.schemas.data import Bar
-from qsa.strategies.base import Strategy
+from qsa.schemas.data import Bar, BarHistory
+from qsa.strategies.base import SIGNAL_POSITIONS, Strategy
 
 
 @dataclass(frozen=True)
@@ -21,8 +26,31 @@ class BacktestSummary:
     final_equity: float
     total_commission: float
     total_slippage: float
-    equity_curve: list[dict[str, float | str]]
-    trades_log: list[dict[str, float | str]]
+    equity_log: EquityLog | None = None
+    trade_log: TradeLog | None = None
+
+    def _require_series(self) -> tuple[EquityLog, TradeLog]:
+        if self.equity_log is None or self.trade_log is None:
+            raise ValueError(
+                "Backtest ran in summary-only mode; no equity or trade series were recorded."
+            )
+        return self.equity_log, self.trade_log
+
+    @cached_property
+    def equity_curve(self) -> list[dict[str, float | str]]:
+        """Per-bar equity rows (ISO time, rounded values), built on first access."""
+        return self._require_series()[0].to_records()
+
+    @cached_property
+    def trades_log(self) -> list[dict[str, float | str]]:
+        """Trade rows (ISO times, rounded values), built on first access."""
+        return self._require_series()[1].to_records()
+
+    def equity_frame(self) -> pd.DataFrame:
+        return self._require_series()[0].to_frame()
+
+    def trades_frame(self) -> pd.DataFrame:
+        return self._require_series()[1].to_frame()
 
 
 def _position_unit(position_shares: float) -> float:
@@ -39,6 +67,113 @@ def _gross_leverage(position_shares: float, price: float, equity: float) -> floa
     return abs(position_shares * price) / equity
 
 
+def _signal_matrix(strategy: Strategy, history: BarHistory) -> np.ndarray | None:
+    """Return the strategy's ``(len(history), 3)`` signal matrix, or None without ``generate_signals``."""
+    generate_signals = getattr(strategy, "generate_signals", None)
+    if not callable(generate_signals):
+        return None
+    signals = np.asarray(generate_signals(history), dtype=np.float64)
+    if signals.shape != (len(history), len(SIGNAL_POSITIONS)):
+        raise ValueError(
+            f"generate_signals returned shape {signals.shape}; "
+            f"expected {(len(history), len(SIGNAL_POSITIONS))}."
+        )
+    return signals
+
+
+def _next_change_rows(signals: np.ndarray) -> np.ndarray:
+    """Return a ``(3, len(signals))`` array: per current unit position, the first row at or
+    after each row where the strategy stops holding, or ``len(signals)`` if it never does.
+    """
+    rows = np.arange(len(signals))
+    next_change = np.empty((len(SIGNAL_POSITIONS), len(signals)), dtype=np.int64)
+    for column, unit in enumerate(SIGNAL_POSITIONS):
+        changes = np.where(signals[:, column] != unit, rows, len(signals))
+        next_change[column] = np.minimum.accumulate(changes[::-1])[::-1]
+    return next_change
+
+
+def _signal_fills(
+    signals: np.ndarray,
+    next_change: np.ndarray,
+    closes: np.ndarray,
+    *,
+    initial_cash: float,
+    target_notional: float,
+    max_abs_position: float,
+    max_gross_leverage: float | None,
+    commission_per_share: float,
+    slippage_rate: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Walk the signal matrix from flat and return every fill it implies.
+
+    Returns ``(bar rows, target positions)``, one entry per fill.
+    Only the rows where the strategy stops holding are visited, so the cost grows with
+    the number of fills, not bars. Entries and flips over ``max_gross_leverage`` (None
+    when leverage is allowed) are blocked as in ``run_engine``; the equity stop is not
+    applied here.
+    """
+    length = len(signals)
+    # Flattened (unit column, row) lookups; .item() avoids NumPy scalar boxing.
+    change_rows = next_change.ravel().item
+    targets_by_unit = np.ascontiguousarray(signals.T).ravel().item
+    price_at = closes.item
+    rows: list[int] = []
+    targets: list[float] = []
+    cash = initial_cash
+    position = 0.0
+    column = 1
+    row = 0
+    while True:
+        row = change_rows(column * length + row)
+        if row >= length - 1:
+            break
+        target_unit = targets_by_unit(column * length + row)
+        price = price_at(row + 1)
+        # Inlined shares_for_unit_signal and clamp_target_position.
+        target = (0.0 if price <= 0 else target_notional / price) * target_unit
+        if target > max_abs_position:
+            target = max_abs_position
+        elif target < -max_abs_position:
+            target = -max_abs_position
+        if (
+            max_gross_leverage is not None
+            and target_unit != 0.0
+            and _gross_leverage(target, price, cash + position * price) > max_gross_leverage
+        ):
+            target = position
+        if target != position:
+            delta = target - position
+            notional = delta * price
+            cash -= notional + abs(delta) * commission_per_share + abs(notional) * slippage_rate
+            rows.append(row + 1)
+            targets.append(target)
+            position = target
+            column = 2 if position > 0 else 0 if position < 0 else 1
+        row += 1
+    return np.asarray(rows, dtype=np.int64), np.asarray(targets, dtype=np.float64)
+
+
+def _gross_leverages(positions: np.ndarray, prices: np.ndarray, equity: np.ndarray) -> np.ndarray:
+    """Vectorized ``_gross_leverage``."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leverage = np.abs(positions * prices) / equity
+    return np.where(equity <= 0, np.where(positions == 0, 0.0, np.inf), leverage)
+
+
+def _trade_actions(
+    strategy: Strategy, history: BarHistory, rows: np.ndarray, units: np.ndarray
+) -> list[str]:
+    """Action labels ``generate_signal`` gives for fills at ``rows`` from ``units`` positions."""
+    signal_actions = getattr(strategy, "signal_actions", None)
+    if callable(signal_actions):
+        return list(signal_actions(history, rows - 1, units))
+    return [
+        strategy.generate_signal(history.expanding(row), current_position=unit).action
+        for row, unit in zip(rows.tolist(), units.tolist())
+    ]
+
+
 def run_engine(
     bars: Sequence[Bar],
     *,
@@ -51,12 +186,23 @@ def run_engine(
     stop_on_nonpositive_equity: bool = True,
     commission_per_share: float = 0.005,
     slippage_bps: float = 5.0,
+    record_series: bool = True,
 ) -> BacktestSummary:
     """Run the backtest engine.
 
     Args:
-        bars: Sequence of Bar objects representing the historical price data.
-        strategy: Strategy instance to use for generating signals.
+        bars: Sequence of Bar objects representing the historical price data. Lists are
+            converted once to a columnar BarHistory; strategies receive an expanding
+            read-only view of it rather than a copied prefix.
+        strategy: Strategy instance to use for generating signals. If it also implements
+            ``generate_signals`` (see ``VectorizedStrategy``), the signal matrix is computed
+            once, the fills are found by jumping between the rows where the strategy stops
+            holding, and cash, costs, equity and the trade log are computed with array ops.
+            ``generate_signal`` (or ``signal_actions``) is only called for the action labels
+            of recorded trades. After an equity stop the per-bar loop takes over. Results
+            are identical to the per-bar loop. Otherwise, if it implements
+            ``on_bar`` (see ``IncrementalStrategy``), it is reset and fed each completed bar
+            once, in order.
         initial_cash: Initial cash balance.
         target_notional: Target notional value for each trade.
         max_abs_position: Maximum absolute position size in shares.
@@ -65,88 +211,209 @@ def run_engine(
         stop_on_nonpositive_equity: Whether to stop trading when equity becomes non-positive.
         commission_per_share: Per-share commission fee.
         slippage_bps: Slippage in basis points (bps).
+        record_series: Record per-bar equity/position and per-trade columns. Pass False
+            for a summary-only run (e.g. sweeps) that keeps just the scalar metrics.
 
     Returns:
         BacktestSummary: Summary of the backtest results.
     """
     if not bars:
         return BacktestSummary(
-            0,
-            0,
-            0.0,
-            0.0,
-            0.0,
-            initial_cash,
-            0.0,
-            0.0,
-            [],
-            [],
+            bars=0,
+            trades=0,
+            total_return=0.0,
+            max_drawdown=0.0,
+            sharpe=0.0,
+            final_equity=initial_cash,
+            total_commission=0.0,
+            total_slippage=0.0,
+            equity_log=EquityLog(np.empty(0, np.int64), np.empty(0), np.empty(0))
+            if record_series
+            else None,
+            trade_log=TradeLog() if record_series else None,
         )
 
+    history = BarHistory.from_bars(bars)
+    closes = history.closes
+    visible = history.expanding(1)
+    signals = _signal_matrix(strategy, history)
+    next_change = _next_change_rows(signals) if signals is not None else None
+    incremental = signals is None and callable(getattr(strategy, "on_bar", None))
+    if incremental:
+        strategy.reset()  # type: ignore[attr-defined]
     cash = initial_cash
     position = 0.0
     trades = 0
-    equity_curve: list[float] = []
-    returns: list[float] = []
+    equity_values = np.empty(len(history) - 1, dtype=np.float64)
+    position_values = np.empty(len(history) - 1 if record_series else 0, dtype=np.float64)
+    times = history.times
     total_commission = 0.0
     total_slippage = 0.0
-    equity_points: list[dict[str, float | str]] = []
-    trade_rows: list[dict[str, float | str]] = []
+    trade_log = TradeLog(tz=history.tz) if record_series else None
     trading_stopped = False
 
     # Hard anti-lookahead: signal uses history through t-1 and fills at t.
-    for idx in range(1, len(bars)):
-        bar = bars[idx]
-        signal_bar = bars[idx - 1]
-        equity_before = cash + (position * bar.close)
+    idx = 1
+    if signals is not None:
+        # Book every fill the signals imply in NumPy, up to the first bar where an
+        # equity-dependent rule (equity stop, leverage cap) would act; the loop below
+        # takes over from there.
+        slippage_rate = slippage_bps / 10_000.0
+        rows, targets = _signal_fills(
+            signals,
+            next_change,  # type: ignore[arg-type]
+            closes,
+            initial_cash=initial_cash,
+            target_notional=target_notional,
+            max_abs_position=max_abs_position,
+            max_gross_leverage=None if allow_leverage else max_gross_leverage,
+            commission_per_share=commission_per_share,
+            slippage_rate=slippage_rate,
+        )
+        prices = closes[rows]
+        positions_before = np.concatenate(([0.0], targets[:-1]))
+        deltas = targets - positions_before
+        notionals = deltas * prices
+        fees = np.abs(deltas) * commission_per_share
+        slips = np.abs(notionals) * slippage_rate
+        cash_states = np.subtract.accumulate(
+            np.concatenate(([initial_cash], notionals + fees + slips))
+        )
+        position_states = np.concatenate(([0.0], targets))
+        bar_closes = closes[1:]
+        # State after each bar's fill, and the state going into it (what the stop sees).
+        after = np.diff(np.concatenate(([1], rows, [len(history)])))
+        resume = len(history)
+        if stop_on_nonpositive_equity:
+            before = np.diff(np.concatenate(([1], rows + 1, [len(history)])))
+            equity_before = (
+                np.repeat(cash_states, before) + np.repeat(position_states, before) * bar_closes
+            )
+            breaches = np.flatnonzero(equity_before <= 0)
+            if len(breaches):
+                resume = int(breaches[0]) + 1
+
+        kept = int(np.searchsorted(rows, resume))
+        held = np.repeat(position_states, after)[: resume - 1]
+        equity_values[: resume - 1] = np.repeat(cash_states, after)[: resume - 1] + (
+            held * bar_closes[: resume - 1]
+        )
+        if record_series:
+            position_values[: resume - 1] = held
+        cash = float(cash_states[kept])
+        position = float(position_states[kept])
+        trades = kept
+        if kept:
+            total_commission = float(np.cumsum(fees[:kept])[-1])
+            total_slippage = float(np.cumsum(slips[:kept])[-1])
+        if trade_log is not None and kept:
+            rows, targets, prices = rows[:kept], targets[:kept], prices[:kept]
+            equity_after = cash_states[1 : kept + 1] + targets * prices
+            trade_log.extend(
+                times[rows - 1],
+                times[rows],
+                _trade_actions(strategy, history, rows, np.sign(positions_before[:kept])),
+                np.column_stack(
+                    (
+                        deltas[:kept],
+                        targets,
+                        prices,
+                        notionals[:kept],
+                        fees[:kept],
+                        slips[:kept],
+                        cash_states[1 : kept + 1],
+                        equity_after,
+                        _gross_leverages(targets, prices, equity_after),
+                    )
+                ),
+            )
+        visible.advance(resume - 1)
+        idx = resume
+
+    while idx < len(history):
+        if trading_stopped or next_change is not None:
+            # Skip ahead over bars where nothing can trade: equity just marks to market.
+            end = len(history)
+            if not trading_stopped:
+                end = min(int(next_change[int(_position_unit(position)) + 1, idx - 1]) + 1, end)  # type: ignore[index]
+            marked = cash + (position * closes[idx:end])
+            if not trading_stopped and stop_on_nonpositive_equity and (position != 0 or cash <= 0):
+                breaches = np.flatnonzero(marked <= 0)
+                if len(breaches):
+                    end = idx + int(breaches[0])
+                    marked = marked[: end - idx]
+            if end > idx:
+                equity_values[idx - 1 : end - 1] = marked
+                if record_series:
+                    position_values[idx - 1 : end - 1] = position
+                visible.advance(end - idx)
+                idx = end
+                continue
+
+        price = float(closes[idx])
+        equity_before = cash + (position * price)
 
         if stop_on_nonpositive_equity and equity_before <= 0 and not trading_stopped:
             if position != 0:
                 liquidation_delta = -position
-                liquidation_notional = liquidation_delta * bar.close
-                liquidation_fee = estimate_commission(liquidation_delta, per_share=commission_per_share)
-                liquidation_slip = estimate_slippage(liquidation_notional, slippage_bps=slippage_bps)
+                liquidation_notional = liquidation_delta * price
+                liquidation_fee = estimate_commission(
+                    liquidation_delta, per_share=commission_per_share
+                )
+                liquidation_slip = estimate_slippage(
+                    liquidation_notional, slippage_bps=slippage_bps
+                )
                 cash -= liquidation_notional + liquidation_fee + liquidation_slip
                 position = 0.0
                 trades += 1
                 total_commission += liquidation_fee
                 total_slippage += liquidation_slip
                 equity_after_liquidation = cash
-                trade_rows.append(
-                    {
-                        "signal_time": signal_bar.time.isoformat(),
-                        "trade_time": bar.time.isoformat(),
-                        "action": "equity_stop_liquidation",
-                        "delta": round(liquidation_delta, 6),
-                        "target_position": 0.0,
-                        "price": round(bar.close, 6),
-                        "notional": round(liquidation_notional, 6),
-                        "trade_notional": round(liquidation_notional, 6),
-                        "commission": round(liquidation_fee, 6),
-                        "slippage": round(liquidation_slip, 6),
-                        "cash": round(cash, 6),
-                        "equity": round(equity_after_liquidation, 6),
-                        "gross_leverage": 0.0,
-                    }
-                )
+                if trade_log is not None:
+                    trade_log.append(
+                        times[idx - 1],
+                        times[idx],
+                        "equity_stop_liquidation",
+                        liquidation_delta,
+                        0.0,
+                        price,
+                        liquidation_notional,
+                        liquidation_fee,
+                        liquidation_slip,
+                        cash,
+                        equity_after_liquidation,
+                        0.0,
+                    )
             trading_stopped = True
 
         current_unit = _position_unit(position)
+        signal_action: str | None
         if trading_stopped:
             target_position = position
             signal_action = "equity_stop_blocked"
         else:
-            signal = strategy.generate_signal(bars[:idx], current_position=current_unit)
-            signal_action = signal.action
-            if signal.target_position == current_unit:
+            if signals is not None:
+                # The action label is looked up only if this bar ends up in the trade log.
+                target_unit = float(signals[idx - 1, int(current_unit) + 1])
+                signal_action = None
+            else:
+                if incremental:
+                    signal = strategy.on_bar(history[idx - 1], current_position=current_unit)  # type: ignore[attr-defined]
+                else:
+                    signal = strategy.generate_signal(visible, current_position=current_unit)
+                target_unit = signal.target_position
+                signal_action = signal.action
+            if target_unit == current_unit:
                 # Keep share count unchanged while holding direction.
                 target_position = position
             else:
-                raw_target = shares_for_unit_signal(bar.close, target_notional, signal.target_position)
-                candidate_target = clamp_target_position(raw_target, max_abs_position=max_abs_position)
-                is_entry_or_flip = signal.target_position != 0.0 and signal.target_position != current_unit
+                raw_target = shares_for_unit_signal(price, target_notional, target_unit)
+                candidate_target = clamp_target_position(
+                    raw_target, max_abs_position=max_abs_position
+                )
+                is_entry_or_flip = target_unit != 0.0 and target_unit != current_unit
                 if not allow_leverage and is_entry_or_flip:
-                    candidate_leverage = _gross_leverage(candidate_target, bar.close, equity_before)
+                    candidate_leverage = _gross_leverage(candidate_target, price, equity_before)
                     if candidate_leverage > max_gross_leverage:
                         target_position = position
                         signal_action = "leverage_cap_blocked"
@@ -157,7 +424,7 @@ def run_engine(
         delta = target_position - position
 
         if delta != 0:
-            notional = delta * bar.close
+            notional = delta * price
             fee = estimate_commission(delta, per_share=commission_per_share)
             slip = estimate_slippage(notional, slippage_bps=slippage_bps)
             cash -= notional + fee + slip
@@ -165,49 +432,49 @@ def run_engine(
             trades += 1
             total_commission += fee
             total_slippage += slip
-            trade_rows.append(
-                {
-                    "signal_time": signal_bar.time.isoformat(),
-                    "trade_time": bar.time.isoformat(),
-                    "action": signal_action,
-                    "delta": round(delta, 6),
-                    "target_position": round(target_position, 6),
-                    "price": round(bar.close, 6),
-                    "notional": round(notional, 6),
-                    "trade_notional": round(notional, 6),
-                    "commission": round(fee, 6),
-                    "slippage": round(slip, 6),
-                    "cash": round(cash, 6),
-                    "equity": round(cash + (position * bar.close), 6),
-                    "gross_leverage": round(_gross_leverage(position, bar.close, cash + (position * bar.close)), 6),
-                }
-            )
+            if trade_log is not None:
+                if signal_action is None:
+                    signal_action = strategy.generate_signal(
+                        visible, current_position=current_unit
+                    ).action
+                equity_after_trade = cash + (position * price)
+                trade_log.append(
+                    times[idx - 1],
+                    times[idx],
+                    signal_action,
+                    delta,
+                    target_position,
+                    price,
+                    notional,
+                    fee,
+                    slip,
+                    cash,
+                    equity_after_trade,
+                    _gross_leverage(position, price, equity_after_trade),
+                )
 
-        equity = cash + (position * bar.close)
-        if equity_curve:
-            prev = equity_curve[-1]
-            if prev != 0:
-                returns.append(equity / prev - 1.0)
-        equity_curve.append(equity)
-        equity_points.append(
-            {
-                "time": bar.time.isoformat(),
-                "equity": round(equity, 6),
-                "position": round(position, 6),
-            }
-        )
+        equity_values[idx - 1] = cash + (position * price)
+        if record_series:
+            position_values[idx - 1] = position
+        visible.advance()
+        idx += 1
 
-    final_equity = equity_curve[-1] if equity_curve else initial_cash
+    previous, current = equity_values[:-1], equity_values[1:]
+    nonzero = previous != 0
+    returns = current[nonzero] / previous[nonzero] - 1.0
+
+    final_equity = float(equity_values[-1]) if len(equity_values) else initial_cash
     return BacktestSummary(
-        bars=max(len(bars) - 1, 0),
+        bars=max(len(history) - 1, 0),
         trades=trades,
         total_return=total_return(initial_cash, final_equity),
-        max_drawdown=max_drawdown(equity_curve),
+        max_drawdown=max_drawdown(equity_values),
         sharpe=annualized_sharpe(returns),
         final_equity=final_equity,
         total_commission=total_commission,
         total_slippage=total_slippage,
-        equity_curve=equity_points,
-        trades_log=trade_rows,
+        equity_log=EquityLog(times[1:], equity_values, position_values, history.tz)
+        if record_series
+        else None,
+        trade_log=trade_log,
     )
-
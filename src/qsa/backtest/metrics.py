@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from math import sqrt
-from statistics import mean, pstdev
+
+import numpy as np
+
 
 def total_return(initial_equity: float, final_equity: float) -> float:
     if initial_equity == 0:
@@ -9,25 +12,16 @@ def total_return(initial_equity: float, final_equity: float) -> float:
     return final_equity / initial_equity - 1.0
 
 
-def max_drawdown(equity_curve: list[float]) -> float:
-    if not equity_curve:
-        return 0.0
-    peak = equity_curve[0]
-    worst = 0.0
-    for value in equity_curve:
-        if value > peak:
-            peak = value
-        drawdown = value / peak - 1.0
-        if drawdown < worst:
-            worst = drawdown
-    return worst
-
-
-def annualized_sharpe(returns: list[float], periods_per_year: int = 252) -> float:
-    if len(returns) < 2:
+def max_drawdown(equity_curve: Sequence[float] | np.ndarray) -> float:
+    values = np.asarray(equity_curve, dtype=np.float64)
+    if len(values) == 0:
         return 0.0
-    vol = pstdev(returns)
-    if vol == 0:
-        return 0.0
-    return (mean(returns) / vol) * sqrt(periods_per_year)
+    drawdowns = values / np.maximum.accumulate(values) - 1.0
+    return min(float(drawdowns.min()), 0.0)
+
 
+def annualized_sharpe(returns: Sequence[float] | np.ndarray, periods_per_year: int = 252) -> float:
+    values = np.asarray(returns, dtype=np.float64)
+    if len(values) < 2 or np.ptp(values) == 0:
+        return 0.0
+    return float(values.mean() / values.std()) * sqrt(periods_per_year)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import tzinfo
+
+import numpy as np
+import pandas as pd
+
+from qsa.backtest.metrics import annualized_sharpe, max_drawdown, total_return
+from qsa.backtest.records import time_index
+from qsa.portfolio.risk import clamp_target_positions
+from qsa.portfolio.sizing import shares_for_unit_signals
+from qsa.schemas.data import BarPanel
+from qsa.strategies.base import SIGNAL_POSITIONS, VectorizedStrategy, hold_signals
+
+
+@dataclass(frozen=True, eq=False)
+class PortfolioSummary:
+    bars: int
+    trades: int
+    total_return: float
+    max_drawdown: float
+    sharpe: float
+    final_equity: float
+    total_commission: float
+    total_slippage: float
+    symbols: tuple[str, ...]
+    times: np.ndarray
+    equity: np.ndarray
+    symbol_equity: np.ndarray
+    positions: np.ndarray
+    symbol_trades: np.ndarray
+    symbol_commission: np.ndarray
+    symbol_slippage: np.ndarray
+    tz: tzinfo | None = None
+
+    def equity_frame(self) -> pd.DataFrame:
+        """Aggregate equity plus one P&L column per symbol, indexed by bar time."""
+        frame = pd.DataFrame(self.symbol_equity, columns=list(self.symbols))
+        frame.insert(0, "equity", self.equity)
+        frame.insert(0, "time", time_index(self.times, self.tz))
+        return frame
+
+    def symbol_summary(self) -> pd.DataFrame:
+        """One row per symbol: trades, costs, final position and P&L."""
+        final_pnl = (
+            self.symbol_equity[-1] if len(self.symbol_equity) else np.zeros(len(self.symbols))
+        )
+        final_position = self.positions[-1] if len(self.positions) else np.zeros(len(self.symbols))
+        return pd.DataFrame(
+            {
+                "symbol": list(self.symbols),
+                "trades": self.symbol_trades,
+                "final_position": final_position,
+                "pnl": final_pnl,
+                "commission": self.symbol_commission,
+                "slippage": self.symbol_slippage,
+            }
+        )
+
+
+def _panel_signals(panel: BarPanel, strategy: VectorizedStrategy) -> np.ndarray:
+    """Per-symbol signal matrices scattered onto panel rows, shape ``(T, N, 3)``.
+
+    Each symbol's signals are computed on its own bars only, then carried forward
+    over rows where it has no bar so a row always reflects the latest known signal.
+    """
+    signals = np.empty((len(panel), len(panel.symbols), len(SIGNAL_POSITIONS)))
+    has_bar = panel.has_bar
+    for column, symbol in enumerate(panel.symbols):
+        rows = np.flatnonzero(has_bar[:, column])
+        own = np.asarray(strategy.generate_signals(panel.history(symbol)), dtype=np.float64)
+        carried = hold_signals(len(panel))
+        if len(rows):
+            # Index of the latest own bar at or before each panel row (-1 before the first bar).
+            latest = np.searchsorted(rows, np.arange(len(panel)), side="right") - 1
+            seen = latest >= 0
+            carried[seen] = own[latest[seen]]
+        signals[:, column, :] = carried
+    return signals
+
+
+def run_portfolio_engine(
+    panel: BarPanel,
+    *,
+    strategy: VectorizedStrategy,
+    initial_cash: float,
+    target_notional: float,
+    max_abs_position: float,
+    allow_leverage: bool = False,
+    max_gross_leverage: float = 1.0,
+    stop_on_nonpositive_equity: bool = True,
+    commission_per_share: float = 0.005,
+    slippage_bps: float = 5.0,
+) -> PortfolioSummary:
+    """Run a backtest over a time-aligned panel of symbols sharing one cash account.
+
+    Follows ``run_engine`` semantics per symbol (signals at t-1, fills at t, sizing,
+    clamps, costs) with the book held in NumPy vectors, so each bar costs a fixed
+    number of array operations regardless of universe size. A symbol only trades on
+    rows where it has a bar; between bars it is marked at its last close.
+
+    Without leverage, the gross-leverage cap applies to the whole book: exits are
+    applied first, then entries/flips are admitted in symbol order while the
+    book's gross exposure stays within ``max_gross_leverage`` times pre-trade equity.
+    A non-positive book equity liquidates every position and stops trading.
+
+    Requires a strategy implementing ``generate_signals`` (see ``VectorizedStrategy``).
+    """
+    count = len(panel.symbols)
+    steps = max(len(panel) - 1, 0)
+    signals = _panel_signals(panel, strategy)
+    has_bar = panel.has_bar
+    # Mark-to-market prices: last close carried forward, zero before a symbol's first bar.
+    marks = pd.DataFrame(panel.closes).ffill().fillna(0.0).to_numpy()
+    symbols = np.arange(count)
+
+    cash = initial_cash
+    positions = np.zeros(count)
+    symbol_cash = np.zeros(count)
+    symbol_trades = np.zeros(count, dtype=np.int64)
+    symbol_commission = np.zeros(count)
+    symbol_slippage = np.zeros(count)
+    equity = np.empty(steps)
+    symbol_equity = np.empty((steps, count))
+    position_history = np.empty((steps, count))
+    trading_stopped = False
+
+    for idx in range(1, len(panel)):
+        prices = marks[idx]
+        tradable = has_bar[idx]
+        equity_before = cash + float(np.sum(positions * prices))
+
+        if stop_on_nonpositive_equity and equity_before <= 0 and not trading_stopped:
+            targets = np.zeros(count)
+            trading_stopped = True
+        elif trading_stopped:
+            targets = positions
+        else:
+            units = np.sign(positions)
+            target_units = signals[idx - 1, symbols, units.astype(np.int64) + 1]
+            changing = tradable & (target_units != units)
+            candidates = clamp_target_positions(
+                shares_for_unit_signals(prices, target_notional, target_units), max_abs_position
+            )
+            targets = np.where(changing, candidates, positions)
+            entering = changing & (target_units != 0.0)
+            if not allow_leverage and entering.any():
+                exposure = np.abs(np.where(entering, 0.0, targets) * prices)
+                added = np.cumsum(np.abs(candidates[entering] * prices[entering]))
+                if equity_before <= 0:
+                    admitted = candidates[entering] == 0.0
+                else:
+                    admitted = (
+                        float(np.sum(exposure)) + added
+                    ) / equity_before <= max_gross_leverage
+                    admitted = np.cumprod(admitted).astype(bool)
+                blocked = np.flatnonzero(entering)[~admitted]
+                targets[blocked] = positions[blocked]
+
+        deltas = targets - positions
+        traded = deltas != 0
+        if traded.any():
+            notional = deltas * prices
+            fees = np.abs(deltas) * commission_per_share
+            slips = np.abs(notional) * (slippage_bps / 10_000.0)
+            flows = np.where(traded, notional + fees + slips, 0.0)
+            cash -= float(np.sum(flows))
+            symbol_cash -= flows
+            symbol_trades += traded
+            symbol_commission += np.where(traded, fees, 0.0)
+            symbol_slippage += np.where(traded, slips, 0.0)
+            positions = targets.copy()
+
+        holdings = positions * prices
+        symbol_equity[idx - 1] = symbol_cash + holdings
+        equity[idx - 1] = cash + float(np.sum(holdings))
+        position_history[idx - 1] = positions
+
+    previous, current = equity[:-1], equity[1:]
+    nonzero = previous != 0
+    returns = current[nonzero] / previous[nonzero] - 1.0
+    final_equity = float(equity[-1]) if steps else initial_cash
+    return PortfolioSummary(
+        bars=steps,
+        trades=int(symbol_trades.sum()),
+        total_return=total_return(initial_cash, final_equity),
+        max_drawdown=max_drawdown(equity),
+        sharpe=annualized_sharpe(returns),
+        final_equity=final_equity,
+        total_commission=float(symbol_commission.sum()),
+        total_slippage=float(symbol_slippage.sum()),
+        symbols=panel.symbols,
+        times=panel.times[1:],
+        equity=equity,
+        symbol_equity=symbol_equity,
+        positions=position_history,
+        symbol_trades=symbol_trades,
+        symbol_commission=symbol_commission,
+        symbol_slippage=symbol_slippage,
+        tz=panel.tz,
+    )
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import tzinfo
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from qsa.schemas.data import datetime_from_ns
+
+TRADE_FLOAT_COLUMNS = (
+    "delta",
+    "target_position",
+    "price",
+    "notional",
+    "commission",
+    "slippage",
+    "cash",
+    "equity",
+    "gross_leverage",
+)
+
+
+def time_index(times: np.ndarray, tz: tzinfo | None) -> pd.DatetimeIndex:
+    """Turn int64 epoch nanoseconds (UTC when ``tz`` is set) into a DatetimeIndex."""
+    index = pd.DatetimeIndex(times.astype("datetime64[ns]"))
+    return index.tz_localize("UTC").tz_convert(tz) if tz is not None else index
+
+
+class EquityLog:
+    """Per-bar equity and position columns recorded by the engine.
+
+    ``times`` is typically a view of the dataset's time column, so recording costs
+    two float64 writes per bar. Rows are only turned into dicts or DataFrames on request.
+    """
+
+    __slots__ = ("equity", "position", "times", "tz")
+
+    def __init__(
+        self, times: np.ndarray, equity: np.ndarray, position: np.ndarray, tz: tzinfo | None = None
+    ) -> None:
+        self.times = times
+        self.equity = equity
+        self.position = position
+        self.tz = tz
+
+    def __len__(self) -> int:
+        return len(self.equity)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, EquityLog):
+            return NotImplemented
+        return (
+            self.tz == other.tz
+            and np.array_equal(self.times, other.times)
+            and np.array_equal(self.equity, other.equity)
+            and np.array_equal(self.position, other.position)
+        )
+
+    def to_records(self) -> list[dict[str, float | str]]:
+        """Rows as dicts with ISO timestamps and values rounded to 6 decimals."""
+        return [
+            {
+                "time": datetime_from_ns(ns, self.tz).isoformat(),
+                "equity": round(equity, 6),
+                "position": round(held, 6),
+            }
+            for ns, equity, held in zip(
+                self.times.tolist(), self.equity.tolist(), self.position.tolist()
+            )
+        ]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Unrounded columns with a datetime ``time`` column."""
+        return pd.DataFrame(
+            {
+                "time": time_index(self.times, self.tz),
+                "equity": self.equity,
+                "position": self.position,
+            }
+        )
+
+
+class TradeLog:
+    """Append-only columnar trade recorder with geometric growth.
+
+    Trade times are stored as int64 nanoseconds and actions as small integer codes,
+    so recording a fill never formats strings or builds dicts.
+    """
+
+    __slots__ = (
+        "_action_codes",
+        "_actions",
+        "_signal_times",
+        "_size",
+        "_trade_times",
+        "_values",
+        "tz",
+    )
+
+    def __init__(self, tz: tzinfo | None = None, capacity: int = 64) -> None:
+        self._size = 0
+        self._signal_times = np.empty(capacity, dtype=np.int64)
+        self._trade_times = np.empty(capacity, dtype=np.int64)
+        self._action_codes = np.empty(capacity, dtype=np.int32)
+        self._actions: list[str] = []
+        self._values = np.empty((capacity, len(TRADE_FLOAT_COLUMNS)), dtype=np.float64)
+        self.tz = tz
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, TradeLog):
+            return NotImplemented
+        return self.tz == other.tz and self.to_records() == other.to_records()
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._signal_times)
+        self._signal_times = np.resize(self._signal_times, capacity)
+        self._trade_times = np.resize(self._trade_times, capacity)
+        self._action_codes = np.resize(self._action_codes, capacity)
+        self._values = np.resize(self._values, (capacity, len(TRADE_FLOAT_COLUMNS)))
+
+    def append(self, signal_time: int, trade_time: int, action: str, *values: float) -> None:
+        """Record one fill; ``values`` follow ``TRADE_FLOAT_COLUMNS`` order."""
+        if self._size == len(self._signal_times):
+            self._grow()
+        try:
+            code = self._actions.index(action)
+        except ValueError:
+            code = len(self._actions)
+            self._actions.append(action)
+        row = self._size
+        self._signal_times[row] = signal_time
+        self._trade_times[row] = trade_time
+        self._action_codes[row] = code
+        self._values[row] = values
+        self._size += 1
+
+    def extend(
+        self,
+        signal_times: np.ndarray,
+        trade_times: np.ndarray,
+        actions: Sequence[str],
+        values: np.ndarray,
+    ) -> None:
+        """Record many fills at once; ``values`` holds one ``TRADE_FLOAT_COLUMNS`` row per fill."""
+        count = len(actions)
+        while self._size + count > len(self._signal_times):
+            self._grow()
+        codes = {action: code for code, action in enumerate(self._actions)}
+        rows = slice(self._size, self._size + count)
+        self._signal_times[rows] = signal_times
+        self._trade_times[rows] = trade_times
+        self._action_codes[rows] = [codes.setdefault(action, len(codes)) for action in actions]
+        self._values[rows] = values
+        self._actions = list(codes)
+        self._size += count
+
+    def column(self, name: str) -> np.ndarray:
+        return self._values[: self._size, TRADE_FLOAT_COLUMNS.index(name)]
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Rows as dicts with ISO timestamps and values rounded to 6 decimals."""
+        rows: list[dict[str, Any]] = []
+        values = self._values[: self._size].tolist()
+        for row, (signal_ns, trade_ns, code) in enumerate(
+            zip(
+                self._signal_times[: self._size].tolist(),
+                self._trade_times[: self._size].tolist(),
+                self._action_codes[: self._size].tolist(),
+            )
+        ):
+            delta, target, price, notional, fee, slip, cash, equity, leverage = values[row]
+            rows.append(
+                {
+                    "signal_time": datetime_from_ns(signal_ns, self.tz).isoformat(),
+                    "trade_time": datetime_from_ns(trade_ns, self.tz).isoformat(),
+                    "action": self._actions[code],
+                    "delta": round(delta, 6),
+                    "target_position": round(target, 6),
+                    "price": round(price, 6),
+                    "notional": round(notional, 6),
+                    "trade_notional": round(notional, 6),
+                    "commission": round(fee, 6),
+                    "slippage": round(slip, 6),
+                    "cash": round(cash, 6),
+                    "equity": round(equity, 6),
+                    "gross_leverage": round(leverage, 6),
+                }
+            )
+        return rows
+
+    def to_frame(self) -> pd.DataFrame:
+        """Unrounded columns with datetime ``signal_time``/``trade_time`` columns."""
+        frame = pd.DataFrame(
+            {
+                "signal_time": time_index(self._signal_times[: self._size], self.tz),
+                "trade_time": time_index(self._trade_times[: self._size], self.tz),
+                "action": [
+                    self._actions[code] for code in self._action_codes[: self._size].tolist()
+                ],
+            }
+        )
+        for name in TRADE_FLOAT_COLUMNS:
+            frame[name] = self.column(name)
+        frame.insert(frame.columns.get_loc("notional") + 1, "trade_notional", frame["notional"])
+        return frame
@@ -4,7 +4,7 @@ from typing import Any
 
 from qsa.backtest.engine import run_engine
 from qsa.backtest.plotting import generate_run_plots
-from qsa.config.settings import load_settings
+from qsa.config.settings import Settings, load_settings
 from qsa.data.pipeline import build_versioned_dataset
 from qsa.ops.logging import configure_logging
 from qsa.ops.tracking import (
@@ -16,10 +16,35 @@ from qsa.ops.tracking import (
 from qsa.strategies.momentum_example import MomentumExampleStrategy, MomentumParams
 
 
+def build_strategy(settings: Settings) -> MomentumExampleStrategy:
+    return MomentumExampleStrategy(
+        MomentumParams(
+            lookback=settings.strategy_lookback,
+            entry_threshold=settings.strategy_entry_threshold,
+            exit_threshold=settings.strategy_exit_threshold,
+        )
+    )
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """Map risk and cost settings onto ``run_engine`` keyword arguments."""
+    return {
+        "target_notional": settings.target_notional,
+        "max_abs_position": settings.max_abs_position,
+        "allow_leverage": settings.allow_leverage,
+        "max_gross_leverage": settings.max_gross_leverage,
+        "stop_on_nonpositive_equity": settings.stop_on_nonpositive_equity,
+        "commission_per_share": settings.commission_per_share,
+        "slippage_bps": settings.slippage_bps,
+    }
+
+
 def run_backtest(
     config_path: str,
     initial_cash: float = 100_000.0,
     plot: bool = False,
+    refresh: bool = False,
+    offline: bool = False,
 ) -> dict[str, Any]:
     settings = load_settings(config_path)
     configure_logging(settings.log_level)
@@ -28,32 +53,19 @@ def run_backtest(
         config_path=config_path,
         initial_cash=initial_cash,
     )
-    dataset = build_versioned_dataset(settings)
+    dataset = build_versioned_dataset(settings, refresh=refresh, offline=offline)
     dataset_meta = save_dataset_artifacts(
         run_context.run_dir,
         dataset_id=dataset.dataset_id,
-        bars_frame=dataset.bars_frame,
+        bars=dataset.bars,
         manifest=dataset.manifest,
     )
 
-    strategy = MomentumExampleStrategy(
-        MomentumParams(
-            lookback=settings.strategy_lookback,
-            entry_threshold=settings.strategy_entry_threshold,
-            exit_threshold=settings.strategy_exit_threshold,
-        )
-    )
     summary = run_engine(
         dataset.bars,
-        strategy=strategy,
+        strategy=build_strategy(settings),
         initial_cash=initial_cash,
-        target_notional=settings.target_notional,
-        max_abs_position=settings.max_abs_position,
-        allow_leverage=settings.allow_leverage,
-        max_gross_leverage=settings.max_gross_leverage,
-        stop_on_nonpositive_equity=settings.stop_on_nonpositive_equity,
-        commission_per_share=settings.commission_per_share,
-        slippage_bps=settings.slippage_bps,
+        **engine_options(settings),
     )
     metrics: dict[str, Any] = {
         "status": "ok",
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import itertools
+import os
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from qsa.backtest.engine import run_engine
+from qsa.backtest.run import build_strategy, engine_options
+from qsa.config.settings import Settings, load_settings
+from qsa.data.pipeline import build_versioned_dataset
+from qsa.ops.logging import configure_logging
+from qsa.ops.tracking import save_metrics, save_sweep_results, start_sweep
+from qsa.schemas.data import BarHistory
+
+# YAML grid sections/keys (mirroring the config file layout) -> Settings fields.
+SWEEP_FIELDS: dict[tuple[str, str], str] = {
+    ("strategy", "lookback"): "strategy_lookback",
+    ("strategy", "entry_threshold"): "strategy_entry_threshold",
+    ("strategy", "exit_threshold"): "strategy_exit_threshold",
+    ("risk", "max_abs_position"): "max_abs_position",
+    ("risk", "target_notional"): "target_notional",
+    ("risk", "allow_leverage"): "allow_leverage",
+    ("risk", "max_gross_leverage"): "max_gross_leverage",
+    ("risk", "stop_on_nonpositive_equity"): "stop_on_nonpositive_equity",
+    ("costs", "commission_per_share"): "commission_per_share",
+    ("costs", "slippage_bps"): "slippage_bps",
+}
+
+SUMMARY_COLUMNS = (
+    "bars",
+    "trades",
+    "total_return",
+    "max_drawdown",
+    "sharpe",
+    "final_equity",
+    "total_commission",
+    "total_slippage",
+)
+
+# Row order of the shared-memory bar block: times (int64 view), then OHLCV.
+_COLUMN_COUNT = 6
+
+_worker_memory: shared_memory.SharedMemory | None = None
+_worker_bars: BarHistory | None = None
+
+
+def load_sweep_grid(grid_path: str) -> dict[str, list[Any]]:
+    """Read a YAML grid laid out like the config sections, e.g. ``strategy: {lookback: [10, 20]}``."""
+    path = Path(grid_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Sweep grid file not found: {path}")
+    content = yaml.safe_load(path.read_text()) or {}
+    if not isinstance(content, dict):
+        raise TypeError(f"Sweep grid must be a mapping: {path}")
+
+    grid: dict[str, list[Any]] = {}
+    for section, values in content.items():
+        if not isinstance(values, dict):
+            raise TypeError(f"Sweep grid section '{section}' must be a mapping.")
+        for key, candidates in values.items():
+            field = SWEEP_FIELDS.get((str(section), str(key)))
+            if field is None:
+                raise ValueError(f"Unsupported sweep parameter: {section}.{key}")
+            grid[field] = list(candidates) if isinstance(candidates, list) else [candidates]
+    return grid
+
+
+def expand_grid(grid: Mapping[str, Sequence[Any]]) -> list[dict[str, Any]]:
+    """Return the cartesian product of a ``{settings_field: candidates}`` grid."""
+    unknown = sorted(set(grid) - set(SWEEP_FIELDS.values()))
+    if unknown:
+        raise ValueError(f"Unsupported sweep parameters: {unknown}")
+    if any(len(candidates) == 0 for candidates in grid.values()):
+        raise ValueError("Every sweep parameter needs at least one candidate value.")
+    fields = list(grid)
+    return [dict(zip(fields, values)) for values in itertools.product(*(grid[f] for f in fields))]
+
+
+def _combination_settings(base: Settings, overrides: Mapping[str, Any]) -> Settings:
+    return Settings.model_validate({**base.model_dump(), **overrides})
+
+
+def _share_bars(bars: BarHistory) -> shared_memory.SharedMemory:
+    memory = shared_memory.SharedMemory(create=True, size=max(_COLUMN_COUNT * len(bars) * 8, 1))
+    block = np.ndarray((_COLUMN_COUNT, len(bars)), dtype=np.float64, buffer=memory.buf)
+    block[0].view(np.int64)[:] = bars.times
+    block[1] = bars.opens
+    block[2] = bars.highs
+    block[3] = bars.lows
+    block[4] = bars.closes
+    block[5] = bars.volumes
+    return memory
+
+
+def _attach_bars(memory_name: str, length: int, tz: Any) -> None:
+    """Process-pool initializer: map the shared bar block into a read-only BarHistory."""
+    global _worker_memory, _worker_bars
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    block = np.ndarray((_COLUMN_COUNT, length), dtype=np.float64, buffer=_worker_memory.buf)
+    _worker_bars = BarHistory(block[0].view(np.int64), *block[1:], tz=tz)
+
+
+def _run_combination(task: tuple[Settings, float]) -> dict[str, Any]:
+    settings, initial_cash = task
+    if _worker_bars is None:
+        raise RuntimeError("Sweep worker has no shared bars attached.")
+    summary = run_engine(
+        _worker_bars,
+        strategy=build_strategy(settings),
+        initial_cash=initial_cash,
+        record_series=False,
+        **engine_options(settings),
+    )
+    return {column: getattr(summary, column) for column in SUMMARY_COLUMNS}
+
+
+def _detach_bars() -> None:
+    global _worker_memory, _worker_bars
+    _worker_bars = None
+    if _worker_memory is not None:
+        _worker_memory.close()
+        _worker_memory = None
+
+
+def _map_combinations(
+    bars: BarHistory, tasks: list[tuple[Settings, float]], workers: int
+) -> list[dict[str, Any]]:
+    memory = _share_bars(bars)
+    try:
+        initargs = (memory.name, len(bars), bars.tz)
+        if workers <= 1:
+            _attach_bars(*initargs)
+            try:
+                return [_run_combination(task) for task in tasks]
+            finally:
+                _detach_bars()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_attach_bars, initargs=initargs
+        ) as pool:
+            chunksize = max(1, len(tasks) // (workers * 4))
+            return list(pool.map(_run_combination, tasks, chunksize=chunksize))
+    finally:
+        memory.close()
+        memory.unlink()
+
+
+def sweep_engine(
+    bars: BarHistory,
+    base_settings: Settings,
+    grid: Mapping[str, Sequence[Any]],
+    *,
+    initial_cash: float = 100_000.0,
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """Run ``run_engine`` once per grid combination over one shared, read-only dataset.
+
+    Bars are copied once into shared memory; worker processes map them without
+    pickling. Returns one row per combination: the swept parameters followed by
+    the scalar summary metrics, in grid order.
+    """
+    combinations = expand_grid(grid)
+    tasks = [(_combination_settings(base_settings, combo), initial_cash) for combo in combinations]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    rows = [
+        {**combo, **metrics}
+        for combo, metrics in zip(combinations, _map_combinations(bars, tasks, workers))
+    ]
+    return pd.DataFrame(rows, columns=[*grid, *SUMMARY_COLUMNS])
+
+
+def run_sweep(
+    config_path: str,
+    grid_path: str,
+    initial_cash: float = 100_000.0,
+    workers: int | None = None,
+    refresh: bool = False,
+    offline: bool = False,
+) -> dict[str, Any]:
+    settings = load_settings(config_path)
+    configure_logging(settings.log_level)
+    grid = load_sweep_grid(grid_path)
+    run_context = start_sweep(
+        settings, config_path=config_path, grid=grid, initial_cash=initial_cash
+    )
+    dataset = build_versioned_dataset(settings, refresh=refresh, offline=offline)
+    results = sweep_engine(
+        dataset.bars,
+        settings,
+        grid,
+        initial_cash=initial_cash,
+        workers=workers,
+    )
+    results_path = save_sweep_results(run_context.run_dir, results)
+    metrics: dict[str, Any] = {
+        "status": "ok",
+        "run_id": run_context.run_id,
+        "env": settings.app_env,
+        "run_type": "sweep",
+        "config": config_path,
+        "grid": grid_path,
+        "dataset_id": dataset.dataset_id,
+        "combinations": len(results),
+        "results_path": results_path,
+        "run_dir": str(run_context.run_dir),
+    }
+    save_metrics(run_context.run_dir, metrics)
+    return metrics
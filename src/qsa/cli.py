@@ -4,9 +4,31 @@ import argparse
 import asyncio
 import json
 from dataclasses import asdict
+from datetime import UTC, datetime
+from pathlib import Path
 
 from qsa.backtest.run import run_backtest
-from qsa.live.runner import run_live
+from qsa.backtest.sweep import run_sweep
+from qsa.config.settings import load_settings
+from qsa.data.backfill import run_backfill
+from qsa.execution.gateway import run_gateway
+from qsa.live.runner import run_live, run_live_daemon, run_live_symbols
+from qsa.ops.latency import LatencyLog
+
+
+def _utc_datetime(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=UTC)
+
+
+def _add_cache_flags(parser: argparse.ArgumentParser) -> None:
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--refresh", action="store_true", help="Ignore the dataset cache and refetch."
+    )
+    cache.add_argument(
+        "--offline", action="store_true", help="Use the cached dataset only; never connect."
+    )
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -17,11 +39,59 @@ def _build_parser() -> argparse.ArgumentParser:
     backtest.add_argument("--config", default="configs/dev.yaml")
     backtest.add_argument("--initial-cash", type=float, default=100_000.0)
     backtest.add_argument("--plot", action="store_true")
+    _add_cache_flags(backtest)
+
+    sweep = sub.add_parser("sweep", help="Run a parallel parameter sweep over one dataset.")
+    sweep.add_argument("--config", default="configs/dev.yaml")
+    sweep.add_argument("--grid", required=True)
+    sweep.add_argument("--initial-cash", type=float, default=100_000.0)
+    sweep.add_argument("--workers", type=int)
+    _add_cache_flags(sweep)
+
+    backfill = sub.add_parser(
+        "backfill", help="Backfill long history in IB-sized, resumable chunks."
+    )
+    backfill.add_argument("--config", default="configs/dev.yaml")
+    backfill.add_argument(
+        "--start", required=True, type=_utc_datetime, help="ISO date/time (UTC if naive)."
+    )
+    backfill.add_argument(
+        "--end", type=_utc_datetime, help="ISO date/time (UTC if naive); default now."
+    )
+    backfill.add_argument("--concurrency", type=int, default=4)
+
+    gateway = sub.add_parser("gateway", help="Share one warm TWS session with local qsa runs.")
+    gateway.add_argument("--config", default="configs/paper.yaml")
+    gateway.add_argument(
+        "--socket", type=Path, help="Unix socket path; default execution.gateway_socket."
+    )
+    gateway.add_argument(
+        "--history-ttl",
+        type=float,
+        default=60.0,
+        help="Seconds to reuse historical bars with an explicit end time.",
+    )
+
+    latency = sub.add_parser("latency", help="Summarize live stage latencies (p50/p95/p99 ms).")
+    latency.add_argument("--config", default="configs/paper.yaml")
+    latency.add_argument(
+        "--last", type=int, help="Only the newest N runs; default the whole rolling log."
+    )
 
     live = sub.add_parser("live", help="Run live scaffold.")
     live.add_argument("--config", default="configs/paper.yaml")
     live.add_argument("--dry-run", action="store_true")
     live.add_argument("--symbol")
+    live.add_argument(
+        "--symbols",
+        type=lambda value: [symbol.strip() for symbol in value.split(",") if symbol.strip()],
+        help="Comma-separated universe to trade in one pass over a single connection.",
+    )
+    live.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Stay connected and trade every completed bar until SIGINT/SIGTERM.",
+    )
 
     return parser
 
@@ -33,9 +103,66 @@ def main() -> None:
             config_path=args.config,
             initial_cash=args.initial_cash,
             plot=args.plot,
+            refresh=args.refresh,
+            offline=args.offline,
+        )
+        print(json.dumps(result, indent=2))
+        return
+    if args.command == "sweep":
+        result = run_sweep(
+            config_path=args.config,
+            grid_path=args.grid,
+            initial_cash=args.initial_cash,
+            workers=args.workers,
+            refresh=args.refresh,
+            offline=args.offline,
+        )
+        print(json.dumps(result, indent=2))
+        return
+    if args.command == "backfill":
+        result = asyncio.run(
+            run_backfill(
+                load_settings(args.config),
+                start=args.start,
+                end=args.end or datetime.now(UTC),
+                concurrency=args.concurrency,
+            )
         )
         print(json.dumps(result, indent=2))
         return
+    if args.command == "gateway":
+        stats = asyncio.run(
+            run_gateway(
+                load_settings(args.config), socket_path=args.socket, history_ttl_s=args.history_ttl
+            )
+        )
+        print(json.dumps(stats, indent=2))
+        return
+    if args.command == "latency":
+        print(
+            json.dumps(
+                LatencyLog.from_settings(load_settings(args.config)).summary(args.last), indent=2
+            )
+        )
+        return
+    if args.symbols:
+        if args.daemon:
+            raise SystemExit("--symbols cannot be combined with --daemon.")
+        universe = asyncio.run(
+            run_live_symbols(config_path=args.config, dry_run=args.dry_run, symbols=args.symbols)
+        )
+        print(json.dumps(asdict(universe), indent=2))
+        return
+    if args.daemon:
+        asyncio.run(
+            run_live_daemon(
+                config_path=args.config,
+                dry_run=args.dry_run,
+                symbol=args.symbol,
+                on_result=lambda bar_result: print(json.dumps(asdict(bar_result)), flush=True),
+            )
+        )
+        return
     result = asyncio.run(
         run_live(config_path=args.config, dry_run=args.dry_run, symbol=args.symbol)
     )
@@ -1,2 +1 @@
 """Configuration package."""
-
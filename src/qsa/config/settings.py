@@ -16,12 +16,14 @@ class Settings(BaseModel):
     app_env: str
     mode: Literal["backtest", "paper", "live"]
     log_level: str
+    latency_tracing: bool
     data_dir: Path
     broker: str
     ib_host: str
     ib_port: int
     ib_client_id: int
     ib_account: str
+    ib_gateway_socket: str
     data_source: str
     ib_symbol: str
     ib_contract_id: int
@@ -30,6 +32,8 @@ class Settings(BaseModel):
     ib_bar_size: str
     ib_what_to_show: str
     ib_use_rth: int
+    cache_ttl_s: float = Field(ge=0.0)
+    cache_max_bytes: int = Field(gt=0)
     strategy_lookback: int = Field(gt=0)
     strategy_entry_threshold: float = Field(ge=0.0)
     strategy_exit_threshold: float
@@ -45,10 +49,24 @@ class Settings(BaseModel):
 def _read_yaml(config_path: Path) -> dict[str, Any]:
     content = yaml.safe_load(config_path.read_text()) or {}
     if not isinstance(content, dict):
-        raise ValueError(f"Config must be a mapping: {config_path}")
+        raise TypeError(f"Config must be a mapping: {config_path}")
     return content
 
 
+_TRUE_FLAGS = frozenset({"1", "true", "yes", "on"})
+_FALSE_FLAGS = frozenset({"0", "false", "no", "off", ""})
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = getenv(name)
+    if value is None:
+        return default
+    flag = value.strip().lower()
+    if flag not in _TRUE_FLAGS | _FALSE_FLAGS:
+        raise ValueError(f"{name} must be one of 1/true/yes/on or 0/false/no/off, got {value!r}")
+    return flag in _TRUE_FLAGS
+
+
 def load_settings(config_path: str) -> Settings:
     cfg_path = Path(config_path)
     if not cfg_path.exists():
@@ -65,20 +83,30 @@ def load_settings(config_path: str) -> Settings:
         "app_env": app.get("env", getenv("APP_ENV", "dev")),
         "mode": execution.get("mode", getenv("QSA_MODE", "paper")),
         "log_level": app.get("log_level", getenv("QSA_LOG_LEVEL", "INFO")),
+        "latency_tracing": app.get("latency_tracing", _env_flag("QSA_LATENCY_TRACING", False)),
         "data_dir": Path(str(data.get("root", getenv("QSA_DATA_DIR", "./data")))),
         "broker": execution.get("broker", getenv("QSA_BROKER", "ibkr")),
         "ib_host": str(execution.get("host", getenv("QSA_IB_HOST", "127.0.0.1"))),
-        "ib_port": int(execution.get("port", getenv("QSA_IB_PORT", 7497))),
-        "ib_client_id": int(execution.get("client_id", getenv("QSA_IB_CLIENT_ID", 11))),
+        "ib_port": int(execution.get("port", getenv("QSA_IB_PORT", "7497"))),
+        "ib_client_id": int(execution.get("client_id", getenv("QSA_IB_CLIENT_ID", "11"))),
         "ib_account": str(execution.get("account", getenv("QSA_IB_ACCOUNT", ""))),
+        "ib_gateway_socket": str(
+            execution.get("gateway_socket", getenv("QSA_IB_GATEWAY_SOCKET", ""))
+        ),
         "data_source": str(data.get("source", getenv("QSA_DATA_SOURCE", "ibkr"))),
         "ib_symbol": str(data.get("ib_symbol", getenv("QSA_IB_SYMBOL", "DEMO"))),
-        "ib_contract_id": int(data.get("ib_contract_id", getenv("QSA_IB_CONTRACT_ID", 0))),
+        "ib_contract_id": int(data.get("ib_contract_id", getenv("QSA_IB_CONTRACT_ID", "0"))),
         "ib_exchange": str(data.get("ib_exchange", getenv("QSA_IB_EXCHANGE", "SMART"))),
         "ib_duration": str(data.get("ib_duration", getenv("QSA_IB_DURATION", "90 D"))),
         "ib_bar_size": str(data.get("ib_bar_size", getenv("QSA_IB_BAR_SIZE", "1 day"))),
-        "ib_what_to_show": str(data.get("ib_what_to_show", getenv("QSA_IB_WHAT_TO_SHOW", "TRADES"))),
-        "ib_use_rth": int(data.get("ib_use_rth", getenv("QSA_IB_USE_RTH", 1))),
+        "ib_what_to_show": str(
+            data.get("ib_what_to_show", getenv("QSA_IB_WHAT_TO_SHOW", "TRADES"))
+        ),
+        "ib_use_rth": int(data.get("ib_use_rth", getenv("QSA_IB_USE_RTH", "1"))),
+        "cache_ttl_s": float(data.get("cache_ttl_s", getenv("QSA_CACHE_TTL_S", "43200"))),
+        "cache_max_bytes": int(data.get("cache_max_mb", getenv("QSA_CACHE_MAX_MB", "512")))
+        * 1024
+        * 1024,
         "strategy_lookback": int(strategy.get("lookback", 15)),
         "strategy_entry_threshold": float(strategy.get("entry_threshold", 0.05)),
         "strategy_exit_threshold": float(strategy.get("exit_threshold", 0.0)),
@@ -91,4 +119,3 @@ def load_settings(config_path: str) -> Settings:
         "slippage_bps": float(costs.get("slippage_bps", 1.0)),
     }
     return Settings.model_validate(raw)
-
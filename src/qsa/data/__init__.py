@@ -1,2 +1 @@
 """Data models, cache, and IBKR pipeline helpers."""
-
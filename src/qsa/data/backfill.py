@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from qsa.config.settings import Settings
+from qsa.data.cache import columns_to_frame, frame_to_columns
+from qsa.data.durations import bar_size_seconds
+from qsa.data.pipeline import _clean_ohlcv, _make_client
+from qsa.execution.tws_client import TWS_Wrapper_Client
+
+# Largest duration (seconds) IB serves in one request, by bar size (upper bound, inclusive).
+# Mirrors IB's historical data limitations table, rounded down where it is ambiguous.
+_MAX_CHUNK_SECONDS: tuple[tuple[int, int], ...] = (
+    (1, 1_800),
+    (5, 3_600),
+    (15, 14_400),
+    (30, 28_800),
+    (60, 86_400),
+    (180, 2 * 86_400),
+    (600, 7 * 86_400),
+    (1_800, 14 * 86_400),
+    (4 * 3_600, 30 * 86_400),
+    (31 * 86_400, 365 * 86_400),
+)
+
+
+@dataclass(frozen=True)
+class BackfillChunk:
+    start: datetime
+    end: datetime
+
+    @property
+    def duration(self) -> str:
+        """IB duration string covering ``end - start`` (seconds up to a day, whole days beyond)."""
+        seconds = math.ceil((self.end - self.start).total_seconds())
+        if seconds <= 86_400:
+            return f"{max(seconds, 1)} S"
+        return f"{math.ceil(seconds / 86_400)} D"
+
+    @property
+    def chunk_id(self) -> str:
+        return f"{int(self.start.timestamp())}_{int(self.end.timestamp())}"
+
+
+def max_chunk_seconds(bar_size: str) -> int:
+    """Longest span IB returns in a single historical request for ``bar_size``."""
+    bar_seconds = bar_size_seconds(bar_size)
+    for limit, span in _MAX_CHUNK_SECONDS:
+        if bar_seconds <= limit:
+            return span
+    return _MAX_CHUNK_SECONDS[-1][1]
+
+
+def plan_chunks(start: datetime, end: datetime, bar_size: str) -> list[BackfillChunk]:
+    """Split ``[start, end)`` into legal request windows, newest first.
+
+    Chunk boundaries sit on multiples of the maximum chunk span since the epoch, so a
+    later run over an extended range reproduces (and can skip) earlier full chunks.
+    """
+    if start.tzinfo is None or end.tzinfo is None:
+        raise ValueError("Backfill start and end must be timezone-aware.")
+    if end <= start:
+        return []
+    span = max_chunk_seconds(bar_size)
+    epoch = datetime(1970, 1, 1, tzinfo=UTC)
+    first = int((start - epoch).total_seconds()) // span
+    last = math.ceil((end - epoch).total_seconds() / span)
+    chunks = []
+    for index in range(last - 1, first - 1, -1):
+        chunk_start = max(epoch + timedelta(seconds=index * span), start)
+        chunk_end = min(epoch + timedelta(seconds=(index + 1) * span), end)
+        if chunk_end > chunk_start:
+            chunks.append(BackfillChunk(start=chunk_start, end=chunk_end))
+    return chunks
+
+
+class TokenBucket:
+    """Async token bucket that never admits more than ``limit`` acquisitions per ``window_s``.
+
+    Capacity and refill are each half the limit, so a full burst plus a window's refill
+    stays within it for any sliding window, which is how IB counts.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window_s: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        if limit < 2:
+            raise ValueError("TokenBucket limit must be at least 2.")
+        self.capacity = limit / 2.0
+        self.rate = self.capacity / float(window_s)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            # The tolerance absorbs float rounding so a sleep of exactly the deficit suffices.
+            while self._tokens < 1.0 - 1e-9:
+                await self._sleep((1.0 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens = max(self._tokens - 1.0, 0.0)
+
+
+class PacingLimiter:
+    """IB historical-data pacing: 60 requests per 10 minutes overall, 6 per 2 seconds per contract."""
+
+    def __init__(
+        self,
+        *,
+        global_limit: int = 60,
+        global_window_s: float = 600.0,
+        key_limit: int = 6,
+        key_window_s: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self._clock = clock
+        self._sleep = sleep
+        self._key_limit = key_limit
+        self._key_window_s = key_window_s
+        self._global = TokenBucket(global_limit, global_window_s, clock=clock, sleep=sleep)
+        self._per_key: dict[str, TokenBucket] = {}
+
+    async def acquire(self, key: str) -> None:
+        bucket = self._per_key.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                self._key_limit, self._key_window_s, clock=self._clock, sleep=self._sleep
+            )
+            self._per_key[key] = bucket
+        await bucket.acquire()
+        await self._global.acquire()
+
+
+class BackfillStore:
+    """Directory of completed chunk files (``<chunk_id>.npz``) for one backfill request."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, chunk: BackfillChunk) -> Path:
+        return self.root / f"{chunk.chunk_id}.npz"
+
+    def has(self, chunk: BackfillChunk) -> bool:
+        return self._path(chunk).exists()
+
+    def save(self, chunk: BackfillChunk, frame: pd.DataFrame) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        columns, tz = frame_to_columns(frame)
+        tmp_path = self._path(chunk).with_suffix(".partial")
+        with tmp_path.open("wb") as handle:
+            np.savez(handle, tz=np.array(tz or ""), **columns)
+        tmp_path.replace(self._path(chunk))
+
+    def load(self) -> pd.DataFrame:
+        """Merge every stored chunk under the ``_clean_ohlcv`` rules."""
+        frames = []
+        for path in sorted(self.root.glob("*.npz")):
+            with np.load(path) as archive:
+                tz = str(archive["tz"]) or None
+                if len(archive["time"]):
+                    frames.append(
+                        columns_to_frame({name: archive[name] for name in archive.files}, tz)
+                    )
+        if not frames:
+            raise ValueError(f"No backfill chunks stored under {self.root}.")
+        return _clean_ohlcv(pd.concat(frames, ignore_index=True))
+
+
+async def backfill_history(
+    client: Any,
+    contract: Any,
+    *,
+    start: datetime,
+    end: datetime,
+    bar_size: str,
+    store: BackfillStore,
+    what_to_show: str = "TRADES",
+    use_rth: int = 1,
+    limiter: PacingLimiter | None = None,
+    concurrency: int = 4,
+) -> pd.DataFrame:
+    """Fetch ``[start, end)`` in IB-sized chunks over one connected client and merge them.
+
+    Chunks already present in ``store`` are skipped; each new chunk is saved as soon as
+    it arrives, so an interrupted job resumes where it stopped. Up to ``concurrency``
+    requests are in flight, each admitted by ``limiter``. A chunk whose request errored
+    or timed out (which ib_async may report as empty bars) is never saved; failed chunks
+    are reported after every other chunk has finished.
+    """
+    limiter = limiter or PacingLimiter()
+    gate = asyncio.Semaphore(max(1, int(concurrency)))
+    key = f"{getattr(contract, 'conId', '')}:{getattr(contract, 'symbol', '')}:{what_to_show}"
+    pending = [chunk for chunk in plan_chunks(start, end, bar_size) if not store.has(chunk)]
+
+    async def fetch(chunk: BackfillChunk) -> None:
+        async with gate:
+            await limiter.acquire(key)
+            frame = await client.fetch_historical_bars(
+                contract,
+                end_datetime=chunk.end,
+                duration=chunk.duration,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                use_rth=use_rth,
+            )
+        store.save(chunk, frame.reset_index(drop=True))
+
+    results = await asyncio.gather(*(fetch(chunk) for chunk in pending), return_exceptions=True)
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures:
+        raise RuntimeError(
+            f"Backfill failed for {len(failures)} of {len(pending)} chunks; rerun to resume."
+        ) from failures[0]
+    return store.load()
+
+
+def backfill_store(settings: Settings) -> BackfillStore:
+    """Chunk store for the configured contract, bar size, and data type (duration is not part of it)."""
+    name = "_".join(
+        str(part).replace(" ", "")
+        for part in (
+            settings.ib_symbol,
+            settings.ib_contract_id,
+            settings.ib_bar_size,
+            settings.ib_what_to_show,
+            f"rth{settings.ib_use_rth}",
+        )
+    )
+    return BackfillStore(settings.data_dir / "backfill" / name)
+
+
+async def run_backfill(
+    settings: Settings, *, start: datetime, end: datetime, concurrency: int = 4
+) -> dict[str, Any]:
+    store = backfill_store(settings)
+    client = _make_client(settings)
+    await client.connect()
+    try:
+        contract = TWS_Wrapper_Client.get_contract(
+            symbol=settings.ib_symbol,
+            contract_id=settings.ib_contract_id,
+            exchange=settings.ib_exchange,
+        )
+        frame = await backfill_history(
+            client,
+            contract,
+            start=start,
+            end=end,
+            bar_size=settings.ib_bar_size,
+            store=store,
+            what_to_show=settings.ib_what_to_show,
+            use_rth=settings.ib_use_rth,
+            concurrency=concurrency,
+        )
+    finally:
+        await client.disconnect()
+    return {
+        "status": "ok",
+        "run_type": "backfill",
+        "symbol": settings.ib_symbol,
+        "bar_size": settings.ib_bar_size,
+        "rows": len(frame),
+        "first_bar": frame["time"].iloc[0].isoformat() if len(frame) else None,
+        "last_bar": frame["time"].iloc[-1].isoformat() if len(frame) else None,
+        "store": str(store.root),
+    }
@@ -0,0 +1,396 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, time, tzinfo
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from qsa.schemas.data import Bar, BarHistory
+
+
+class RingBuffer:
+    """Fixed-capacity FIFO of scalars backed by a preallocated NumPy array.
+
+    Appending overwrites the oldest value once the buffer is full, so memory and
+    per-append cost stay constant no matter how many values have been pushed.
+    Negative indexes count back from the newest value.
+    """
+
+    __slots__ = ("_next", "_size", "_values")
+
+    def __init__(self, capacity: int, dtype: Any = np.float64) -> None:
+        if capacity <= 0:
+            raise ValueError(f"RingBuffer capacity must be positive. Got {capacity}.")
+        self._values = np.zeros(int(capacity), dtype=dtype)
+        self._next = 0
+        self._size = 0
+
+    @property
+    def capacity(self) -> int:
+        return len(self._values)
+
+    @property
+    def full(self) -> bool:
+        return self._size == len(self._values)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: Any) -> None:
+        self._values[self._next] = value
+        self._next = (self._next + 1) % len(self._values)
+        if self._size < len(self._values):
+            self._size += 1
+
+    def extend(self, values: Any) -> None:
+        """Append many values; only the newest ``capacity`` of them are kept."""
+        array = np.asarray(values, dtype=self._values.dtype)[-len(self._values) :]
+        for value in array:
+            self.append(value)
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def __getitem__(self, index: int) -> Any:
+        position = int(index)
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError("RingBuffer index out of range")
+        start = (self._next - self._size) % len(self._values)
+        return self._values[(start + position) % len(self._values)]
+
+    def to_array(self) -> np.ndarray:
+        """Return the buffered values oldest-first as a new array."""
+        start = (self._next - self._size) % len(self._values)
+        return np.roll(self._values, -start)[: self._size]
+
+
+class BarStore:
+    """Growable columnar OHLCV store for one live bar subscription.
+
+    Times are int64 nanoseconds (UTC for tz-aware series, wall clock otherwise), as in
+    ``BarHistory``. :meth:`upsert` overwrites the forming last bar or appends a newer
+    one at O(1) amortized cost; appending (or :meth:`seal`) completes the previous bar and
+    wakes every :meth:`completed_bars` iterator. :meth:`view` wraps the backing arrays
+    without copying.
+    """
+
+    __slots__ = ("_changed", "_closed", "_sealed", "_size", "_times", "_tz", "_values", "version")
+
+    def __init__(self, tz: tzinfo | None = None, capacity: int = 64) -> None:
+        self._times = np.empty(max(int(capacity), 1), dtype=np.int64)
+        self._values = np.empty((5, len(self._times)), dtype=np.float64)
+        self._size = 0
+        self._tz = tz
+        self._changed = asyncio.Event()
+        self._closed = False
+        self._sealed = False
+        self.version = 0
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> BarStore:
+        """Seed a store from a cleaned OHLCV frame sorted by time."""
+        history = BarHistory.from_frame(frame)
+        store = cls(tz=history.tz, capacity=2 * len(history))
+        rows = len(history)
+        store._times[:rows] = history.times
+        for row, column in enumerate(
+            (history.opens, history.highs, history.lows, history.closes, history.volumes)
+        ):
+            store._values[row, :rows] = column
+        store._size = rows
+        return store
+
+    @property
+    def tz(self) -> tzinfo | None:
+        return self._tz
+
+    @property
+    def completed(self) -> int:
+        """Number of finished bars; every row but the forming last one, unless it was sealed."""
+        return self._size if self._sealed else max(self._size - 1, 0)
+
+    def last_row(self) -> tuple[int, float, float, float, float, float] | None:
+        """The newest bar as ``(time_ns, open, high, low, close, volume)``, or None when empty."""
+        if not self._size:
+            return None
+        row = self._size - 1
+        open, high, low, close, volume = self._values[:, row].tolist()
+        return int(self._times[row]), open, high, low, close, volume
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._times)
+        self._times = np.resize(self._times, capacity)
+        values = np.empty((5, capacity), dtype=np.float64)
+        values[:, : self._size] = self._values[:, : self._size]
+        self._values = values
+
+    def upsert(
+        self, time_ns: int, open: float, high: float, low: float, close: float, volume: float
+    ) -> bool:
+        """Update the last bar if ``time_ns`` matches it, append if newer; return True on append.
+
+        Bars older than the last one are ignored.
+        """
+        row = self._size - 1
+        if row >= 0 and time_ns < self._times[row]:
+            return False
+        appended = row < 0 or time_ns > self._times[row]
+        if appended:
+            if self._size == len(self._times):
+                self._grow()
+            row = self._size
+            self._size += 1
+            self._times[row] = time_ns
+            self._sealed = False
+        self._values[:, row] = (open, high, low, close, volume)
+        self.version += 1
+        if appended and self._size > 1:
+            self._notify()
+        return appended
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def seal(self) -> None:
+        """Complete the last bar now instead of when the next one arrives."""
+        if self._size and not self._sealed:
+            self._sealed = True
+            self._notify()
+
+    def close(self) -> None:
+        """End every :meth:`completed_bars` iterator once it has drained the finished bars."""
+        self._closed = True
+        self._notify()
+
+    def view(self, *, include_forming: bool = True) -> BarHistory:
+        """Zero-copy ``BarHistory`` over the current rows.
+
+        The view keeps its length; with ``include_forming`` its last row may still change.
+        """
+        length = self._size if include_forming else self.completed
+        return BarHistory(self._times, *self._values, tz=self._tz, length=length)
+
+    def bar(self, index: int) -> Bar:
+        return self.view()[index]
+
+    async def completed_bars(self, *, start: int | None = None) -> AsyncIterator[Bar]:
+        """Yield finished bars in order, from ``start`` (default: the next to complete)."""
+        cursor = self.completed if start is None else int(start)
+        while True:
+            while cursor < self.completed:
+                yield self.bar(cursor)
+                cursor += 1
+            if self._closed:
+                return
+            await self._changed.wait()
+
+
+class BarAggregator:
+    """Roll fixed-length source bars (IB's 5-second real-time bars) up into ``store``.
+
+    Buckets of ``bar_seconds`` are aligned to local midnight in ``tz``. With a ``session``
+    (open, close) window, source bars outside it are dropped and the first and last buckets
+    are clipped to the open and close, the way IB labels RTH bars (a 1-hour bar at 09:30,
+    then 10:00). The source bar that ends on a bucket's close seals the bar, so it
+    completes at the boundary instead of when the next bar starts. If that source bar never
+    arrives, the next bucket's first bar completes it. Each update is O(1). Stored times
+    follow ``store``: UTC for tz-aware stores, wall clock in ``tz`` otherwise.
+    """
+
+    __slots__ = (
+        "_bucket_ns",
+        "_close",
+        "_high",
+        "_low",
+        "_open",
+        "_session",
+        "_volume",
+        "bar_seconds",
+        "source_seconds",
+        "store",
+        "tz",
+    )
+
+    def __init__(
+        self,
+        store: BarStore,
+        bar_seconds: int,
+        *,
+        tz: tzinfo | None = None,
+        session: tuple[time, time] | None = None,
+        source_seconds: int = 5,
+    ) -> None:
+        if not 0 < bar_seconds <= 86_400 or bar_seconds % source_seconds:
+            raise ValueError(
+                f"Bar size must be a multiple of {source_seconds}s up to one day. Got {bar_seconds}s."
+            )
+        if session is not None and session[0] >= session[1]:
+            raise ValueError(f"Session must open before it closes. Got {session[0]}-{session[1]}.")
+        self.store = store
+        self.bar_seconds = int(bar_seconds)
+        self.source_seconds = int(source_seconds)
+        self.tz = tz or UTC
+        self._session = (
+            None
+            if session is None
+            else tuple(
+                moment.hour * 3_600 + moment.minute * 60 + moment.second for moment in session
+            )
+        )
+        self._bucket_ns: int | None = None
+        self._open = self._high = self._low = self._close = self._volume = 0.0
+
+    def add(
+        self, start_ns: int, open: float, high: float, low: float, close: float, volume: float
+    ) -> bool:
+        """Fold in the source bar starting at ``start_ns`` (UTC); True when it completed a bar."""
+        start_s = start_ns // 1_000_000_000
+        offset = self.tz.utcoffset(datetime.fromtimestamp(start_s, self.tz))
+        local_s = start_s + (int(offset.total_seconds()) if offset is not None else 0)
+        second_of_day = local_s % 86_400
+        origin, close_at = 0, 86_400
+        if self._session is not None:
+            origin, close_at = self._session
+            if not origin <= second_of_day < close_at:
+                return False
+        aligned = second_of_day // self.bar_seconds * self.bar_seconds
+        bucket = max(aligned, origin)
+        bucket_local_s = local_s - second_of_day + bucket
+        bucket_ns = (
+            bucket_local_s - (local_s - start_s) if self.store.tz is not None else bucket_local_s
+        ) * 1_000_000_000
+
+        if bucket_ns != self._bucket_ns:
+            last = self.store.last_row()
+            if last is not None and last[0] > bucket_ns:
+                return False
+            self._bucket_ns = bucket_ns
+            if last is not None and last[0] == bucket_ns:
+                # Resume a bar the seeding history already started.
+                _, self._open, self._high, self._low, self._close, self._volume = last
+                self._high, self._low = max(self._high, high), min(self._low, low)
+                self._volume += volume
+            else:
+                self._open, self._high, self._low, self._volume = open, high, low, volume
+        else:
+            self._high, self._low = max(self._high, high), min(self._low, low)
+            self._volume += volume
+        self._close = close
+        self.store.upsert(bucket_ns, self._open, self._high, self._low, self._close, self._volume)
+        if second_of_day + self.source_seconds >= min(aligned + self.bar_seconds, close_at):
+            self.store.seal()
+            return True
+        return False
+
+
+class TickBuffer:
+    """Fixed-capacity ring of market-data updates for one symbol in preallocated NumPy columns.
+
+    Each row holds the exchange and local receive times (int64 ns) plus the float64
+    ``FIELDS``. ``volume`` and ``notional`` are the shares and ``price * size`` traded in
+    that update, so VWAP stays exact when one update carries several trades. Appending
+    writes in place and overwrites the oldest row once full. Queries take the newest
+    ``n`` rows (default: all buffered), oldest first, and return new arrays.
+    """
+
+    FIELDS = ("bid", "ask", "last", "bid_size", "ask_size", "last_size", "volume", "notional")
+
+    __slots__ = ("_next", "_size", "_times", "_values", "count")
+
+    def __init__(self, capacity: int = 4096) -> None:
+        if capacity <= 0:
+            raise ValueError(f"TickBuffer capacity must be positive. Got {capacity}.")
+        self._times = np.zeros((2, int(capacity)), dtype=np.int64)
+        self._values = np.full((len(self.FIELDS), int(capacity)), np.nan, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        self.count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._times.shape[1]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        exchange_ns: int,
+        receive_ns: int,
+        bid: float,
+        ask: float,
+        last: float,
+        bid_size: float,
+        ask_size: float,
+        last_size: float,
+        volume: float = 0.0,
+        notional: float = 0.0,
+    ) -> None:
+        row = self._next
+        times, values = self._times, self._values
+        times[0, row] = exchange_ns
+        times[1, row] = receive_ns
+        values[0, row] = bid
+        values[1, row] = ask
+        values[2, row] = last
+        values[3, row] = bid_size
+        values[4, row] = ask_size
+        values[5, row] = last_size
+        values[6, row] = volume
+        values[7, row] = notional
+        self._next = (row + 1) % times.shape[1]
+        if self._size < times.shape[1]:
+            self._size += 1
+        self.count += 1
+
+    def clear(self) -> None:
+        self._next = 0
+        self._size = 0
+
+    def _tail(self, array: np.ndarray, n: int | None) -> np.ndarray:
+        """The newest ``n`` columns of ``array`` oldest first; a view unless the ring wraps."""
+        size = self._size if n is None else min(max(int(n), 0), self._size)
+        start = (self._next - size) % self.capacity
+        if start + size <= self.capacity:
+            return array[..., start : start + size]
+        return np.concatenate((array[..., start:], array[..., : self._next]), axis=-1)
+
+    def exchange_times(self, n: int | None = None) -> np.ndarray:
+        return self._tail(self._times[0], n).copy()
+
+    def receive_times(self, n: int | None = None) -> np.ndarray:
+        """Local ``time.monotonic_ns`` receive stamps; only differences between them are meaningful."""
+        return self._tail(self._times[1], n).copy()
+
+    def column(self, name: str, n: int | None = None) -> np.ndarray:
+        try:
+            row = self.FIELDS.index(name)
+        except ValueError:
+            raise ValueError(
+                f"Unknown tick field {name!r}; expected one of {self.FIELDS}."
+            ) from None
+        return self._tail(self._values[row], n).copy()
+
+    def mid(self, n: int | None = None) -> np.ndarray:
+        bid, ask = self._tail(self._values[:2], n)
+        return (bid + ask) / 2.0
+
+    def spread(self, n: int | None = None) -> np.ndarray:
+        bid, ask = self._tail(self._values[:2], n)
+        return ask - bid
+
+    def vwap(self, n: int | None = None) -> float:
+        """Volume-weighted trade price over the newest ``n`` updates; NaN if nothing traded."""
+        volume, notional = self._tail(self._values[6:], n)
+        traded = float(np.nansum(volume))
+        return float(np.nansum(notional)) / traded if traded > 0.0 else float("nan")
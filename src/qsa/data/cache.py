@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from qsa.config.settings import Settings
+
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(frozen=True)
+class CachedDataset:
+    key: str
+    frame: pd.DataFrame
+    meta: dict[str, Any]
+    expired: bool
+
+    @property
+    def dataset_id(self) -> str:
+        return str(self.meta["dataset_id"])
+
+
+def request_fields(settings: Settings) -> dict[str, Any]:
+    """The historical-request fields that identify a cached dataset."""
+    return {
+        "source": settings.data_source,
+        "symbol": settings.ib_symbol,
+        "contract_id": settings.ib_contract_id,
+        "exchange": settings.ib_exchange,
+        "duration": settings.ib_duration,
+        "bar_size": settings.ib_bar_size,
+        "what_to_show": settings.ib_what_to_show,
+        "use_rth": settings.ib_use_rth,
+    }
+
+
+def request_key(settings: Settings) -> str:
+    payload = json.dumps(request_fields(settings), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def frame_to_columns(frame: pd.DataFrame) -> tuple[dict[str, np.ndarray], str | None]:
+    """Split a cleaned OHLCV frame into int64-ns times plus float64 columns."""
+    times = pd.DatetimeIndex(frame["time"]).as_unit("ns")
+    columns = {"time": times.asi8}
+    columns.update({name: frame[name].to_numpy(dtype=np.float64) for name in PRICE_COLUMNS})
+    return columns, (str(times.tz) if times.tz is not None else None)
+
+
+def columns_to_frame(columns: dict[str, np.ndarray], tz: str | None) -> pd.DataFrame:
+    times = pd.DatetimeIndex(np.asarray(columns["time"], dtype="datetime64[ns]"))
+    if tz is not None:
+        times = times.tz_localize("UTC").tz_convert(tz)
+    frame = pd.DataFrame({"time": times})
+    for name in PRICE_COLUMNS:
+        frame[name] = np.asarray(columns[name], dtype=np.float64)
+    return frame
+
+
+class DatasetCache:
+    """Local cache of cleaned historical datasets keyed by request parameters.
+
+    Each entry is an uncompressed ``.npz`` of columnar arrays (int64-ns ``time`` and
+    float64 OHLCV) plus a small JSON sidecar with the request, dataset id, fetch
+    time, and last access time. Entries older than ``ttl_s`` load as expired; the
+    least recently used entries are evicted once the cache exceeds ``max_bytes``.
+    """
+
+    def __init__(self, root: Path, *, ttl_s: float, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.ttl_s = float(ttl_s)
+        self.max_bytes = int(max_bytes)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> DatasetCache:
+        return cls(
+            settings.data_dir / "cache" / "datasets",
+            ttl_s=settings.cache_ttl_s,
+            max_bytes=settings.cache_max_bytes,
+        )
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.root / f"{key}.npz", self.root / f"{key}.json"
+
+    def load(self, key: str) -> CachedDataset | None:
+        """Return the cached entry for ``key`` (possibly expired), or None on a miss."""
+        data_path, meta_path = self._paths(key)
+        if not data_path.exists() or not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text())
+        with np.load(data_path) as archive:
+            frame = columns_to_frame(
+                {name: archive[name] for name in archive.files}, meta.get("tz")
+            )
+        now = time.time()
+        meta["last_access"] = now
+        meta_path.write_text(json.dumps(meta, indent=2, sort_keys=True))
+        expired = now - float(meta.get("fetched_at", 0.0)) > self.ttl_s
+        return CachedDataset(key=key, frame=frame, meta=meta, expired=expired)
+
+    def store(self, key: str, frame: pd.DataFrame, meta: dict[str, Any]) -> CachedDataset:
+        self.root.mkdir(parents=True, exist_ok=True)
+        data_path, meta_path = self._paths(key)
+        columns, tz = frame_to_columns(frame)
+        tmp_path = data_path.with_suffix(".tmp.npz")
+        np.savez(tmp_path, **columns)
+        tmp_path.replace(data_path)
+
+        now = time.time()
+        payload = {**meta, "key": key, "tz": tz, "rows": len(frame)}
+        payload.setdefault("fetched_at", now)
+        payload["last_access"] = now
+        meta_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        self.evict(keep=key)
+        return CachedDataset(key=key, frame=frame, meta=payload, expired=False)
+
+    def evict(self, keep: str | None = None) -> list[str]:
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        entries: list[tuple[float, str, int]] = []
+        for meta_path in self.root.glob("*.json"):
+            key = meta_path.stem
+            data_path = self.root / f"{key}.npz"
+            size = meta_path.stat().st_size + (
+                data_path.stat().st_size if data_path.exists() else 0
+            )
+            try:
+                last_access = float(json.loads(meta_path.read_text()).get("last_access", 0.0))
+            except (OSError, ValueError):
+                last_access = 0.0
+            entries.append((last_access, key, size))
+
+        total = sum(size for _, _, size in entries)
+        evicted: list[str] = []
+        for _, key, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                path.unlink(missing_ok=True)
+            total -= size
+            evicted.append(key)
+        return evicted
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime
+
+# Approximate lengths of IB duration units; months/years are rounded up so a
+# computed window never falls short of the requested one.
+_DURATION_UNIT_SECONDS = {
+    "S": 1,
+    "D": 86_400,
+    "W": 7 * 86_400,
+    "M": 31 * 86_400,
+    "Y": 366 * 86_400,
+}
+
+_BAR_UNIT_SECONDS = {
+    "sec": 1,
+    "secs": 1,
+    "min": 60,
+    "mins": 60,
+    "hour": 3_600,
+    "hours": 3_600,
+    "day": 86_400,
+    "days": 86_400,
+    "week": 7 * 86_400,
+    "weeks": 7 * 86_400,
+    "month": 31 * 86_400,
+    "months": 31 * 86_400,
+}
+
+
+def duration_seconds(duration: str) -> int:
+    """Length of an IB duration string such as ``"90 D"`` or ``"1 Y"`` in seconds."""
+    parts = duration.split()
+    if len(parts) != 2 or parts[1].upper() not in _DURATION_UNIT_SECONDS:
+        raise ValueError(f"Unsupported IB duration: {duration!r}")
+    return int(parts[0]) * _DURATION_UNIT_SECONDS[parts[1].upper()]
+
+
+def bar_size_seconds(bar_size: str) -> int:
+    """Length of an IB bar size such as ``"5 mins"`` or ``"1 day"`` in seconds."""
+    parts = bar_size.split()
+    if len(parts) != 2 or parts[1].lower() not in _BAR_UNIT_SECONDS:
+        raise ValueError(f"Unsupported IB bar size: {bar_size!r}")
+    return int(parts[0]) * _BAR_UNIT_SECONDS[parts[1].lower()]
+
+
+def tail_duration(last_bar: datetime, bar_size: str, now: datetime | None = None) -> str:
+    """Smallest IB duration that re-covers ``last_bar`` (which may have been partial) up to ``now``.
+
+    Intraday bars use second granularity while the gap is under a day; daily and
+    larger bars, and longer gaps, use whole days with one day of overlap.
+    """
+    if now is None:
+        now = datetime.now(last_bar.tzinfo)
+    gap = max((now - last_bar).total_seconds(), 0.0)
+    bar_seconds = bar_size_seconds(bar_size)
+    if bar_seconds < 86_400 and gap + bar_seconds < 86_400:
+        return f"{max(math.ceil(gap) + bar_seconds, 60)} S"
+    return f"{math.ceil(gap / 86_400) + 1} D"
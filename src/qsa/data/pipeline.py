@@ -2,16 +2,28 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+from collections.abc import Awaitable, Callable, Sequence
 from datetime import UTC, datetime
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from qsa.config.settings import Settings
+from qsa.data.cache import (
+    CachedDataset,
+    DatasetCache,
+    frame_to_columns,
+    request_fields,
+    request_key,
+)
+from qsa.data.durations import bar_size_seconds, duration_seconds, tail_duration
+from qsa.execution.contracts import ContractCache
+from qsa.execution.gateway import GatewayClient
 from qsa.execution.tws_client import TWS_Wrapper_Client
-from qsa.schemas.artifacts import DatasetSnapshot
-from qsa.schemas.data import Bar
-
+from qsa.ops.latency import span
+from qsa.schemas.artifacts import DatasetPanel, DatasetSnapshot
+from qsa.schemas.data import BarHistory
 
 REQUIRED_COLUMNS = ("time", "open", "high", "low", "close", "volume")
 
@@ -38,7 +50,11 @@ def _clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
     cleaned = df[list(REQUIRED_COLUMNS)].copy()
     cleaned["time"] = pd.to_datetime(cleaned["time"], utc=False)
     cleaned = cleaned.dropna(subset=["time", "open", "high", "low", "close"])
-    cleaned = cleaned.sort_values("time").drop_duplicates(subset=["time"], keep="last").reset_index(drop=True)
+    cleaned = (
+        cleaned.sort_values("time")
+        .drop_duplicates(subset=["time"], keep="last")
+        .reset_index(drop=True)
+    )
 
     for column in ("open", "high", "low", "close", "volume"):
         cleaned[column] = pd.to_numeric(cleaned[column], errors="coerce")
@@ -47,94 +63,302 @@ def _clean_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
     return cleaned
 
 
-def _dataset_digest(cleaned: pd.DataFrame) -> str:
+# Version of the dataset_id fingerprint layout; bump whenever _dataset_digest changes.
+# 1: SHA-256 of the cleaned frame's CSV. 2: chained hash over raw column buffers.
+# 3: independent hashes of epoch-aligned blocks (see docs/architecture.md).
+DATASET_FINGERPRINT_VERSION = 3
+DIGEST_BLOCK_ROWS = 4096
+_FINGERPRINT_DTYPES = {
+    "time": "<i8",
+    "open": "<f8",
+    "high": "<f8",
+    "low": "<f8",
+    "close": "<f8",
+    "volume": "<f8",
+}
+
+
+def _hash_rows(digest: Any, columns: dict[str, np.ndarray], start: int, stop: int) -> None:
+    for name, dtype in _FINGERPRINT_DTYPES.items():
+        digest.update(np.ascontiguousarray(columns[name][start:stop], dtype=dtype).data)
+
+
+def _block_ends(times: np.ndarray) -> np.ndarray:
     """
-    Generate a SHA-256 hash of the cleaned OHLCV DataFrame.
+    Row offsets that end each complete fingerprint block of the sorted int64-ns ``times``.
+
+    Blocks are cells of an epoch-aligned grid ``DIGEST_BLOCK_ROWS`` times the smallest bar
+    spacing wide, so a boundary depends only on bar times and not on where the window starts.
+    The last cell is the trailing partial block.
     """
-    payload = cleaned.to_csv(index=False).encode("utf-8")
-    return hashlib.sha256(payload).hexdigest()
+    if len(times) < 2:
+        return np.empty(0, dtype=np.int64)
+    cells = times // (int(np.diff(times).min()) * DIGEST_BLOCK_ROWS)
+    return np.flatnonzero(cells[1:] != cells[:-1]) + 1
 
 
-def _to_bars(cleaned: pd.DataFrame) -> list[Bar]:
-    """
-    Convert the cleaned OHLCV DataFrame to a list of Bar objects.
+def _digest_checkpoints(cleaned: pd.DataFrame, reuse: Sequence[list[Any]] = ()) -> list[list[Any]]:
     """
-    bars: list[Bar] = []
-    for row in cleaned.itertuples(index=False):
-        bars.append(
-            Bar(
-                time=row.time.to_pydatetime(),
-                open=float(row.open),
-                high=float(row.high),
-                low=float(row.low),
-                close=float(row.close),
-                volume=float(row.volume),
-            )
-        )
-    return bars
+    Hash each complete block of the cleaned frame as ``[first time ns, last time ns, sha256 hex]``.
 
+    A ``reuse`` checkpoint whose first and last times match a block is trusted as-is, so only
+    new or changed blocks are rehashed; callers must only pass checkpoints of unchanged rows.
+    """
+    columns, _ = frame_to_columns(cleaned)
+    times = columns["time"]
+    known = {(first, last): block_hash for first, last, block_hash in reuse}
+    checkpoints: list[list[Any]] = []
+    start = 0
+    for stop in _block_ends(times).tolist():
+        first, last = int(times[start]), int(times[stop - 1])
+        block_hash = known.get((first, last))
+        if block_hash is None:
+            digest = hashlib.sha256()
+            _hash_rows(digest, columns, start, stop)
+            block_hash = digest.hexdigest()
+        checkpoints.append([first, last, block_hash])
+        start = stop
+    return checkpoints
+
+
+def _dataset_digest(cleaned: pd.DataFrame, checkpoints: Sequence[list[Any]] | None = None) -> str:
+    """
+    Generate a SHA-256 fingerprint of the cleaned OHLCV DataFrame.
 
-async def _fetch_ibkr_history(settings: Settings) -> pd.DataFrame:
+    Hashes a ``qsa-ohlcv/<version>|<tz>|<rows>`` header, every block hash, and the trailing
+    partial block. Each block is fed column by column as little-endian buffers (int64
+    epoch-ns time, UTC for tz-aware data, then float64 OHLCV), so no text is produced.
+    Pass ``checkpoints`` from ``_digest_checkpoints`` to avoid rehashing complete blocks.
+    """
+    if checkpoints is None:
+        checkpoints = _digest_checkpoints(cleaned)
+    columns, tz = frame_to_columns(cleaned)
+    header = f"qsa-ohlcv/{DATASET_FINGERPRINT_VERSION}|{tz or ''}|{len(cleaned)}"
+    digest = hashlib.sha256(header.encode("utf-8"))
+    for _, _, block_hash in checkpoints:
+        digest.update(bytes.fromhex(block_hash))
+    tail_start = 0
+    if checkpoints:
+        tail_start = int(np.searchsorted(columns["time"], checkpoints[-1][1], side="right"))
+    _hash_rows(digest, columns, tail_start, len(cleaned))
+    return digest.hexdigest()
+
+
+def _unchanged_prefix(before: pd.DataFrame, after: pd.DataFrame) -> int:
+    """
+    Number of leading rows that are identical in both cleaned frames.
     """
-    Fetch historical data from IBKR and return a DataFrame.
+    left, _ = frame_to_columns(before)
+    right, _ = frame_to_columns(after)
+    count = min(len(before), len(after))
+    same = np.ones(count, dtype=bool)
+    for name, values in left.items():
+        same &= values[:count] == right[name][:count]
+    mismatched = np.flatnonzero(~same)
+    return int(mismatched[0]) if len(mismatched) else count
+
+
+async def _request_history(
+    client: TWS_Wrapper_Client | GatewayClient, settings: Settings, duration: str | None = None
+) -> pd.DataFrame:
+    """
+    Request ``settings.ib_symbol`` history over an already connected client and return a DataFrame.
+
+    ``duration`` overrides ``settings.ib_duration`` for tail refreshes, which may legitimately return no rows.
+    A failed or timed-out request raises (``RuntimeError``/``TimeoutError``) rather than coming back empty.
     """
-    client = TWS_Wrapper_Client(
+    contract = TWS_Wrapper_Client.get_contract(
+        symbol=settings.ib_symbol,
+        contract_id=settings.ib_contract_id,
+        exchange=settings.ib_exchange,
+    )
+    with span("history.request"):
+        frame = await client.fetch_historical_bars(
+            contract,
+            end_datetime="",
+            duration=duration or settings.ib_duration,
+            bar_size=settings.ib_bar_size,
+            what_to_show=settings.ib_what_to_show,
+            use_rth=settings.ib_use_rth,
+            timeout_s=30.0,
+            format_date=1,
+        )
+    frame = frame.reset_index(drop=True)
+    if frame.empty and duration is None:
+        raise ValueError("IBKR historical request returned zero rows.")
+    return frame
+
+
+def _make_client(settings: Settings) -> TWS_Wrapper_Client | GatewayClient:
+    """A client over the local ``qsa gateway`` when one is configured, else a direct TWS session."""
+    if settings.ib_gateway_socket:
+        return GatewayClient(settings.ib_gateway_socket)
+    return TWS_Wrapper_Client(
         host=settings.ib_host,
         port=settings.ib_port,
         client_id=settings.ib_client_id,
         account=settings.ib_account,
+        contract_cache=ContractCache.from_settings(settings),
     )
+
+
+async def _fetch_ibkr_history(settings: Settings, duration: str | None = None) -> pd.DataFrame:
+    """
+    Fetch historical data from IBKR over a dedicated connection and return a DataFrame.
+    """
+    client = _make_client(settings)
     await client.connect()
     try:
-        contract = TWS_Wrapper_Client.get_contract(
-            symbol=settings.ib_symbol,
-            contract_id=settings.ib_contract_id,
-            exchange=settings.ib_exchange,
-        )
-        await client.request_historical_data(
-            contract=contract,
-            duration=settings.ib_duration,
-            bar_size=settings.ib_bar_size,
-            what_to_show=settings.ib_what_to_show,
-            use_rth=settings.ib_use_rth,
-            keep_up_to_date=False,
-        )
-        ready = await client.wait_for_historical_data(settings.ib_symbol, settings.ib_bar_size, timeout_s=30.0)
-        if not ready:
-            raise TimeoutError("Timed out waiting for IBKR historical bars.")
-        frame = client.get_ohlc_data(settings.ib_symbol, settings.ib_bar_size).reset_index(drop=True)
-        if frame.empty:
-            raise ValueError("IBKR historical request returned zero rows.")
-        return frame
+        return await _request_history(client, settings, duration)
     finally:
         await client.disconnect()
 
 
-def build_versioned_dataset(settings: Settings) -> DatasetSnapshot:
+def _cache_dataset(
+    cache: DatasetCache,
+    key: str,
+    cleaned: pd.DataFrame,
+    settings: Settings,
+    *,
+    reuse: Sequence[list[Any]] = (),
+    fetched_at: float | None = None,
+) -> CachedDataset:
     """
-    Retrieve, clean, and version historical OHLCV data from IBKR according to the provided settings.
+    Fingerprint ``cleaned`` (extending the ``reuse`` checkpoints) and write it to the cache.
+    """
+    checkpoints = _digest_checkpoints(cleaned, reuse=reuse)
+    meta: dict[str, Any] = {
+        "dataset_id": _dataset_digest(cleaned, checkpoints),
+        "fingerprint_version": DATASET_FINGERPRINT_VERSION,
+        "checkpoints": checkpoints,
+        "request": request_fields(settings),
+    }
+    if fetched_at is not None:
+        meta["fetched_at"] = fetched_at
+    return cache.store(key, cleaned, meta)
 
-    This function fetches historical bar data from IBKR, cleans and validates the data,
-    generates a unique dataset ID (digest), and constructs a manifest describing the dataset.
-    Returns a DatasetSnapshot containing the cleaned DataFrame, list of Bar objects, and manifest metadata.
 
-    Raises:
-        ValueError: If the data source is not 'ibkr', or if cleaning results in an empty DataFrame.
+def _tail_request(settings: Settings, cached: pd.DataFrame) -> str | None:
+    """
+    IB duration covering the bars missing after the cached frame, or None when a full fetch is cheaper.
+    """
+    if cached.empty:
+        return None
+    last_bar = pd.Timestamp(cached["time"].iloc[-1]).to_pydatetime()
+    tail = tail_duration(last_bar, settings.ib_bar_size)
+    if duration_seconds(tail) >= duration_seconds(settings.ib_duration):
+        return None
+    return tail
+
+
+def _trim_to_duration(cleaned: pd.DataFrame, settings: Settings) -> pd.DataFrame:
+    """
+    Drop rows older than ``settings.ib_duration`` before the end of the last bar, as a full fetch would.
+    """
+    if cleaned.empty:
+        return cleaned
+    window = pd.Timedelta(
+        seconds=duration_seconds(settings.ib_duration) - bar_size_seconds(settings.ib_bar_size)
+    )
+    start = cleaned["time"].iloc[-1] - window
+    first = int(cleaned["time"].searchsorted(start, side="left"))
+    return cleaned.iloc[first:].reset_index(drop=True) if first else cleaned
+
+
+async def _build_dataset(
+    settings: Settings,
+    fetch: Callable[[str | None], Awaitable[pd.DataFrame]],
+    *,
+    refresh: bool = False,
+    offline: bool = False,
+) -> DatasetSnapshot:
+    """
+    Cache-aware dataset build for one symbol; ``fetch(duration)`` performs the IBKR request.
     """
     if settings.data_source != "ibkr":
         raise ValueError(f"Unsupported data source: {settings.data_source}. Expected 'ibkr'.")
+    if refresh and offline:
+        raise ValueError("refresh and offline are mutually exclusive.")
+
+    cache = DatasetCache.from_settings(settings)
+    key = request_key(settings)
+    cached = None if refresh else cache.load(key)
+    if offline and cached is None:
+        raise FileNotFoundError(
+            f"No cached dataset for {settings.ib_symbol} {settings.ib_bar_size} ({key}); run once without --offline."
+        )
 
-    raw = asyncio.run(_fetch_ibkr_history(settings))
-    cleaned = _clean_ohlcv(raw)
-    if cleaned.empty:
-        raise ValueError("No rows left after dataset cleaning.")
+    tail_raw: pd.DataFrame | None = None
+    tail_error: str | None = None
+    tail = None if cached is None or offline else _tail_request(settings, cached.frame)
+    if cached is not None and cached.expired and not offline and tail is not None:
+        try:
+            tail_raw = await fetch(tail)
+        except (RuntimeError, TimeoutError) as exc:
+            # Keep serving the cached history, still expired, so the next run retries the tail.
+            tail_error = str(exc)
+
+    if cached is not None and (offline or not cached.expired or tail_error is not None):
+        cleaned = cached.frame
+        expired = cached.expired
+        if cached.meta.get("fingerprint_version") != DATASET_FINGERPRINT_VERSION:
+            cached = _cache_dataset(
+                cache, key, cleaned, settings, fetched_at=cached.meta["fetched_at"]
+            )
+        dataset_id = cached.dataset_id
+        cache_info = {
+            "key": key,
+            "hit": True,
+            "fetched_at": cached.meta["fetched_at"],
+            "expired": expired,
+        }
+        if tail_error is not None:
+            cache_info["tail_error"] = tail_error
+    elif cached is not None and tail_raw is not None:
+        merged = _clean_ohlcv(pd.concat([cached.frame, tail_raw], ignore_index=True))
+        unchanged = _unchanged_prefix(cached.frame, merged)
+        cleaned = _trim_to_duration(merged, settings)
+        trimmed = len(merged) - len(cleaned)
+        reusable: list[list[Any]] = []
+        if unchanged and cached.meta.get("fingerprint_version") == DATASET_FINGERPRINT_VERSION:
+            # Block boundaries are epoch-aligned, so trimming only invalidates the first block.
+            last_unchanged = int(frame_to_columns(cached.frame)[0]["time"][unchanged - 1])
+            reusable = [
+                checkpoint
+                for checkpoint in cached.meta.get("checkpoints", [])
+                if checkpoint[1] <= last_unchanged
+            ]
+        stored = _cache_dataset(cache, key, cleaned, settings, reuse=reusable)
+        dataset_id = stored.dataset_id
+        cache_info = {
+            "key": key,
+            "hit": True,
+            "fetched_at": stored.meta["fetched_at"],
+            "expired": False,
+            "tail_duration": tail,
+            "tail_rows": int(len(merged) - unchanged),
+            "trimmed_rows": int(trimmed),
+        }
+    else:
+        raw = await fetch(None)
+        cleaned = _clean_ohlcv(raw)
+        if cleaned.empty:
+            raise ValueError("No rows left after dataset cleaning.")
+        stored = _cache_dataset(cache, key, cleaned, settings)
+        dataset_id = stored.dataset_id
+        cache_info = {
+            "key": key,
+            "hit": False,
+            "fetched_at": stored.meta["fetched_at"],
+            "expired": False,
+        }
 
-    dataset_id = _dataset_digest(cleaned)
     manifest = {
         "dataset_id": dataset_id,
+        "fingerprint_version": DATASET_FINGERPRINT_VERSION,
         "created_at": datetime.now(UTC).isoformat(),
         "source": settings.data_source,
-        "rows": int(len(cleaned)),
+        "rows": len(cleaned),
         "request": {
             "symbol": settings.ib_symbol,
             "contract_id": settings.ib_contract_id,
@@ -144,49 +368,184 @@ def build_versioned_dataset(settings: Settings) -> DatasetSnapshot:
             "what_to_show": settings.ib_what_to_show,
             "use_rth": settings.ib_use_rth,
         },
+        "cache": cache_info,
     }
     return DatasetSnapshot(
         dataset_id=dataset_id,
-        bars_frame=cleaned,
-        bars=_to_bars(cleaned),
+        bars=BarHistory.from_frame(cleaned),
         manifest=manifest,
     )
 
 
-async def fetch_ibkr_bars_async(settings: Settings) -> list[Bar]:
+def build_versioned_dataset(
+    settings: Settings, *, refresh: bool = False, offline: bool = False
+) -> DatasetSnapshot:
+    """
+    Retrieve, clean, and version historical OHLCV data from IBKR according to the provided settings.
+
+    This function fetches historical bar data from IBKR, cleans and validates the data,
+    generates a unique dataset ID (digest), and constructs a manifest describing the dataset.
+    Returns a DatasetSnapshot holding the cleaned bars as a columnar BarHistory and manifest metadata.
+
+    Cleaned datasets are cached under ``<data_dir>/cache/datasets`` keyed by the request
+    parameters. A fresh cache entry (younger than ``cache_ttl_s``) is returned without
+    contacting TWS; ``refresh`` forces a new fetch, and ``offline`` serves any cached
+    entry regardless of age and never connects. An expired entry is topped up by
+    requesting only the tail since its last bar and merging it with the ``_clean_ohlcv``
+    rules (later rows win on duplicate times). The merged history is trimmed back to the
+    ``ib_duration`` window ending at its last bar, so it matches what a full fetch would
+    return. Fingerprint blocks sit on an epoch-aligned grid, so the cached hashes of every
+    unchanged block survive the trim and only the first and the new blocks are rehashed.
+    If the tail request fails (e.g. a pacing violation or timeout) the cached entry is
+    served unchanged and still expired, with the error recorded as ``cache.tail_error``.
+
+    Raises:
+        ValueError: If the data source is not 'ibkr', if both ``refresh`` and ``offline`` are set,
+            or if cleaning results in an empty DataFrame.
+        FileNotFoundError: If ``offline`` is set and no cached dataset matches the request.
+    """
+    return asyncio.run(
+        _build_dataset(
+            settings,
+            lambda duration: _fetch_ibkr_history(settings, duration),
+            refresh=refresh,
+            offline=offline,
+        )
+    )
+
+
+def _symbol_settings(settings: Settings, symbol: str) -> Settings:
+    """Settings for one universe member; the configured contract id only applies to ``ib_symbol``."""
+    if symbol == settings.ib_symbol:
+        return settings
+    return settings.model_copy(update={"ib_symbol": symbol, "ib_contract_id": 0})
+
+
+async def build_dataset_panel_async(
+    settings: Settings,
+    symbols: Sequence[str],
+    *,
+    concurrency: int = 8,
+    timeout_s: float = 60.0,
+    retries: int = 2,
+    retry_backoff_s: float = 1.0,
+    refresh: bool = False,
+    offline: bool = False,
+) -> DatasetPanel:
+    """
+    Build cached, versioned datasets for a symbol universe over one shared IBKR connection.
+
+    Each symbol goes through the same cache/tail-refresh/fingerprint path as
+    ``build_versioned_dataset``. At most ``concurrency`` symbols are in flight; each
+    attempt is bounded by ``timeout_s`` and retried up to ``retries`` times with
+    exponential backoff. Symbols that still fail (or miss the cache when ``offline``)
+    are reported in ``DatasetPanel.errors`` instead of failing the whole universe.
+    With ``offline`` no connection is opened.
+    """
+    if settings.data_source != "ibkr":
+        raise ValueError(f"Unsupported data source: {settings.data_source}. Expected 'ibkr'.")
+    unique = list(dict.fromkeys(str(symbol) for symbol in symbols))
+    client = None if offline else _make_client(settings)
+    gate = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def load(symbol: str) -> DatasetSnapshot:
+        symbol_settings = _symbol_settings(settings, symbol)
+
+        async def fetch(duration: str | None) -> pd.DataFrame:
+            if client is None:
+                raise FileNotFoundError(f"No cached dataset for {symbol} and offline is set.")
+            return await _request_history(client, symbol_settings, duration)
+
+        attempt = 0
+        while True:
+            try:
+                async with gate:
+                    return await asyncio.wait_for(
+                        _build_dataset(symbol_settings, fetch, refresh=refresh, offline=offline),
+                        timeout=timeout_s,
+                    )
+            except FileNotFoundError:
+                raise
+            except Exception:
+                if attempt >= retries:
+                    raise
+                await asyncio.sleep(retry_backoff_s * 2**attempt)
+                attempt += 1
+
+    if client is not None:
+        await client.connect()
+    try:
+        results = await asyncio.gather(*(load(symbol) for symbol in unique), return_exceptions=True)
+    finally:
+        if client is not None:
+            await client.disconnect()
+
+    datasets: dict[str, DatasetSnapshot] = {}
+    errors: dict[str, str] = {}
+    for symbol, result in zip(unique, results):
+        if isinstance(result, BaseException):
+            errors[symbol] = f"{type(result).__name__}: {result}"
+        else:
+            datasets[symbol] = result
+    manifest = {
+        "created_at": datetime.now(UTC).isoformat(),
+        "source": settings.data_source,
+        "symbols": list(datasets),
+        "dataset_ids": {symbol: data.dataset_id for symbol, data in datasets.items()},
+        "errors": errors,
+    }
+    return DatasetPanel(datasets=datasets, errors=errors, manifest=manifest)
+
+
+def build_dataset_panel(settings: Settings, symbols: Sequence[str], **kwargs: Any) -> DatasetPanel:
+    """
+    Synchronous wrapper around ``build_dataset_panel_async``.
+    """
+    return asyncio.run(build_dataset_panel_async(settings, symbols, **kwargs))
+
+
+async def fetch_ibkr_bars_async(
+    settings: Settings, client: TWS_Wrapper_Client | GatewayClient | None = None
+) -> BarHistory:
     """
     Asynchronously fetch and process historical OHLCV data from IBKR according to the provided settings.
 
     Retrieves raw historical data, cleans and validates the resulting DataFrame, and converts
-    it into a list of Bar objects. Raises a ValueError if the data source is not IBKR or if
+    it into a columnar BarHistory. Raises a ValueError if the data source is not IBKR or if
     no rows remain after cleaning.
 
     Args:
         settings (Settings): Configuration specifying IBKR connection and data parameters.
+        client (TWS_Wrapper_Client | None): Already connected client to reuse; a dedicated
+            connection is opened and closed when omitted.
 
     Returns:
-        list[Bar]: List of cleaned and parsed Bar objects.
+        BarHistory: Cleaned bars; ``Bar`` objects are only built when rows are indexed.
     """
     if settings.data_source != "ibkr":
         raise ValueError(f"Unsupported data source: {settings.data_source}. Expected 'ibkr'.")
-    raw = await _fetch_ibkr_history(settings)
-    cleaned = _clean_ohlcv(raw)
-    if cleaned.empty:
-        raise ValueError("No rows left after dataset cleaning.")
-    return _to_bars(cleaned)
-
-
-def fetch_ibkr_bars(settings: Settings) -> list[Bar]:
+    if client is not None:
+        raw = await _request_history(client, settings)
+    else:
+        raw = await _fetch_ibkr_history(settings)
+    with span("history.clean"):
+        cleaned = _clean_ohlcv(raw)
+        if cleaned.empty:
+            raise ValueError("No rows left after dataset cleaning.")
+        return BarHistory.from_frame(cleaned)
+
+
+def fetch_ibkr_bars(settings: Settings) -> BarHistory:
     """
     Synchronously fetch and process historical OHLCV data from IBKR.
 
-    Runs the asynchronous IBKR data retrieval and cleaning logic, returning a list of
-    Bar objects. This function blocks until the asynchronous task completes.
+    Runs the asynchronous IBKR data retrieval and cleaning logic, returning a columnar
+    BarHistory. This function blocks until the asynchronous task completes.
 
     Args:
         settings (Settings): Configuration specifying IBKR connection and data parameters.
 
     Returns:
-        list[Bar]: List of cleaned and parsed Bar objects.
+        BarHistory: Cleaned bars; ``Bar`` objects are only built when rows are indexed.
     """
     return asyncio.run(fetch_ibkr_bars_async(settings))
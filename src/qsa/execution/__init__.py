@@ -3,4 +3,3 @@
 from qsa.execution.tws_client import TWS_Wrapper_Client
 
 __all__ = ["TWS_Wrapper_Client"]
-
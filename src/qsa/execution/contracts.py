@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+from ib_async import Contract
+
+from qsa.config.settings import Settings
+
+# Contract fields worth keeping once TWS has resolved them; everything else is derivable.
+_PERSISTED_FIELDS = (
+    "conId",
+    "symbol",
+    "secType",
+    "exchange",
+    "primaryExchange",
+    "currency",
+    "localSymbol",
+    "tradingClass",
+)
+
+
+def contract_key(contract: Contract) -> str:
+    """Cache key for an unqualified request: security type, symbol, exchange, and currency."""
+    return ":".join(
+        str(getattr(contract, name, "") or "")
+        for name in ("secType", "symbol", "exchange", "currency")
+    )
+
+
+class ContractCache:
+    """Qualified IB contracts keyed by request, resolved once and reused across processes.
+
+    ``qualify`` asks TWS (``qualifyContractsAsync``) only on a miss; concurrent misses for
+    the same key share one request. With a ``path``, resolved contracts are written to a
+    JSON file so later processes skip the lookup entirely. Contracts that already carry a
+    ``conId`` are returned untouched.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self._contracts: dict[str, dict[str, Any]] = {}
+        self._pending: dict[str, asyncio.Task[Contract]] = {}
+        if self.path is not None and self.path.exists():
+            payload = json.loads(self.path.read_text())
+            self._contracts.update(payload.get("contracts", {}))
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> ContractCache:
+        return cls(settings.data_dir / "cache" / "contracts.json")
+
+    def __len__(self) -> int:
+        return len(self._contracts)
+
+    def get(self, contract: Contract) -> Contract | None:
+        """The cached qualified contract for ``contract``'s request, or None on a miss."""
+        fields = self._contracts.get(contract_key(contract))
+        return Contract(**fields) if fields is not None else None
+
+    def put(self, key: str, contract: Contract) -> None:
+        self._contracts[key] = {name: getattr(contract, name) for name in _PERSISTED_FIELDS}
+        self._save()
+
+    async def qualify(self, ib: Any, contract: Contract) -> Contract:
+        if int(getattr(contract, "conId", 0) or 0) > 0:
+            return contract
+        key = contract_key(contract)
+        cached = self.get(contract)
+        if cached is not None:
+            return cached
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._resolve(ib, key, contract))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _resolve(self, ib: Any, key: str, contract: Contract) -> Contract:
+        request = Contract(**{name: getattr(contract, name) for name in _PERSISTED_FIELDS})
+        qualified = (await ib.qualifyContractsAsync(request))[0]
+        if not isinstance(qualified, Contract) or int(qualified.conId or 0) <= 0:
+            raise ValueError(f"IBKR could not resolve a unique contract for {key}.")
+        self.put(key, qualified)
+        return qualified
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"contracts": self._contracts}
+        tmp_path = self.path.with_suffix(".tmp.json")
+        tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+        tmp_path.replace(self.path)
@@ -0,0 +1,593 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import Callable, Mapping
+from datetime import UTC, date, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from eventkit import Event
+from ib_async import (
+    IB,
+    AccountValue,
+    BarData,
+    BarDataList,
+    CommissionReport,
+    Contract,
+    Execution,
+    Fill,
+    OrderStatus,
+    PortfolioItem,
+    Position,
+    RealTimeBar,
+    RealTimeBarList,
+    RequestError,
+    TickData,
+    Ticker,
+    Trade,
+    TradeLogEntry,
+)
+
+from qsa.data.durations import bar_size_seconds, duration_seconds
+
+# IB error code for a historical-data pacing violation.
+PACING_VIOLATION = 162
+# IB error code for an order rejected by TWS or the exchange.
+ORDER_REJECTED = 201
+_DAILY_BAR_SIZES = frozenset({"1 day", "1 week", "1 month"})
+
+
+def _symbol(contract: Any) -> str:
+    return str(getattr(contract, "localSymbol", None) or getattr(contract, "symbol", None) or "")
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+class FakeIB:
+    """In-process stand-in for ``ib_async.IB`` covering the surface ``TWS_Wrapper_Client`` uses.
+
+    Historical requests are served from per-symbol OHLCV frames (see :meth:`from_directory`),
+    windowed by ``endDateTime`` and ``durationStr``, and any symbol qualifies to a stable conId.
+    Orders move PendingSubmit -> Submitted and market (or marketable limit) orders fill at the
+    symbol's last price, updating positions, cash, fills, and account values and emitting the
+    same events, with real ib_async objects, as TWS would. ``max_fill_shares`` splits fills into
+    partial executions of at most that size, one per ``latency_s``, leaving the rest working.
+    Rejections also emit error 201. Every reply is delayed by ``latency_s``. With ``pacing_limit`` set, historical
+    requests beyond that many per ``pacing_window_s`` fail with error 162, raised as a
+    ``RequestError`` when ``RaiseRequestErrors`` is set and returned as empty bars otherwise.
+    :meth:`push_bar` drives ``keepUpToDate`` subscriptions, :meth:`push_realtime_bar` drives
+    ``reqRealTimeBars`` and :meth:`push_tick` drives ``reqMktData`` tickers through
+    ``pendingTickersEvent``.
+    """
+
+    RaiseRequestErrors = False
+
+    def __init__(
+        self,
+        history: Mapping[str, pd.DataFrame] | None = None,
+        *,
+        account: str = "DU0000001",
+        cash: float = 100_000.0,
+        latency_s: float = 0.0,
+        pacing_limit: int | None = None,
+        pacing_window_s: float = 600.0,
+        commission_per_share: float = 0.0,
+        reject_symbols: frozenset[str] = frozenset(),
+        max_fill_shares: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        for name in IB.events:
+            setattr(self, name, Event(name))
+        self.account = account
+        self.cash = float(cash)
+        self.latency_s = float(latency_s)
+        self.pacing_limit = pacing_limit
+        self.pacing_window_s = float(pacing_window_s)
+        self.commission_per_share = float(commission_per_share)
+        self.reject_symbols = frozenset(reject_symbols)
+        self.max_fill_shares = max_fill_shares
+        self._clock = clock
+        self._history = {
+            symbol: self._normalize(frame) for symbol, frame in (history or {}).items()
+        }
+        self._prices = {
+            symbol: float(frame["close"].iloc[-1])
+            for symbol, frame in self._history.items()
+            if len(frame)
+        }
+        self._contracts: dict[str, Contract] = {}
+        self._positions: dict[str, tuple[float, float]] = {}
+        self._trades: dict[int, Trade] = {}
+        self._fills: list[Fill] = []
+        self._subscriptions: dict[str, list[BarDataList]] = {}
+        self._realtime_subscriptions: dict[str, list[RealTimeBarList]] = {}
+        self._tickers: dict[str, Ticker] = {}
+        self._requests: deque[float] = deque()
+        self._connected = False
+        self._next_order_id = 0
+        self._next_req_id = 0
+        self._con_ids: dict[str, int] = {}
+        self.request_count = 0
+        self.qualify_count = 0
+
+    @classmethod
+    def from_directory(cls, root: Path, **kwargs: Any) -> FakeIB:
+        """Serve ``<SYMBOL>.csv`` files (``time,open,high,low,close,volume``) from ``root``."""
+        history = {path.stem: pd.read_csv(path) for path in sorted(Path(root).glob("*.csv"))}
+        return cls(history, **kwargs)
+
+    @staticmethod
+    def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+        normalized = frame[["time", "open", "high", "low", "close", "volume"]].copy()
+        normalized["time"] = pd.to_datetime(normalized["time"])
+        return normalized.sort_values("time").reset_index(drop=True)
+
+    # Connection -------------------------------------------------------------
+
+    async def _reply(self) -> None:
+        await asyncio.sleep(self.latency_s)
+
+    def _later(self, callback: Callable[..., None], *args: Any) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            callback(*args)
+            return
+        loop.call_later(self.latency_s, callback, *args)
+
+    async def connectAsync(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 7497,
+        clientId: int = 1,
+        account: str = "",
+        **kwargs: Any,
+    ) -> FakeIB:
+        del host, port, clientId, kwargs
+        await self._reply()
+        self.account = account or self.account
+        self._connected = True
+        self.connectedEvent.emit()
+        return self
+
+    def isConnected(self) -> bool:
+        return self._connected
+
+    def disconnect(self) -> None:
+        if self._connected:
+            self._connected = False
+            self.disconnectedEvent.emit()
+
+    def managedAccounts(self) -> list[str]:
+        return [self.account]
+
+    async def reqAllOpenOrdersAsync(self) -> list[Trade]:
+        await self._reply()
+        return self.openTrades()
+
+    def reqAutoOpenOrders(self, autoBind: bool = True) -> None:
+        del autoBind
+
+    async def reqExecutionsAsync(self, execFilter: Any = None) -> list[Fill]:
+        del execFilter
+        await self._reply()
+        return self.fills()
+
+    # Contracts ---------------------------------------------------------------
+
+    async def qualifyContractsAsync(
+        self, *contracts: Contract, returnAll: bool = False
+    ) -> list[Contract]:
+        """Give each symbol a stable conId and fill in the fields TWS would, in place."""
+        del returnAll
+        await self._reply()
+        for contract in contracts:
+            self.qualify_count += 1
+            symbol = _symbol(contract)
+            contract.conId = self._con_ids.setdefault(symbol, 100_000 + len(self._con_ids))
+            contract.secType = contract.secType or "STK"
+            contract.currency = contract.currency or "USD"
+            contract.primaryExchange = contract.primaryExchange or "NASDAQ"
+            contract.localSymbol = symbol
+            contract.tradingClass = symbol
+        return list(contracts)
+
+    # Market data -------------------------------------------------------------
+
+    def set_price(self, symbol: str, price: float) -> None:
+        self._prices[symbol] = float(price)
+
+    def reqMktData(self, contract: Contract, *args: Any, **kwargs: Any) -> Ticker:
+        del args, kwargs
+        symbol = _symbol(contract)
+        price = self._prices.get(symbol, float("nan"))
+        ticker = Ticker(contract=contract, time=datetime.now(UTC), bid=price, ask=price, last=price)
+        self._tickers[symbol] = ticker
+        return ticker
+
+    def push_tick(
+        self,
+        symbol: str,
+        bid: float,
+        ask: float,
+        *,
+        last: float | None = None,
+        size: float = 0.0,
+        bid_size: float = 100.0,
+        ask_size: float = 100.0,
+        when: datetime | None = None,
+    ) -> None:
+        """Update the subscribed ticker's quote (and a trade of ``size`` at ``last``) and emit it."""
+        ticker = self._tickers[symbol]
+        now = when or datetime.now(UTC)
+        ticker.time = now
+        ticker.bid, ticker.ask, ticker.bidSize, ticker.askSize = bid, ask, bid_size, ask_size
+        ticker.ticks = []
+        if last is not None:
+            ticker.last, ticker.lastSize, ticker.lastTimestamp = last, size, now
+            ticker.ticks.append(TickData(now, 4, last, size))
+            self._prices[symbol] = float(last)
+        self.pendingTickersEvent.emit({ticker})
+
+    def _pacing_violated(self) -> bool:
+        now = self._clock()
+        while self._requests and now - self._requests[0] >= self.pacing_window_s:
+            self._requests.popleft()
+        if self.pacing_limit is not None and len(self._requests) >= self.pacing_limit:
+            return True
+        self._requests.append(now)
+        return False
+
+    async def reqHistoricalDataAsync(
+        self,
+        contract: Contract,
+        endDateTime: datetime | date | str | None,
+        durationStr: str,
+        barSizeSetting: str,
+        whatToShow: str,
+        useRTH: bool,
+        formatDate: int = 1,
+        keepUpToDate: bool = False,
+        chartOptions: Any = (),
+        timeout: float = 60,
+    ) -> BarDataList:
+        del chartOptions, timeout
+        await self._reply()
+        self.request_count += 1
+        self._next_req_id += 1
+        bars = BarDataList()
+        bars.reqId = self._next_req_id
+        bars.contract = contract
+        bars.endDateTime = endDateTime
+        bars.durationStr = durationStr
+        bars.barSizeSetting = barSizeSetting
+        bars.whatToShow = whatToShow
+        bars.useRTH = useRTH
+        bars.formatDate = formatDate
+        bars.keepUpToDate = keepUpToDate
+        bars.chartOptions = []
+        if self._pacing_violated():
+            message = "Historical Market Data Service error message:API historical data query cancelled: pacing violation"
+            self.errorEvent.emit(bars.reqId, PACING_VIOLATION, message, contract)
+            if self.RaiseRequestErrors:
+                raise RequestError(bars.reqId, PACING_VIOLATION, message)
+            return bars
+
+        symbol = _symbol(contract)
+        frame = self._history.get(symbol)
+        if frame is not None and len(frame):
+            bars.extend(self._window(frame, endDateTime, durationStr, barSizeSetting, formatDate))
+        if keepUpToDate:
+            self._subscriptions.setdefault(symbol, []).append(bars)
+        return bars
+
+    def _window(
+        self, frame: pd.DataFrame, end: Any, duration: str, bar_size: str, format_date: int
+    ) -> list[BarData]:
+        times = pd.DatetimeIndex(frame["time"])
+        utc_times = times.tz_localize("UTC") if times.tz is None else times.tz_convert("UTC")
+        if isinstance(end, datetime):
+            stop = pd.Timestamp(_utc(end))
+            keep = utc_times < stop
+        elif isinstance(end, date):
+            stop = pd.Timestamp(_utc(datetime.combine(end, datetime.min.time())))
+            keep = utc_times < stop
+        else:
+            stop = utc_times[-1] + pd.Timedelta(seconds=bar_size_seconds(bar_size))
+            keep = utc_times < stop
+        keep &= utc_times >= stop - pd.Timedelta(seconds=duration_seconds(duration))
+        daily = bar_size in _DAILY_BAR_SIZES
+        rows = frame.loc[keep]
+        return [
+            BarData(
+                date=self._bar_date(stamp, daily, format_date),
+                open=float(open_),
+                high=float(high),
+                low=float(low),
+                close=float(close),
+                volume=float(volume),
+            )
+            for stamp, open_, high, low, close, volume in zip(
+                rows["time"], rows["open"], rows["high"], rows["low"], rows["close"], rows["volume"]
+            )
+        ]
+
+    @staticmethod
+    def _bar_date(stamp: pd.Timestamp, daily: bool, format_date: int) -> date | datetime:
+        if daily:
+            return stamp.date()
+        value = stamp.to_pydatetime()
+        return _utc(value) if format_date == 2 else value
+
+    def cancelHistoricalData(self, bars: BarDataList) -> None:
+        subscribed = self._subscriptions.get(_symbol(bars.contract), [])
+        if bars in subscribed:
+            subscribed.remove(bars)
+
+    def push_bar(
+        self,
+        symbol: str,
+        when: datetime,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+    ) -> None:
+        """Update (same ``when``) or append a bar on every ``keepUpToDate`` subscription for ``symbol``."""
+        self._prices[symbol] = float(close)
+        for bars in self._subscriptions.get(symbol, []):
+            daily = bars.barSizeSetting in _DAILY_BAR_SIZES
+            bar = BarData(
+                date=self._bar_date(pd.Timestamp(when), daily, bars.formatDate),
+                open=float(open),
+                high=float(high),
+                low=float(low),
+                close=float(close),
+                volume=float(volume),
+            )
+            has_new_bar = not bars or bars[-1].date != bar.date
+            if has_new_bar:
+                bars.append(bar)
+            else:
+                bars[-1] = bar
+            bars.updateEvent.emit(bars, has_new_bar)
+            self.barUpdateEvent.emit(bars, has_new_bar)
+
+    def reqRealTimeBars(
+        self,
+        contract: Contract,
+        barSize: int,
+        whatToShow: str,
+        useRTH: bool,
+        realTimeBarsOptions: Any = (),
+    ) -> RealTimeBarList:
+        del realTimeBarsOptions
+        self._next_req_id += 1
+        bars = RealTimeBarList()
+        bars.reqId = self._next_req_id
+        bars.contract = contract
+        bars.barSize = barSize
+        bars.whatToShow = whatToShow
+        bars.useRTH = useRTH
+        bars.realTimeBarsOptions = []
+        self._realtime_subscriptions.setdefault(_symbol(contract), []).append(bars)
+        return bars
+
+    def cancelRealTimeBars(self, bars: RealTimeBarList) -> None:
+        subscribed = self._realtime_subscriptions.get(_symbol(bars.contract), [])
+        if bars in subscribed:
+            subscribed.remove(bars)
+
+    def push_realtime_bar(
+        self,
+        symbol: str,
+        when: datetime,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float = 0.0,
+    ) -> None:
+        """Deliver the 5-second bar starting at ``when`` to every ``reqRealTimeBars`` subscription."""
+        self._prices[symbol] = float(close)
+        for bars in self._realtime_subscriptions.get(symbol, []):
+            bars.append(
+                RealTimeBar(
+                    time=_utc(when),
+                    endTime=-1,
+                    open_=float(open),
+                    high=float(high),
+                    low=float(low),
+                    close=float(close),
+                    volume=float(volume),
+                )
+            )
+            bars.updateEvent.emit(bars, True)
+            self.barUpdateEvent.emit(bars, True)
+
+    # Orders -----------------------------------------------------------------
+
+    def placeOrder(self, contract: Contract, order: Any) -> Trade:
+        now = datetime.now(UTC)
+        existing = self._trades.get(order.orderId) if order.orderId else None
+        if existing is not None:
+            existing.order = order
+            existing.log.append(TradeLogEntry(now, existing.orderStatus.status, "Modify"))
+            self.orderModifyEvent.emit(existing)
+            self._later(self._work_order, existing)
+            return existing
+        self._next_order_id += 1
+        order.orderId = self._next_order_id
+        order.clientId = 0
+        status = OrderStatus(orderId=order.orderId, status=OrderStatus.PendingSubmit)
+        trade = Trade(contract, order, status, [], [TradeLogEntry(now, status.status)])
+        self._trades[order.orderId] = trade
+        self._contracts.setdefault(_symbol(contract), contract)
+        self.newOrderEvent.emit(trade)
+        self._later(self._work_order, trade)
+        return trade
+
+    def _set_status(self, trade: Trade, status: str, message: str = "") -> None:
+        trade.orderStatus.status = status
+        trade.log.append(TradeLogEntry(datetime.now(UTC), status, message))
+        self.orderStatusEvent.emit(trade)
+        trade.statusEvent.emit(trade)
+
+    def _work_order(self, trade: Trade) -> None:
+        if trade.orderStatus.status in OrderStatus.DoneStates:
+            return
+        symbol = _symbol(trade.contract)
+        order = trade.order
+        if symbol in self.reject_symbols or float(order.totalQuantity) <= 0:
+            message = f"Order rejected - reason: FakeIB rejects {symbol}"
+            self.errorEvent.emit(order.orderId, ORDER_REJECTED, message, trade.contract)
+            self._set_status(trade, OrderStatus.Inactive, "Rejected by FakeIB")
+            return
+        if trade.orderStatus.status != OrderStatus.Submitted:
+            trade.orderStatus.remaining = float(order.totalQuantity) - trade.orderStatus.filled
+            self.openOrderEvent.emit(trade)
+            self._set_status(trade, OrderStatus.Submitted)
+        price = self._prices.get(symbol)
+        if price is None:
+            return
+        buy = order.action == "BUY"
+        if order.orderType == "MKT" or (
+            order.orderType == "LMT"
+            and (price <= order.lmtPrice if buy else price >= order.lmtPrice)
+        ):
+            self._fill(trade, price)
+
+    def _fill(self, trade: Trade, price: float) -> None:
+        order = trade.order
+        symbol = _symbol(trade.contract)
+        status = trade.orderStatus
+        quantity = float(order.totalQuantity) - status.filled
+        if self.max_fill_shares is not None:
+            quantity = min(quantity, float(self.max_fill_shares))
+        cumulative = status.filled + quantity
+        signed = quantity if order.action == "BUY" else -quantity
+        now = datetime.now(UTC)
+        exec_id = f"fake.{order.orderId}.{len(self._fills) + 1}"
+        execution = Execution(
+            execId=exec_id,
+            time=now,
+            acctNumber=self.account,
+            exchange="FAKE",
+            side="BOT" if signed > 0 else "SLD",
+            shares=quantity,
+            price=price,
+            clientId=order.clientId,
+            orderId=order.orderId,
+            cumQty=cumulative,
+            avgPrice=(status.filled * status.avgFillPrice + quantity * price) / cumulative,
+        )
+        commission = self.commission_per_share * quantity
+        fill = Fill(trade.contract, execution, CommissionReport(exec_id, commission, "USD"), now)
+        trade.fills.append(fill)
+        self._fills.append(fill)
+
+        held, average = self._positions.get(symbol, (0.0, 0.0))
+        total = held + signed
+        if total == 0.0:
+            average = 0.0
+        elif held == 0.0 or (held > 0) != (total > 0):
+            average = price
+        elif abs(total) > abs(held):
+            average = (held * average + signed * price) / total
+        self._positions[symbol] = (total, average)
+        self.cash -= signed * price + commission
+
+        status.filled = cumulative
+        status.remaining = float(order.totalQuantity) - cumulative
+        status.avgFillPrice = execution.avgPrice
+        status.lastFillPrice = price
+        self.execDetailsEvent.emit(trade, fill)
+        self.commissionReportEvent.emit(trade, fill, fill.commissionReport)
+        if status.remaining > 0:
+            self._set_status(trade, OrderStatus.Submitted, "Partially filled")
+            self._later(self._work_order, trade)
+        else:
+            self._set_status(trade, OrderStatus.Filled)
+        self.updatePortfolioEvent.emit(self._portfolio_item(symbol))
+        self.positionEvent.emit(Position(self.account, trade.contract, total, average))
+        for value in self.accountValues():
+            self.accountValueEvent.emit(value)
+
+    def cancelOrder(self, order: Any) -> Trade | None:
+        trade = self._trades.get(order.orderId)
+        if trade is None or trade.orderStatus.status in OrderStatus.DoneStates:
+            return trade
+        self.cancelOrderEvent.emit(trade)
+        self._later(self._set_status, trade, OrderStatus.Cancelled)
+        return trade
+
+    def trades(self) -> list[Trade]:
+        return list(self._trades.values())
+
+    def openTrades(self) -> list[Trade]:
+        return [trade for trade in self._trades.values() if trade.isActive()]
+
+    def fills(self) -> list[Fill]:
+        return list(self._fills)
+
+    # Account ----------------------------------------------------------------
+
+    def _portfolio_item(self, symbol: str) -> PortfolioItem:
+        held, average = self._positions.get(symbol, (0.0, 0.0))
+        price = self._prices.get(symbol, average)
+        return PortfolioItem(
+            contract=self._contracts.get(symbol) or Contract(symbol=symbol),
+            position=held,
+            marketPrice=price,
+            marketValue=held * price,
+            averageCost=average,
+            unrealizedPNL=held * (price - average),
+            realizedPNL=0.0,
+            account=self.account,
+        )
+
+    def portfolio(self, account: str = "") -> list[PortfolioItem]:
+        del account
+        return [
+            self._portfolio_item(symbol) for symbol, (held, _) in self._positions.items() if held
+        ]
+
+    def positions(self, account: str = "") -> list[Position]:
+        del account
+        return [
+            Position(
+                self.account, self._contracts.get(symbol) or Contract(symbol=symbol), held, average
+            )
+            for symbol, (held, average) in self._positions.items()
+            if held
+        ]
+
+    def accountValues(self, account: str = "") -> list[AccountValue]:
+        del account
+        market_value = sum(
+            held * self._prices.get(symbol, average)
+            for symbol, (held, average) in self._positions.items()
+        )
+        net_liquidation = self.cash + market_value
+        return [
+            AccountValue(self.account, "CashBalance", f"{self.cash:.2f}", "BASE", ""),
+            AccountValue(
+                self.account, "NetLiquidationByCurrency", f"{net_liquidation:.2f}", "BASE", ""
+            ),
+            AccountValue(
+                self.account, "MaintMarginReq", f"{0.25 * abs(market_value):.2f}", "USD", ""
+            ),
+            AccountValue(
+                self.account,
+                "ExcessLiquidity",
+                f"{net_liquidation - 0.25 * abs(market_value):.2f}",
+                "USD",
+                "",
+            ),
+        ]
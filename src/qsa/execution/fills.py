@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+# Order statuses after which TWS will not fill an order any further.
+_FINAL_STATUSES = frozenset({"Filled", "Cancelled", "ApiCancelled", "Inactive", "ValidationError"})
+_ACKNOWLEDGED_STATUSES = frozenset({"PreSubmitted", "Submitted"}) | _FINAL_STATUSES
+
+
+@dataclass(frozen=True)
+class OrderFill:
+    """One basket order's state; share counts are signed (negative for sells)."""
+
+    order_id: int
+    symbol: str
+    quantity: float
+    status: str
+    filled: float
+    avg_price: float | None
+    position_before: float
+    position: float | None = None
+    message: str = ""
+
+    @property
+    def done(self) -> bool:
+        return self.status in _FINAL_STATUSES
+
+    @property
+    def remaining(self) -> float:
+        return self.quantity - self.filled
+
+
+@dataclass(frozen=True)
+class BasketReport:
+    """Reconciliation of a basket: what was asked for, what filled, and what the book shows."""
+
+    orders: tuple[OrderFill, ...]
+
+    @property
+    def complete(self) -> bool:
+        return all(order.done for order in self.orders)
+
+    @property
+    def filled(self) -> list[str]:
+        return [order.symbol for order in self.orders if order.done and order.remaining == 0]
+
+    @property
+    def partial(self) -> list[str]:
+        return [order.symbol for order in self.orders if order.filled and order.remaining]
+
+    @property
+    def rejected(self) -> list[str]:
+        return [
+            order.symbol
+            for order in self.orders
+            if order.done and not order.filled and order.remaining
+        ]
+
+    @property
+    def pending(self) -> list[str]:
+        return [order.symbol for order in self.orders if not order.done]
+
+    @property
+    def unfilled(self) -> dict[str, float]:
+        """Signed shares still missing per symbol."""
+        return {order.symbol: order.remaining for order in self.orders if order.remaining}
+
+    @property
+    def mismatched(self) -> dict[str, float]:
+        """Symbols whose reported position differs from the starting position plus fills."""
+        return {
+            order.symbol: order.position - (order.position_before + order.filled)
+            for order in self.orders
+            if order.position is not None and order.position != order.position_before + order.filled
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "complete": self.complete,
+            "filled": self.filled,
+            "partial": self.partial,
+            "rejected": self.rejected,
+            "pending": self.pending,
+            "unfilled": self.unfilled,
+            "mismatched": self.mismatched,
+            "orders": [asdict(order) for order in self.orders],
+        }
+
+
+class FillTracker:
+    """Follow a basket of submitted orders to their final state through ib_async events.
+
+    ``orderStatusEvent`` drives each order's status and cumulative fill, ``execDetailsEvent``
+    accumulates its executions (deduplicated by ``execId``), and ``errorEvent`` keeps the
+    reason for a rejection. Whichever of the two fill sources is further ahead wins, since
+    TWS may report ``Filled`` before the last execution arrives. Each order's :meth:`result`
+    resolves once TWS reports a final status; :meth:`wait` resolves when all have.
+    ``position_of`` reads the account's position for the reconciliation in :meth:`report`.
+    The tracker detaches from the events once every order is final, or on :meth:`close`.
+    """
+
+    def __init__(self, ib: Any, *, position_of: Callable[[str], float] | None = None) -> None:
+        self.ib = ib
+        self._position_of = position_of
+        self._orders: dict[int, dict[str, Any]] = {}
+        self._results: dict[int, asyncio.Future[OrderFill]] = {}
+        self._executions: set[str] = set()
+        self._attached = True
+        ib.orderStatusEvent += self._on_status
+        ib.execDetailsEvent += self._on_execution
+        ib.errorEvent += self._on_error
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def track(self, symbol: str, quantity: float, trade: Any) -> int:
+        """Start following ``trade``, a ``quantity``-share (signed) order for ``symbol``."""
+        order_id = int(getattr(trade.order, "orderId", 0))
+        self._orders[order_id] = {
+            "symbol": symbol,
+            "quantity": float(quantity),
+            "sign": 1.0 if quantity > 0 else -1.0,
+            "status": "",
+            "shares": 0.0,
+            "notional": 0.0,
+            "reported": 0.0,
+            "reported_price": 0.0,
+            "position_before": self._position_of(symbol) if self._position_of is not None else 0.0,
+            "message": "",
+        }
+        self._results[order_id] = asyncio.get_running_loop().create_future()
+        for fill in getattr(trade, "fills", []):
+            self._on_execution(trade, fill)
+        self._on_status(trade)
+        return order_id
+
+    @property
+    def order_ids(self) -> list[int]:
+        return list(self._orders)
+
+    def result(self, order_id: int) -> asyncio.Future[OrderFill]:
+        """Future for one order's final ``OrderFill``."""
+        return self._results[int(order_id)]
+
+    @property
+    def acknowledged(self) -> bool:
+        """True once TWS has accepted or finally rejected every order."""
+        return all(state["status"] in _ACKNOWLEDGED_STATUSES for state in self._orders.values())
+
+    async def wait(self, *, timeout_s: float = 30.0) -> BasketReport:
+        """Report once every order is final, or after ``timeout_s`` with the rest left ``pending``."""
+        if self._results:
+            await asyncio.wait(list(self._results.values()), timeout=float(timeout_s))
+        return self.report()
+
+    def report(self) -> BasketReport:
+        return BasketReport(tuple(self._snapshot(order_id) for order_id in self._orders))
+
+    def close(self) -> None:
+        if not self._attached:
+            return
+        self._attached = False
+        self.ib.orderStatusEvent -= self._on_status
+        self.ib.execDetailsEvent -= self._on_execution
+        self.ib.errorEvent -= self._on_error
+
+    def _snapshot(self, order_id: int) -> OrderFill:
+        state = self._orders[order_id]
+        shares = state["shares"]
+        avg_price = state["notional"] / shares if shares else None
+        if state["reported"] > shares:
+            shares, avg_price = state["reported"], state["reported_price"] or None
+        return OrderFill(
+            order_id=order_id,
+            symbol=state["symbol"],
+            quantity=state["quantity"],
+            status=state["status"],
+            filled=state["sign"] * shares,
+            avg_price=avg_price,
+            position_before=state["position_before"],
+            position=self._position_of(state["symbol"]) if self._position_of is not None else None,
+            message=state["message"],
+        )
+
+    def _on_status(self, trade: Any) -> None:
+        order_id = int(getattr(trade.order, "orderId", 0))
+        state = self._orders.get(order_id)
+        if state is None:
+            return
+        status = trade.orderStatus
+        state["status"] = str(getattr(status, "status", ""))
+        state["reported"] = float(getattr(status, "filled", 0.0) or 0.0)
+        state["reported_price"] = float(getattr(status, "avgFillPrice", 0.0) or 0.0)
+        result = self._results[order_id]
+        if state["status"] in _FINAL_STATUSES and not result.done():
+            result.set_result(self._snapshot(order_id))
+            if all(future.done() for future in self._results.values()):
+                self.close()
+
+    def _on_execution(self, trade: Any, fill: Any) -> None:
+        state = self._orders.get(int(getattr(trade.order, "orderId", 0)))
+        execution = fill.execution
+        if state is None or execution.execId in self._executions:
+            return
+        self._executions.add(execution.execId)
+        state["shares"] += float(execution.shares)
+        state["notional"] += float(execution.shares) * float(execution.price)
+
+    def _on_error(self, req_id: int, code: int, message: str, contract: Any) -> None:
+        state = self._orders.get(int(req_id))
+        if state is not None:
+            state["message"] = f"{code}: {message}"
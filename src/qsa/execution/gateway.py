@@ -0,0 +1,502 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from ib_async import Contract
+
+from qsa.config.settings import Settings
+from qsa.data.cache import columns_to_frame, frame_to_columns
+from qsa.execution.contracts import ContractCache
+from qsa.execution.tws_client import TWS_Wrapper_Client, _contract_symbol
+from qsa.ops.signals import install_stop_signals
+
+# Largest JSON line either side accepts; a year of minute bars is well under this.
+_STREAM_LIMIT = 64 * 1024 * 1024
+# Exceptions re-raised as themselves on the client; anything else arrives as RuntimeError.
+_WIRE_ERRORS: dict[str, type[Exception]] = {
+    "ValueError": ValueError,
+    "RuntimeError": RuntimeError,
+    "TimeoutError": TimeoutError,
+    "FileNotFoundError": FileNotFoundError,
+}
+
+
+def _encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _frame_to_wire(frame: pd.DataFrame) -> dict[str, Any]:
+    """Columnar JSON form of a ``_bars_to_df`` frame, epoch-second index included."""
+    columns, tz = frame_to_columns(frame)
+    return {
+        "tz": tz,
+        "index": frame.index.to_numpy(dtype=np.int64).tolist(),
+        "columns": {name: values.tolist() for name, values in columns.items()},
+    }
+
+
+def _frame_from_wire(payload: dict[str, Any]) -> pd.DataFrame:
+    frame = columns_to_frame(payload["columns"], payload["tz"])
+    frame.index = pd.Index(np.asarray(payload["index"], dtype=np.int64))
+    return frame
+
+
+def _contract_to_wire(contract: Contract) -> dict[str, Any]:
+    return {
+        "symbol": str(contract.symbol),
+        "contract_id": int(contract.conId or 0),
+        "exchange": str(contract.exchange or "SMART"),
+    }
+
+
+def default_socket_path(settings: Settings) -> Path:
+    return Path(settings.ib_gateway_socket or settings.data_dir / "gateway.sock")
+
+
+class BrokerGateway:
+    """Serve one warm ``TWS_Wrapper_Client`` session to many local processes over a Unix socket.
+
+    The protocol is one JSON object per line. Requests are ``{"id", "method", "params"}``
+    and get ``{"id", "result"}`` or ``{"id", "error": {"type", "message"}}`` back, in
+    completion order. Position and order changes are pushed to every connection as
+    ``{"event": "position" | "order", ...}`` lines. Identical historical requests that are
+    in flight share one IB request. Non-empty responses to requests with an explicit
+    ``end_datetime`` are cached for ``history_ttl_s``, keeping at most
+    ``history_max_entries``; requests ending now are always refetched, because their newest
+    bar can change at any moment. Orders are never deduplicated.
+    """
+
+    def __init__(
+        self,
+        client: TWS_Wrapper_Client,
+        *,
+        history_ttl_s: float = 60.0,
+        history_max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.history_ttl_s = float(history_ttl_s)
+        self.history_max_entries = int(history_max_entries)
+        self._clock = clock
+        self._history: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task[dict[str, Any]]] = {}
+        self._writers: set[asyncio.StreamWriter] = set()
+        self._server: asyncio.Server | None = None
+        self._socket_path: Path | None = None
+        self.stats = {"requests": 0, "history_fetches": 0, "history_cached": 0, "history_shared": 0}
+        self._methods: dict[str, Callable[..., Awaitable[Any]]] = {
+            "session": self._session,
+            "history": self._history_bars,
+            "account_equity": self._account_equity,
+            "place_market_order": self._place_market_order,
+        }
+
+    async def start(self, socket_path: Path) -> None:
+        """Connect to TWS and start listening on ``socket_path``."""
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            try:
+                _, writer = await asyncio.open_unix_connection(str(socket_path))
+            except OSError:
+                socket_path.unlink()
+            else:
+                writer.close()
+                raise RuntimeError(f"A gateway is already listening on {socket_path}.")
+        socket_path.parent.mkdir(parents=True, exist_ok=True)
+        await self.client.connect()
+        ib = self.client.ib
+        ib.updatePortfolioEvent += self._push_position
+        for event in (
+            ib.newOrderEvent,
+            ib.openOrderEvent,
+            ib.orderStatusEvent,
+            ib.cancelOrderEvent,
+        ):
+            event += self._push_order
+        self._server = await asyncio.start_unix_server(
+            self._serve_connection, path=str(socket_path), limit=_STREAM_LIMIT
+        )
+        self._socket_path = socket_path
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+            ib = self.client.ib
+            ib.updatePortfolioEvent -= self._push_position
+            for event in (
+                ib.newOrderEvent,
+                ib.openOrderEvent,
+                ib.orderStatusEvent,
+                ib.cancelOrderEvent,
+            ):
+                event -= self._push_order
+        for task in self._inflight.values():
+            task.cancel()
+        await self.client.disconnect()
+        if self._socket_path is not None:
+            self._socket_path.unlink(missing_ok=True)
+            self._socket_path = None
+
+    async def serve(self, socket_path: Path, *, stop: asyncio.Event | None = None) -> None:
+        """Run until ``stop`` is set or SIGINT/SIGTERM arrives."""
+        stop = stop or asyncio.Event()
+        restore_signals = install_stop_signals(stop)
+        try:
+            await self.start(socket_path)
+            await stop.wait()
+        finally:
+            restore_signals()
+            await self.close()
+
+    async def _serve_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._writers.add(writer)
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._answer(json.loads(line), writer))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            for task in pending:
+                task.cancel()
+            writer.close()
+
+    async def _answer(self, request: dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        self.stats["requests"] += 1
+        method = self._methods.get(str(request.get("method")))
+        try:
+            if method is None:
+                raise ValueError(f"Unknown gateway method: {request.get('method')}.")
+            result = await method(**request.get("params", {}))
+            reply: dict[str, Any] = {"id": request.get("id"), "result": result}
+        except Exception as exc:  # noqa: BLE001 - every failure is returned to the caller
+            error = {"type": type(exc).__name__, "message": str(exc)}
+            reply = {"id": request.get("id"), "error": error}
+        if not writer.is_closing():
+            writer.write(_encode(reply))
+
+    def _broadcast(self, message: dict[str, Any]) -> None:
+        payload = _encode(message)
+        for writer in self._writers:
+            if not writer.is_closing():
+                writer.write(payload)
+
+    def _push_position(self, item: Any) -> None:
+        # The client's own handler was connected first, so its index is already current.
+        symbol = _contract_symbol(getattr(item, "contract", None))
+        self._broadcast(
+            {"event": "position", "symbol": symbol, "data": self.client.positions_view.get(symbol)}
+        )
+
+    def _push_order(self, trade: Any) -> None:
+        order_id = int(getattr(trade.order, "orderId", 0))
+        self._broadcast(
+            {"event": "order", "order_id": order_id, "data": self.client.orders_view.get(order_id)}
+        )
+
+    async def _session(self) -> dict[str, Any]:
+        return {
+            "accounts": self.client.get_managed_accounts(),
+            "positions": self.client.get_positions(),
+            "orders": {
+                str(order_id): order for order_id, order in self.client.get_orders().items()
+            },
+        }
+
+    async def _history_bars(self, **params: Any) -> dict[str, Any]:
+        key = json.dumps(params, sort_keys=True)
+        cached = self._history.get(key)
+        if cached is not None and self._clock() - cached[0] <= self.history_ttl_s:
+            self._history.move_to_end(key)
+            self.stats["history_cached"] += 1
+            return cached[1]
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_history(**params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["history_shared"] += 1
+        payload = await asyncio.shield(task)
+        if params.get("end_datetime") and payload["columns"]["time"]:
+            self._history[key] = (self._clock(), payload)
+            self._history.move_to_end(key)
+            while len(self._history) > self.history_max_entries:
+                self._history.popitem(last=False)
+        return payload
+
+    async def _fetch_history(
+        self,
+        *,
+        contract: dict[str, Any],
+        duration: str,
+        bar_size: str,
+        what_to_show: str,
+        use_rth: int,
+        end_datetime: str | None,
+        format_date: int,
+        timeout_s: float,
+    ) -> dict[str, Any]:
+        self.stats["history_fetches"] += 1
+        frame = await self.client.fetch_historical_bars(
+            TWS_Wrapper_Client.get_contract(**contract),
+            end_datetime=datetime.fromisoformat(end_datetime) if end_datetime else "",
+            duration=duration,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+            use_rth=use_rth,
+            timeout_s=timeout_s,
+            format_date=format_date,
+        )
+        return _frame_to_wire(frame)
+
+    async def _account_equity(self, *, timeout_s: float) -> float | None:
+        return await self.client.wait_for_account_equity(timeout_s=timeout_s)
+
+    async def _place_market_order(
+        self, *, symbol: str, quantity: float, ack_timeout_s: float
+    ) -> str:
+        return await self.client.place_market_order(symbol, quantity, ack_timeout_s=ack_timeout_s)
+
+
+async def run_gateway(
+    settings: Settings,
+    *,
+    socket_path: Path | None = None,
+    history_ttl_s: float = 60.0,
+    stop: asyncio.Event | None = None,
+) -> dict[str, int]:
+    """``qsa gateway``: hold the configured TWS session open for local processes until stopped."""
+    client = TWS_Wrapper_Client(
+        host=settings.ib_host,
+        port=settings.ib_port,
+        client_id=settings.ib_client_id,
+        account=settings.ib_account,
+        contract_cache=ContractCache.from_settings(settings),
+    )
+    gateway = BrokerGateway(client, history_ttl_s=history_ttl_s)
+    await gateway.serve(socket_path or default_socket_path(settings), stop=stop)
+    return dict(gateway.stats)
+
+
+class GatewayClient:
+    """Drop-in for the ``TWS_Wrapper_Client`` calls the one-shot runners make, served by a gateway.
+
+    ``connect`` opens the socket and loads the session's accounts, positions and orders,
+    which pushed events then keep current, so ``get_position`` stays a local lookup.
+    ``keep_up_to_date`` subscriptions are not available; the live daemon connects directly.
+    """
+
+    get_contract = staticmethod(TWS_Wrapper_Client.get_contract)
+
+    def __init__(self, socket_path: str | Path, *, timeout_s: float = 120.0) -> None:
+        self.socket_path = Path(socket_path)
+        self.timeout_s = float(timeout_s)
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._reader_task: asyncio.Task[None] | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._accounts: list[str] = []
+        self._positions: dict[str, dict[str, Any]] = {}
+        self._orders: dict[int, dict[str, Any]] = {}
+        self._frames: dict[tuple[str, str], pd.DataFrame] = {}
+
+    async def connect(self) -> None:
+        try:
+            reader, self._writer = await asyncio.open_unix_connection(
+                str(self.socket_path), limit=_STREAM_LIMIT
+            )
+        except OSError as exc:
+            raise RuntimeError(
+                f"No qsa gateway is listening on {self.socket_path}; start `qsa gateway`."
+            ) from exc
+        self._reader_task = asyncio.create_task(self._read(reader))
+        session = await self._call("session")
+        self._accounts = list(session["accounts"])
+        self._positions.update(session["positions"])
+        self._orders.update({int(order_id): order for order_id, order in session["orders"].items()})
+
+    async def disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if "event" in message:
+                    self._apply_event(message)
+                    continue
+                future = self._pending.pop(int(message["id"]), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    error = message["error"]
+                    exc_type = _WIRE_ERRORS.get(error["type"])
+                    future.set_exception(
+                        exc_type(error["message"])
+                        if exc_type is not None
+                        else RuntimeError(f"{error['type']}: {error['message']}")
+                    )
+                else:
+                    future.set_result(message["result"])
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RuntimeError("The qsa gateway closed the connection."))
+            self._pending.clear()
+
+    def _apply_event(self, message: dict[str, Any]) -> None:
+        if message["event"] == "position":
+            if message["data"] is None:
+                self._positions.pop(message["symbol"], None)
+            else:
+                self._positions[message["symbol"]] = message["data"]
+        elif message["event"] == "order" and message["data"] is not None:
+            self._orders[int(message["order_id"])] = message["data"]
+
+    async def _call(self, method: str, **params: Any) -> Any:
+        if self._writer is None:
+            raise RuntimeError("GatewayClient is not connected.")
+        request_id = next(self._ids)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(_encode({"id": request_id, "method": method, "params": params}))
+        try:
+            return await asyncio.wait_for(future, self.timeout_s)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def get_managed_accounts(self) -> list[str]:
+        return list(self._accounts)
+
+    @property
+    def positions_view(self) -> MappingProxyType[str, dict[str, Any]]:
+        return MappingProxyType(self._positions)
+
+    @property
+    def orders_view(self) -> MappingProxyType[int, dict[str, Any]]:
+        return MappingProxyType(self._orders)
+
+    def get_positions(self) -> dict[str, dict[str, Any]]:
+        return dict(self._positions)
+
+    def get_position(self, symbol: str) -> float:
+        held = self._positions.get(symbol)
+        return float(held["position"]) if held else 0.0
+
+    def get_orders(self) -> dict[int, dict[str, Any]]:
+        return dict(self._orders)
+
+    def get_order_by_id(self, order_id: int) -> dict[str, Any] | None:
+        return self._orders.get(int(order_id))
+
+    async def _history(self, contract: Contract, **params: Any) -> pd.DataFrame:
+        payload = await self._call("history", contract=_contract_to_wire(contract), **params)
+        return _frame_from_wire(payload)
+
+    async def request_historical_data(
+        self,
+        contract: Contract,
+        duration: str,
+        bar_size: str,
+        *,
+        what_to_show: str = "TRADES",
+        use_rth: int = 1,
+        keep_up_to_date: bool = False,
+        req_id: int | None = None,
+    ) -> None:
+        del req_id
+        if keep_up_to_date:
+            raise ValueError(
+                "keep_up_to_date subscriptions are not available through the qsa gateway."
+            )
+        frame = await self._history(
+            contract,
+            duration=str(duration),
+            bar_size=str(bar_size),
+            what_to_show=str(what_to_show),
+            use_rth=int(use_rth),
+            end_datetime=None,
+            format_date=1,
+            timeout_s=30.0,
+        )
+        self._frames[(_contract_symbol(contract), str(bar_size))] = frame
+
+    async def wait_for_historical_data(
+        self, symbol: str, timeframe: str, *, timeout_s: float = 30.0
+    ) -> bool:
+        # request_historical_data only returns once the bars have arrived.
+        del timeout_s
+        return (symbol, timeframe) in self._frames
+
+    def get_ohlc_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        return self._frames.get((symbol, timeframe), pd.DataFrame())
+
+    async def fetch_historical_bars(
+        self,
+        contract: Contract,
+        *,
+        end_datetime: datetime | str,
+        duration: str,
+        bar_size: str,
+        what_to_show: str = "TRADES",
+        use_rth: int = 1,
+        timeout_s: float = 60.0,
+        format_date: int = 2,
+    ) -> pd.DataFrame:
+        return await self._history(
+            contract,
+            duration=str(duration),
+            bar_size=str(bar_size),
+            what_to_show=str(what_to_show),
+            use_rth=int(use_rth),
+            end_datetime=end_datetime.isoformat()
+            if isinstance(end_datetime, datetime)
+            else end_datetime or None,
+            format_date=int(format_date),
+            timeout_s=float(timeout_s),
+        )
+
+    async def wait_for_account_equity(self, *, timeout_s: float = 5.0) -> float | None:
+        return await self._call("account_equity", timeout_s=timeout_s)
+
+    async def place_market_order(
+        self,
+        symbol: str,
+        quantity: float,
+        price_hint: float | None = None,
+        *,
+        ack_timeout_s: float = 5.0,
+    ) -> str:
+        del price_hint
+        return await self._call(
+            "place_market_order",
+            symbol=symbol,
+            quantity=float(quantity),
+            ack_timeout_s=ack_timeout_s,
+        )
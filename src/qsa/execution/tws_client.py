@@ -1,11 +1,127 @@
 from __future__ import annotations
 
 import asyncio
-from datetime import date, datetime, timedelta
-from typing import Any, cast
-
+import time
+from collections.abc import AsyncIterator, Callable, Mapping
+from datetime import UTC, date, datetime, timedelta, tzinfo
+from datetime import time as clock_time
+from operator import attrgetter
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, cast
+from zoneinfo import ZoneInfo
+
+import numpy as np
 import pandas as pd
-from ib_async import Contract, IB, LimitOrder, MarketOrder, StopOrder
+from ib_async import IB, Contract, LimitOrder, MarketOrder, RealTimeBarList, StopOrder
+
+from qsa.data.buffers import BarAggregator, BarStore, TickBuffer
+from qsa.data.durations import bar_size_seconds
+from qsa.execution.contracts import ContractCache
+from qsa.execution.fills import FillTracker
+from qsa.ops.latency import span
+from qsa.schemas.data import Bar, BarHistory
+
+if TYPE_CHECKING:
+    from qsa.execution.fake_ib import FakeIB
+
+
+_OHLCV_COLUMNS = ("time", "open", "high", "low", "close", "volume")
+_BAR_FIELDS = attrgetter("date", "open", "high", "low", "close", "volume")
+_WALL_EPOCH = datetime(1970, 1, 1)
+# Error 162 text for a window with no bars, which is an answer rather than a failure.
+_NO_DATA_MESSAGE = "query returned no data"
+
+
+def _local_epoch_seconds(naive: pd.DatetimeIndex) -> np.ndarray:
+    """Epoch seconds for naive local datetimes, as ``datetime.timestamp()`` would compute them.
+
+    The local UTC offset is resolved once per distinct wall-clock hour instead of per row.
+    """
+    wall = naive.as_unit("ns").asi8 // 1_000_000_000
+    hours, inverse = np.unique(wall // 3_600, return_inverse=True)
+    offsets = np.fromiter(
+        (
+            int((_WALL_EPOCH + timedelta(hours=int(hour))).timestamp()) - int(hour) * 3_600
+            for hour in hours
+        ),
+        dtype=np.int64,
+        count=len(hours),
+    )
+    return wall + offsets[inverse]
+
+
+def _decode_bar_times(raw: list[Any]) -> tuple[np.ndarray, pd.DatetimeIndex]:
+    """Vectorized ``_to_epoch_and_dt`` over a homogeneous list of IB bar dates.
+
+    Handles ``datetime`` (naive or single-zone aware), ``date``, ``"YYYYMMDD"`` and
+    ``"YYYYMMDD  HH:MM:SS"`` inputs in bulk; anything else falls back to per-value parsing.
+    """
+    kind = type(raw[0])
+    times: pd.DatetimeIndex | None = None
+    if all(type(value) is kind for value in raw):
+        try:
+            if issubclass(kind, date):
+                times = pd.DatetimeIndex(raw)
+            elif issubclass(kind, str):
+                text = pd.Series(raw, dtype=object).str.split().str.join(" ")
+                if text.str.fullmatch(r"\d{8}").all():
+                    times = pd.DatetimeIndex(pd.to_datetime(text, format="%Y%m%d"))
+                elif not text.str.isdigit().any():
+                    times = pd.DatetimeIndex(pd.to_datetime(text, format="%Y%m%d %H:%M:%S"))
+        except (TypeError, ValueError):
+            times = None
+    if times is None:
+        decoded = [TWS_Wrapper_Client._to_epoch_and_dt(value) for value in raw]
+        return np.array([key for key, _ in decoded], dtype=np.int64), pd.DatetimeIndex(
+            [dt for _, dt in decoded]
+        ).as_unit("ns")
+    times = times.as_unit("ns")
+    if times.tz is not None:
+        return times.asi8 // 1_000_000_000, times
+    return _local_epoch_seconds(times), times
+
+
+def _bar_time_ns(raw: Any) -> int:
+    """One IB bar date as int64 nanoseconds on the ``BarHistory`` time scale."""
+    _, dt = TWS_Wrapper_Client._to_epoch_and_dt(raw)
+    return int(pd.Timestamp(dt).as_unit("ns").value)
+
+
+# Last-trade price ticks (live and delayed); ib_async sends each trade's size with them.
+_TRADE_TICK_TYPES = frozenset({4, 68})
+_UTC_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+# Regular trading hours that real-time bars are rolled up within when ``use_rth`` is set.
+US_EQUITY_TZ = ZoneInfo("America/New_York")
+US_EQUITY_RTH = (clock_time(9, 30), clock_time(16, 0))
+# Order statuses that mean TWS has accepted (or finally rejected) an order.
+_ACKNOWLEDGED_STATUSES = frozenset({"PreSubmitted", "Submitted", "Filled"})
+_REJECTED_STATUSES = frozenset({"ValidationError", "ApiCancelled", "Cancelled", "Inactive"})
+
+
+def _store_frame(store: BarStore, start: int = 0) -> pd.DataFrame:
+    """``store`` rows from ``start`` on in the ``_bars_to_df`` layout, indexed by epoch seconds."""
+    view = store.view()
+    if start:
+        view = BarHistory(
+            view.times[start:],
+            view.opens[start:],
+            view.highs[start:],
+            view.lows[start:],
+            view.closes[start:],
+            view.volumes[start:],
+            tz=view.tz,
+        )
+    frame = view.to_frame()
+    times = pd.DatetimeIndex(frame["time"]).as_unit("ns")
+    frame.index = pd.Index(
+        times.asi8 // 1_000_000_000 if times.tz is not None else _local_epoch_seconds(times)
+    )
+    return frame
+
+
+def _contract_symbol(contract: Any) -> str:
+    return str(getattr(contract, "localSymbol", None) or getattr(contract, "symbol", None) or "")
 
 
 def _safe_float(value: Any) -> float | None:
@@ -16,7 +132,12 @@ def _safe_float(value: Any) -> float | None:
 
 
 class TWS_Wrapper_Client:
-    """Async wrapper around ib_async with parity to the legacy TWS helper."""
+    """Async wrapper around ib_async with parity to the legacy TWS helper.
+
+    ``ib`` injects the ``IB`` instance; pass an ``execution.fake_ib.FakeIB`` to run without TWS.
+    Contracts without a ``conId`` are qualified once through ``contract_cache`` (in memory
+    unless one with a path is given) before any order or data request.
+    """
 
     def __init__(
         self,
@@ -25,32 +146,63 @@ class TWS_Wrapper_Client:
         client_id: int,
         ib_account: str | None = None,
         account: str | None = None,
+        *,
+        ib: IB | FakeIB | None = None,
+        contract_cache: ContractCache | None = None,
     ) -> None:
         self.host = host
         self.port = int(port)
         self.client_id = int(client_id)
         self.ib_account = str(ib_account or account or "")
 
-        self.ib = IB()
+        self.ib = ib if ib is not None else IB()
+        self.contracts = contract_cache if contract_cache is not None else ContractCache()
         self.req_mkt_id = 1
         self.req_hist_data_id = 1
         self.req_mkt_map: dict[int, str] = {}
         self.req_hist_map: dict[int, dict[str, str]] = {}
         self.marketdata: dict[str, Any] = {}
+        self._tick_buffers: dict[str, TickBuffer] = {}
+        self._tick_feeds: dict[int, TickBuffer] = {}
         self.ohlc_data: dict[str, dict[str, dict[str, Any]]] = {}
         self._historical_subscriptions: dict[tuple[str, str], Any] = {}
+        self._history_ready: dict[tuple[str, str], asyncio.Event] = {}
+        self._bar_stores: dict[tuple[str, str], BarStore] = {}
+        self._bar_store_versions: dict[tuple[str, str], int] = {}
+
+        # Symbol- and orderId-keyed indexes kept current from ib_async events, so
+        # position and order lookups never walk the session's portfolio or trades.
+        self._positions: dict[str, dict[str, Any]] = {}
+        self._orders: dict[int, dict[str, Any]] = {}
+        self._trades: dict[int, Any] = {}
+        self._positions_view = MappingProxyType(self._positions)
+        self._orders_view = MappingProxyType(self._orders)
+        self.ib.updatePortfolioEvent += self._index_portfolio_item
+        self.ib.disconnectedEvent += self._close_bar_stores
+        self.ib.pendingTickersEvent += self._record_ticks
+        for event in (
+            self.ib.newOrderEvent,
+            self.ib.orderModifyEvent,
+            self.ib.openOrderEvent,
+            self.ib.orderStatusEvent,
+            self.ib.cancelOrderEvent,
+        ):
+            event += self._index_trade
 
     async def connect(self) -> None:
-        await self.ib.connectAsync(
-            host=self.host,
-            port=self.port,
-            clientId=self.client_id,
-            account=self.ib_account,
-        )
-        await self.ib.reqAllOpenOrdersAsync()
-        if self.client_id == 0:
-            self.ib.reqAutoOpenOrders(True)
-        await self.ib.reqExecutionsAsync()
+        with span("ib.handshake"):
+            await self.ib.connectAsync(
+                host=self.host,
+                port=self.port,
+                clientId=self.client_id,
+                account=self.ib_account,
+            )
+        with span("ib.sync_orders"):
+            await self.ib.reqAllOpenOrdersAsync()
+            if self.client_id == 0:
+                self.ib.reqAutoOpenOrders(True)
+            await self.ib.reqExecutionsAsync()
+        self._seed_indexes()
 
     def get_managed_accounts(self) -> list[str]:
         raw_accounts = self.ib.managedAccounts()
@@ -72,19 +224,74 @@ class TWS_Wrapper_Client:
             kwargs["conId"] = int(contract_id)
         return Contract(**kwargs)
 
+    async def qualify_contract(self, contract: Contract) -> Contract:
+        """``contract`` with its ``conId`` resolved, asking TWS only on a cache miss."""
+        with span("ib.qualify"):
+            return await self.contracts.qualify(self.ib, contract)
+
     async def request_market_data(
-        self, contract: Contract, *, delayed: bool = False, req_id: int | None = None
+        self,
+        contract: Contract,
+        *,
+        delayed: bool = False,
+        req_id: int | None = None,
+        tick_capacity: int = 4096,
     ) -> None:
+        """Subscribe to streaming quotes; every update lands in ``tick_buffer(symbol)``."""
         if delayed:
             self.ib.reqMarketDataType(3)
         if req_id is None:
             req_id = self.req_mkt_id
             self.req_mkt_id += 1
 
-        symbol = str(getattr(contract, "localSymbol", None) or getattr(contract, "symbol", None) or req_id)
+        symbol = str(
+            getattr(contract, "localSymbol", None) or getattr(contract, "symbol", None) or req_id
+        )
         self.req_mkt_map[int(req_id)] = symbol
-        self.marketdata[symbol] = self.ib.reqMktData(contract)
-        await asyncio.sleep(0.01)
+        ticker = self.ib.reqMktData(await self.qualify_contract(contract))
+        previous = self.marketdata.get(symbol)
+        if previous is not None:
+            self._tick_feeds.pop(id(previous), None)
+        self.marketdata[symbol] = ticker
+        buffer = self._tick_buffers.get(symbol)
+        if buffer is None or buffer.capacity != int(tick_capacity):
+            buffer = self._tick_buffers[symbol] = TickBuffer(int(tick_capacity))
+        self._tick_feeds[id(ticker)] = buffer
+
+    def _record_ticks(self, tickers: Any) -> None:
+        """Append one row per updated ``Ticker`` to its symbol's ``TickBuffer``."""
+        receive_ns = time.monotonic_ns()
+        for ticker in tickers:
+            buffer = self._tick_feeds.get(id(ticker))
+            if buffer is None:
+                continue
+            volume = notional = 0.0
+            for tick in ticker.ticks:
+                if tick.tickType in _TRADE_TICK_TYPES and tick.size > 0:
+                    volume += tick.size
+                    notional += tick.price * tick.size
+            stamp = ticker.lastTimestamp or ticker.time
+            exchange_ns = (
+                (stamp - _UTC_EPOCH) // _ONE_MICROSECOND * 1000 if stamp is not None else 0
+            )
+            buffer.append(
+                exchange_ns,
+                receive_ns,
+                ticker.bid,
+                ticker.ask,
+                ticker.last,
+                ticker.bidSize,
+                ticker.askSize,
+                ticker.lastSize,
+                volume,
+                notional,
+            )
+
+    def tick_buffer(self, symbol: str) -> TickBuffer:
+        buffer = self._tick_buffers.get(symbol)
+        if buffer is None:
+            raise ValueError(f"No market data subscription for {symbol}.")
+        return buffer
 
     @staticmethod
     def _to_epoch_and_dt(raw: Any) -> tuple[int, datetime]:
@@ -106,28 +313,56 @@ class TWS_Wrapper_Client:
         return int(dt.timestamp()), dt
 
     def _bars_to_df(self, bars: Any) -> pd.DataFrame:
-        df = pd.DataFrame(columns=["time", "open", "high", "low", "close", "volume"])
-        for bar in list(bars):
-            time_key, time_dt = self._to_epoch_and_dt(getattr(bar, "date", ""))
-            df.loc[time_key, ["time", "open", "high", "low", "close", "volume"]] = [
-                time_dt,
-                getattr(bar, "open", None),
-                getattr(bar, "high", None),
-                getattr(bar, "low", None),
-                getattr(bar, "close", None),
-                str(getattr(bar, "volume", "")),
-            ]
-        return df.sort_index()
+        """Decode IB bars into an OHLCV frame indexed by epoch seconds, sorted, last bar per time."""
+        rows = [_BAR_FIELDS(bar) for bar in bars]
+        if not rows:
+            empty = {column: np.empty(0, dtype=np.float64) for column in _OHLCV_COLUMNS}
+            empty["time"] = np.empty(0, dtype="datetime64[ns]")
+            return pd.DataFrame(empty, index=pd.Index([], dtype=np.int64))
+        raw_times, *values = zip(*rows)
+        epoch, times = _decode_bar_times(list(raw_times))
+        order = np.argsort(epoch, kind="stable")
+        ordered = epoch[order]
+        # Stable sort keeps arrival order within a timestamp; keep the last arrival.
+        keep = order[np.append(ordered[1:] != ordered[:-1], True)]
+        frame = pd.DataFrame({"time": times[keep]}, index=pd.Index(epoch[keep]))
+        for column, column_values in zip(_OHLCV_COLUMNS[1:], values):
+            frame[column] = np.array(column_values, dtype=np.float64)[keep]
+        return frame
+
+    def _history_event(self, symbol: str, timeframe: str) -> asyncio.Event:
+        return self._history_ready.setdefault((symbol, timeframe), asyncio.Event())
 
     def _upsert_hist_data(self, symbol: str, timeframe: str, bars: Any) -> None:
         self.ohlc_data.setdefault(symbol, {})
+        data = self._bars_to_df(bars)
         self.ohlc_data[symbol][timeframe] = {
-            "data": self._bars_to_df(bars),
+            "data": data,
             "end": datetime.now(),
             "start_str": "",
             "end_str": "",
         }
         self._historical_subscriptions[(symbol, timeframe)] = bars
+        if not data.empty:
+            self._history_event(symbol, timeframe).set()
+
+    async def _wait_for_event(
+        self, event: Any, predicate: Callable[..., bool], timeout_s: float
+    ) -> tuple[Any, ...] | None:
+        """Wait until an ib_async event emits arguments matching ``predicate``; None on timeout."""
+        future: asyncio.Future[tuple[Any, ...]] = asyncio.get_running_loop().create_future()
+
+        def handler(*args: Any) -> None:
+            if not future.done() and predicate(*args):
+                future.set_result(args)
+
+        event.connect(handler)
+        try:
+            return await asyncio.wait_for(future, timeout=float(timeout_s))
+        except TimeoutError:
+            return None
+        finally:
+            event.disconnect(handler)
 
     async def request_historical_data(
         self,
@@ -144,23 +379,222 @@ class TWS_Wrapper_Client:
             req_id = self.req_hist_data_id
             self.req_hist_data_id += 1
 
-        symbol = str(getattr(contract, "localSymbol", None) or getattr(contract, "symbol", None) or req_id)
+        symbol = str(
+            getattr(contract, "localSymbol", None) or getattr(contract, "symbol", None) or req_id
+        )
         timeframe = str(bar_size)
         self.req_hist_map[int(req_id)] = {"local_symbol": symbol, "timeframe": timeframe}
 
-        bars = await self.ib.reqHistoricalDataAsync(
-            contract=contract,
-            endDateTime="",
-            durationStr=str(duration),
-            barSizeSetting=timeframe,
-            whatToShow=str(what_to_show),
-            useRTH=bool(use_rth),
-            formatDate=1,
-            keepUpToDate=bool(keep_up_to_date),
-            chartOptions=[],
-            timeout=30,
+        qualified = await self.qualify_contract(contract)
+        with span("ib.historical_request"):
+            bars = await self.ib.reqHistoricalDataAsync(
+                contract=qualified,
+                endDateTime="",
+                durationStr=str(duration),
+                barSizeSetting=timeframe,
+                whatToShow=str(what_to_show),
+                useRTH=bool(use_rth),
+                formatDate=1,
+                keepUpToDate=bool(keep_up_to_date),
+                chartOptions=[],
+                timeout=30,
+            )
+        with span("ib.decode_bars"):
+            self._upsert_hist_data(symbol, timeframe, bars)
+        if keep_up_to_date:
+            self._subscribe_bar_store(symbol, timeframe, bars)
+
+    def _subscribe_bar_store(self, symbol: str, timeframe: str, bars: Any) -> None:
+        """Keep a ``BarStore`` current from the subscription's ``updateEvent``."""
+        key = (symbol, timeframe)
+        previous = self._bar_stores.get(key)
+        if previous is not None:
+            previous.close()
+        store = BarStore.from_frame(self.ohlc_data[symbol][timeframe]["data"])
+        self._bar_stores[key] = store
+        self._bar_store_versions[key] = store.version
+
+        def on_update(updated: Any, has_new_bar: bool) -> None:
+            if self._bar_stores.get(key) is not store:
+                return
+            # A new bar also finalizes the one before it, so write both.
+            for bar in updated[-2:] if has_new_bar else updated[-1:]:
+                store.upsert(
+                    _bar_time_ns(bar.date), bar.open, bar.high, bar.low, bar.close, bar.volume
+                )
+
+        bars.updateEvent += on_update
+
+    async def request_realtime_bars(
+        self,
+        contract: Contract,
+        duration: str,
+        bar_size: str,
+        *,
+        what_to_show: str = "TRADES",
+        use_rth: int = 1,
+        tz: tzinfo = US_EQUITY_TZ,
+        session: tuple[clock_time, clock_time] = US_EQUITY_RTH,
+    ) -> None:
+        """Keep ``bar_size`` bars current from one 5-second ``reqRealTimeBars`` stream.
+
+        ``duration`` of history seeds the bar store, then every 5-second bar is rolled up
+        in place (``BarAggregator``), bucketed in ``tz`` and, with ``use_rth``, clipped to
+        ``session``. A bar completes as soon as the 5-second bar ending on its close
+        arrives, so ``stream_bars`` yields it at the boundary rather than with the next
+        bar. ``bar_view``, ``stream_bars``, ``get_ohlc_data`` and
+        ``cancel_historical_subscription`` work as for ``keep_up_to_date``.
+        """
+        symbol = _contract_symbol(contract)
+        timeframe = str(bar_size)
+        key = (symbol, timeframe)
+        qualified = await self.qualify_contract(contract)
+        history = await self.fetch_historical_bars(
+            qualified,
+            end_datetime="",
+            duration=duration,
+            bar_size=timeframe,
+            what_to_show=what_to_show,
+            use_rth=use_rth,
+        )
+        previous = self._bar_stores.get(key)
+        if previous is not None:
+            previous.close()
+        store = BarStore.from_frame(history)
+        aggregator = BarAggregator(
+            store, bar_size_seconds(timeframe), tz=tz, session=session if use_rth else None
         )
-        self._upsert_hist_data(symbol, timeframe, bars)
+        bars = self.ib.reqRealTimeBars(qualified, 5, str(what_to_show), bool(use_rth))
+
+        def on_update(updated: Any, has_new_bar: bool) -> None:
+            if self._bar_stores.get(key) is not store or not has_new_bar:
+                return
+            bar = updated[-1]
+            aggregator.add(
+                int(bar.time.timestamp()) * 1_000_000_000,
+                bar.open_,
+                bar.high,
+                bar.low,
+                bar.close,
+                bar.volume,
+            )
+
+        bars.updateEvent += on_update
+        self._bar_stores[key] = store
+        self._bar_store_versions[key] = store.version
+        self._historical_subscriptions[key] = bars
+        self.ohlc_data.setdefault(symbol, {})[timeframe] = {
+            "data": history,
+            "end": datetime.now(),
+            "start_str": "",
+            "end_str": "",
+        }
+        if not history.empty:
+            self._history_event(symbol, timeframe).set()
+
+    def bar_view(self, symbol: str, timeframe: str, *, include_forming: bool = True) -> BarHistory:
+        """Zero-copy view of a ``keep_up_to_date`` subscription's bars."""
+        return self._bar_store(symbol, timeframe).view(include_forming=include_forming)
+
+    def stream_bars(
+        self, symbol: str, timeframe: str, *, start: int | None = None
+    ) -> AsyncIterator[Bar]:
+        """Async iterator of bars as a ``keep_up_to_date`` subscription completes them.
+
+        ``start`` is the first completed-bar index to yield (default: the next bar to complete,
+        counted when iteration begins). Iteration ends when the subscription is cancelled or
+        the connection drops.
+        """
+        return self._bar_store(symbol, timeframe).completed_bars(start=start)
+
+    def cancel_historical_subscription(self, symbol: str, timeframe: str) -> None:
+        """Stop a ``keep_up_to_date`` subscription and end its ``stream_bars`` iterators."""
+        bars = self._historical_subscriptions.pop((symbol, timeframe), None)
+        store = self._bar_stores.pop((symbol, timeframe), None)
+        self._bar_store_versions.pop((symbol, timeframe), None)
+        if store is not None:
+            store.close()
+            if isinstance(bars, RealTimeBarList):
+                self.ib.cancelRealTimeBars(bars)
+            else:
+                self.ib.cancelHistoricalData(bars)
+
+    def _close_bar_stores(self) -> None:
+        for store in self._bar_stores.values():
+            store.close()
+
+    def _bar_store(self, symbol: str, timeframe: str) -> BarStore:
+        store = self._bar_stores.get((symbol, timeframe))
+        if store is None:
+            raise ValueError(f"No keep_up_to_date subscription for {symbol} {timeframe}.")
+        return store
+
+    async def fetch_historical_bars(
+        self,
+        contract: Contract,
+        *,
+        end_datetime: datetime | str,
+        duration: str,
+        bar_size: str,
+        what_to_show: str = "TRADES",
+        use_rth: int = 1,
+        timeout_s: float = 60.0,
+        format_date: int = 2,
+    ) -> pd.DataFrame:
+        """One bounded historical request ending at ``end_datetime``, returned without caching.
+
+        Unlike ``request_historical_data`` this does not touch ``ohlc_data``, so many
+        chunks can be in flight on the same connection. ``format_date=1`` returns the
+        same local-time bars ``request_historical_data`` does.
+
+        ib_async answers a failed request (e.g. a pacing violation, error 162) or a timeout
+        with empty bars unless ``RaiseRequestErrors`` is set; both raise here instead, so an
+        empty frame always means IBKR had no data for the window.
+        """
+        qualified = await self.qualify_contract(contract)
+        errors: list[tuple[int, int, str]] = []
+
+        def on_error(req_id: int, code: int, message: str, *args: Any) -> None:
+            errors.append((req_id, code, message))
+
+        self.ib.errorEvent += on_error
+        started = time.monotonic()
+        try:
+            with span("ib.historical_request"):
+                bars = await self.ib.reqHistoricalDataAsync(
+                    contract=qualified,
+                    endDateTime=end_datetime,
+                    durationStr=str(duration),
+                    barSizeSetting=str(bar_size),
+                    whatToShow=str(what_to_show),
+                    useRTH=bool(use_rth),
+                    formatDate=int(format_date),
+                    keepUpToDate=False,
+                    chartOptions=[],
+                    timeout=float(timeout_s),
+                )
+        finally:
+            self.ib.errorEvent -= on_error
+        symbol = _contract_symbol(qualified)
+        request_errors = [
+            (code, message)
+            for req_id, code, message in errors
+            if req_id == getattr(bars, "reqId", None)
+        ]
+        for code, message in request_errors:
+            if _NO_DATA_MESSAGE not in message:
+                raise RuntimeError(
+                    f"Historical request for {symbol} failed with error {code}: {message}"
+                )
+        if (
+            not bars
+            and not request_errors
+            and timeout_s
+            and time.monotonic() - started >= timeout_s
+        ):
+            raise TimeoutError(f"Historical request for {symbol} timed out after {timeout_s}s.")
+        with span("ib.decode_bars"):
+            return self._bars_to_df(bars)
 
     def get_account_data(self) -> dict[str, float | None]:
         account_values = self.ib.accountValues(account=self.ib_account)
@@ -190,23 +624,53 @@ class TWS_Wrapper_Client:
             "free_margin": free_margin,
         }
 
-    def get_positions(self) -> dict[str, dict[str, Any]]:
-        positions: dict[str, dict[str, Any]] = {}
+    def _index_portfolio_item(self, item: Any) -> None:
+        if self.ib_account and str(getattr(item, "account", "")) != self.ib_account:
+            return
+        symbol = _contract_symbol(getattr(item, "contract", None))
+        position = _safe_float(getattr(item, "position", 0)) or 0.0
+        if position == 0.0:
+            # ib_async drops flat positions from ib.portfolio(), so the index does too.
+            self._positions.pop(symbol, None)
+            return
+        self._positions[symbol] = {
+            "position": position,
+            "marketPrice": _safe_float(getattr(item, "marketPrice", None)),
+            "marketValue": _safe_float(getattr(item, "marketValue", None)),
+            "averageCost": _safe_float(getattr(item, "averageCost", None)),
+            "unrealizedPNL": _safe_float(getattr(item, "unrealizedPNL", None)),
+            "realizedPNL": _safe_float(getattr(item, "realizedPNL", None)),
+        }
+
+    def _index_trade(self, trade: Any) -> None:
+        serialized = self._serialize_trade(trade)
+        order_id = int(serialized["order_id"])
+        self._trades[order_id] = trade
+        self._orders[order_id] = serialized
+
+    def _seed_indexes(self) -> None:
+        """Rebuild both indexes from ib_async's state; events keep them current afterwards."""
+        self._positions.clear()
+        self._orders.clear()
+        self._trades.clear()
         for item in self.ib.portfolio(account=self.ib_account):
-            symbol = str(
-                getattr(getattr(item, "contract", None), "localSymbol", None)
-                or getattr(getattr(item, "contract", None), "symbol", None)
-                or ""
-            )
-            positions[symbol] = {
-                "position": _safe_float(getattr(item, "position", 0)) or 0.0,
-                "marketPrice": _safe_float(getattr(item, "marketPrice", None)),
-                "marketValue": _safe_float(getattr(item, "marketValue", None)),
-                "averageCost": _safe_float(getattr(item, "averageCost", None)),
-                "unrealizedPNL": _safe_float(getattr(item, "unrealizedPNL", None)),
-                "realizedPNL": _safe_float(getattr(item, "realizedPNL", None)),
-            }
-        return positions
+            self._index_portfolio_item(item)
+        for trade in self.ib.trades():
+            self._index_trade(trade)
+
+    @property
+    def positions_view(self) -> MappingProxyType[str, dict[str, Any]]:
+        """Live read-only mapping of symbol to position fields; entries are replaced, never mutated."""
+        return self._positions_view
+
+    @property
+    def orders_view(self) -> MappingProxyType[int, dict[str, Any]]:
+        """Live read-only mapping of order id to serialized order; entries are replaced, never mutated."""
+        return self._orders_view
+
+    def get_positions(self) -> dict[str, dict[str, Any]]:
+        """Open positions by symbol, as in ``ib.portfolio()``; flat ones are not listed."""
+        return dict(self._positions)
 
     def _serialize_trade(self, trade: Any) -> dict[str, Any]:
         order = getattr(trade, "order", None)
@@ -214,7 +678,9 @@ class TWS_Wrapper_Client:
         order_status = getattr(trade, "orderStatus", None)
         order_id = int(getattr(order, "orderId", 0))
         return {
-            "local_symbol": str(getattr(contract, "localSymbol", None) or getattr(contract, "symbol", "")),
+            "local_symbol": str(
+                getattr(contract, "localSymbol", None) or getattr(contract, "symbol", "")
+            ),
             "commission": _safe_float(getattr(order_status, "commission", None)),
             "commission_currency": getattr(order_status, "commissionCurrency", None),
             "completed_status": getattr(order_status, "completedStatus", None),
@@ -231,14 +697,10 @@ class TWS_Wrapper_Client:
         }
 
     def get_orders(self) -> dict[int, dict[str, Any]]:
-        orders: dict[int, dict[str, Any]] = {}
-        for trade in self.ib.trades():
-            serialized = self._serialize_trade(trade)
-            orders[int(serialized["order_id"])] = serialized
-        return orders
+        return dict(self._orders)
 
     def get_order_by_id(self, order_id: int) -> dict[str, Any] | None:
-        return self.get_orders().get(int(order_id))
+        return self._orders.get(int(order_id))
 
     def get_market_data_price(self, symbol: str) -> dict[str, Any]:
         ticker = self.marketdata.get(symbol)
@@ -248,9 +710,9 @@ class TWS_Wrapper_Client:
             "bid": _safe_float(getattr(ticker, "bid", None)),
             "ask": _safe_float(getattr(ticker, "ask", None)),
             "last": _safe_float(getattr(ticker, "last", None)),
-            "bid_size": str(getattr(ticker, "bidSize", "")),
-            "ask_size": str(getattr(ticker, "askSize", "")),
-            "last_size": str(getattr(ticker, "lastSize", "")),
+            "bid_size": _safe_float(getattr(ticker, "bidSize", None)),
+            "ask_size": _safe_float(getattr(ticker, "askSize", None)),
+            "last_size": _safe_float(getattr(ticker, "lastSize", None)),
             "bid_time": getattr(ticker, "time", None),
             "ask_time": getattr(ticker, "time", None),
             "last_time": getattr(ticker, "time", None),
@@ -264,7 +726,9 @@ class TWS_Wrapper_Client:
             commission_report = getattr(fill, "commissionReport", None)
             trade_report.append(
                 {
-                    "symbol": str(getattr(contract, "localSymbol", None) or getattr(contract, "symbol", "")),
+                    "symbol": str(
+                        getattr(contract, "localSymbol", None) or getattr(contract, "symbol", "")
+                    ),
                     "time": getattr(execution, "time", None),
                     "account": getattr(execution, "acctNumber", None),
                     "action": getattr(execution, "side", None),
@@ -277,31 +741,89 @@ class TWS_Wrapper_Client:
         return trade_report
 
     def get_position(self, symbol: str) -> float:
-        return float(self.get_positions().get(symbol, {}).get("position", 0.0))
+        entry = self._positions.get(symbol)
+        return float(entry["position"]) if entry is not None else 0.0
 
     def get_ohlc_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
-        subscription = self._historical_subscriptions.get((symbol, timeframe))
-        if subscription is not None:
-            self._upsert_hist_data(symbol, timeframe, subscription)
+        """The stored bars as a DataFrame; prefer ``bar_view`` for subscriptions.
+
+        For a ``keep_up_to_date`` or real-time subscription the frame is brought up to date
+        only when its store has changed. Rows before the previously forming bar are kept,
+        so only that bar and the ones after it are decoded, but pandas still copies the
+        whole frame on each change. ``bar_view`` reads the store without copying.
+        """
+        key = (symbol, timeframe)
+        store = self._bar_stores.get(key)
+        if store is not None and self._bar_store_versions.get(key) != store.version:
+            entry = self.ohlc_data[symbol][timeframe]
+            # The store only appends rows or updates its last one.
+            kept = max(min(len(entry["data"]), len(store)) - 1, 0)
+            tail = _store_frame(store, kept)
+            entry["data"] = pd.concat([entry["data"].iloc[:kept], tail]) if kept else tail
+            self._bar_store_versions[key] = store.version
+            if len(store):
+                self._history_event(symbol, timeframe).set()
         return cast(pd.DataFrame, self.ohlc_data[symbol][timeframe]["data"])
 
     async def wait_for_historical_data(
-        self, symbol: str, timeframe: str, *, timeout_s: float = 30.0, poll_s: float = 0.1
+        self, symbol: str, timeframe: str, *, timeout_s: float = 30.0
     ) -> bool:
-        deadline = datetime.now() + timedelta(seconds=float(timeout_s))
-        while datetime.now() < deadline:
-            tf_data = self.ohlc_data.get(symbol, {}).get(timeframe)
-            if tf_data and tf_data.get("end") and hasattr(tf_data.get("data"), "empty") and not tf_data["data"].empty:
-                return True
-            await asyncio.sleep(float(poll_s))
-        return False
+        """Return True as soon as non-empty bars for ``(symbol, timeframe)`` are stored, False on timeout."""
+        ready = self._history_event(symbol, timeframe)
+        if ready.is_set():
+            return True
+        try:
+            await asyncio.wait_for(ready.wait(), timeout=float(timeout_s))
+        except TimeoutError:
+            return False
+        return True
+
+    async def wait_for_account_equity(self, *, timeout_s: float = 5.0) -> float | None:
+        """Return account equity, waiting on ``accountValueEvent`` until it is first reported."""
+        account_equity = self.get_account_data()["account_equity"]
+        if account_equity is not None:
+            return account_equity
+
+        def is_equity(value: Any) -> bool:
+            return (
+                getattr(value, "tag", "") == "NetLiquidationByCurrency"
+                and getattr(value, "currency", "") == "BASE"
+                and (not self.ib_account or getattr(value, "account", "") == self.ib_account)
+            )
+
+        await self._wait_for_event(self.ib.accountValueEvent, is_equity, timeout_s)
+        return self.get_account_data()["account_equity"]
+
+    async def wait_for_order_ack(self, trade: Any, *, timeout_s: float = 5.0) -> str:
+        """Wait on ``orderStatusEvent`` until ``trade`` is acknowledged or rejected; return its status.
+
+        Raises:
+            TimeoutError: If TWS reports neither within ``timeout_s`` (the order may still be live).
+        """
+        settled = _ACKNOWLEDGED_STATUSES | _REJECTED_STATUSES
+        status = str(getattr(trade.orderStatus, "status", ""))
+        if status in settled:
+            return status
+        order_id = int(getattr(trade.order, "orderId", 0))
+
+        def is_settled(update: Any) -> bool:
+            return (
+                int(getattr(update.order, "orderId", -1)) == order_id
+                and str(getattr(update.orderStatus, "status", "")) in settled
+            )
+
+        result = await self._wait_for_event(self.ib.orderStatusEvent, is_settled, timeout_s)
+        if result is None:
+            raise TimeoutError(
+                f"IBKR did not acknowledge order {order_id} within {timeout_s:.1f}s; check TWS before retrying."
+            )
+        return str(getattr(result[0].orderStatus, "status", ""))
 
     async def send_market_order(
         self, contract: Contract, action: str, quantity: int, tif: str = "DAY"
     ) -> dict[str, int]:
         order = MarketOrder(action=str(action), totalQuantity=int(quantity), tif=str(tif))
-        trade = self.ib.placeOrder(contract, order)
-        await asyncio.sleep(0.01)
+        trade = self.ib.placeOrder(await self.qualify_contract(contract), order)
         return {"order_id": int(getattr(trade.order, "orderId", 0))}
 
     async def place_market_order(
@@ -309,28 +831,55 @@ class TWS_Wrapper_Client:
         symbol: str,
         quantity: float,
         price_hint: float | None = None,
+        *,
+        ack_timeout_s: float = 5.0,
     ) -> str:
         del price_hint
         if abs(float(quantity)) < 1.0:
             raise ValueError(f"Market order quantity must be at least 1 share. Got {quantity:.4f}.")
-        contract = self.get_contract(symbol=symbol, contract_id=0, exchange="SMART")
-        action = "BUY" if quantity > 0 else "SELL"
-        result = await self.send_market_order(
-            contract=contract,
-            action=action,
-            quantity=abs(int(quantity)),
-            tif="DAY",
+        contract = await self.qualify_contract(
+            self.get_contract(symbol=symbol, contract_id=0, exchange="SMART")
         )
-        order_id = int(result["order_id"])
-        await asyncio.sleep(0.2)
-        order = self.get_order_by_id(order_id)
-        status = str(order.get("status", "") if order is not None else "")
-        if status in {"ValidationError", "ApiCancelled", "Cancelled", "Inactive"}:
+        action = "BUY" if quantity > 0 else "SELL"
+        order = MarketOrder(action=action, totalQuantity=abs(int(quantity)), tif="DAY")
+        trade = self.ib.placeOrder(contract, order)
+        order_id = int(getattr(trade.order, "orderId", 0))
+        with span("ib.order_ack"):
+            status = await self.wait_for_order_ack(trade, timeout_s=ack_timeout_s)
+        if status in _REJECTED_STATUSES:
             raise RuntimeError(
                 f"IBKR rejected market order {order_id} for {symbol}: status={status}."
             )
         return f"ibkr:{symbol}:{quantity:.4f}:{order_id}"
 
+    async def place_basket(self, orders: Mapping[str, float], *, tif: str = "DAY") -> FillTracker:
+        """Send one market order per symbol (signed shares) at once and return their tracker.
+
+        All contracts are qualified concurrently before anything is sent, so an unknown
+        symbol fails the whole basket with ``ValueError`` and no orders. The orders then go
+        out back to back without waiting on each other; await ``FillTracker.wait`` for the
+        fills and the reconciliation report.
+        """
+        small = [symbol for symbol, quantity in orders.items() if abs(float(quantity)) < 1.0]
+        if small:
+            raise ValueError(
+                f"Basket order quantities must be at least 1 share. Got: {', '.join(small)}."
+            )
+        contracts = await asyncio.gather(
+            *(
+                self.qualify_contract(
+                    self.get_contract(symbol=symbol, contract_id=0, exchange="SMART")
+                )
+                for symbol in orders
+            )
+        )
+        tracker = FillTracker(self.ib, position_of=self.get_position)
+        for (symbol, quantity), contract in zip(orders.items(), contracts):
+            action = "BUY" if quantity > 0 else "SELL"
+            order = MarketOrder(action=action, totalQuantity=abs(int(quantity)), tif=str(tif))
+            tracker.track(symbol, float(int(quantity)), self.ib.placeOrder(contract, order))
+        return tracker
+
     async def send_limit_order(
         self,
         contract: Contract,
@@ -347,8 +896,7 @@ class TWS_Wrapper_Client:
             tif=str(tif),
             allOrNone=bool(all_or_none),
         )
-        trade = self.ib.placeOrder(contract, order)
-        await asyncio.sleep(0.01)
+        trade = self.ib.placeOrder(await self.qualify_contract(contract), order)
         return {"order_id": int(getattr(trade.order, "orderId", 0))}
 
     async def send_stop_order(
@@ -367,20 +915,15 @@ class TWS_Wrapper_Client:
             tif=str(tif),
             allOrNone=bool(all_or_none),
         )
-        trade = self.ib.placeOrder(contract, order)
-        await asyncio.sleep(0.01)
+        trade = self.ib.placeOrder(await self.qualify_contract(contract), order)
         return {"order_id": int(getattr(trade.order, "orderId", 0))}
 
     def cancel_order(self, order_id: int) -> dict[str, int]:
-        trade = self.get_order_by_id(int(order_id))
-        if trade is None:
-            return {"order_id": int(order_id)}
-        order = next((t.order for t in self.ib.trades() if int(getattr(t.order, "orderId", -1)) == int(order_id)), None)
-        if order is not None:
-            self.ib.cancelOrder(order)
+        trade = self._trades.get(int(order_id))
+        if trade is not None:
+            self.ib.cancelOrder(trade.order)
         return {"order_id": int(order_id)}
 
     async def disconnect(self) -> None:
         if self.ib.isConnected():
             self.ib.disconnect()
-
@@ -1,2 +1 @@
 """Live trading orchestration."""
-
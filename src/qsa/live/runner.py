@@ -1,13 +1,22 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
 
-from qsa.config.settings import load_settings
-from qsa.data.pipeline import fetch_ibkr_bars_async
+from qsa.config.settings import Settings, load_settings
+from qsa.data.durations import bar_size_seconds
+from qsa.data.pipeline import _symbol_settings, fetch_ibkr_bars_async
+from qsa.execution.contracts import ContractCache
+from qsa.execution.gateway import GatewayClient
 from qsa.execution.tws_client import TWS_Wrapper_Client
+from qsa.ops.latency import NULL_TRACER, LatencyLog, SpanTracer, tracing
+from qsa.ops.signals import install_stop_signals
 from qsa.portfolio.risk import clamp_target_position
 from qsa.portfolio.sizing import shares_for_unit_signal
+from qsa.schemas.data import Bar
+from qsa.strategies.base import StrategySignal
 from qsa.strategies.momentum_example import MomentumExampleStrategy, MomentumParams
 
 
@@ -30,6 +39,15 @@ class LiveRunResult:
     leverage_blocked: bool
     equity_stop_blocked: bool
     order_id: str
+    bar_time: str | None = None
+    error: str | None = None
+    stage_latency_ms: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class LiveUniverseResult:
+    results: list[LiveRunResult]
+    errors: dict[str, str] = field(default_factory=dict)
 
 
 def _position_unit(position_shares: float) -> float:
@@ -47,131 +65,490 @@ def _gross_leverage(position_shares: float, price: float, equity: float) -> floa
 
 
 async def _resolve_account_equity(
-    broker: TWS_Wrapper_Client, *, attempts: int = 3, wait_s: float = 0.2
+    broker: TWS_Wrapper_Client | GatewayClient, *, timeout_s: float = 5.0
 ) -> float | None:
-    for attempt in range(attempts):
-        account_data = broker.get_account_data()
-        account_equity = account_data.get("account_equity")
-        if account_equity is not None:
-            return float(account_equity)
-        if attempt < attempts - 1:
-            await asyncio.sleep(wait_s)
-    return None
-
-
-async def run_live(
-    config_path: str, dry_run: bool, symbol: str = "AAPL"
-) -> LiveRunResult:
-    settings = load_settings(config_path)
-    bars = await fetch_ibkr_bars_async(settings)
-    if not bars:
-        raise ValueError("No bars loaded for live runner.")
+    account_equity = await broker.wait_for_account_equity(timeout_s=timeout_s)
+    return float(account_equity) if account_equity is not None else None
 
-    strategy = MomentumExampleStrategy(
-        MomentumParams(
-            lookback=settings.strategy_lookback,
-            entry_threshold=settings.strategy_entry_threshold,
-            exit_threshold=settings.strategy_exit_threshold,
+
+@dataclass(frozen=True)
+class _Decision:
+    target_position: float
+    delta: float
+    equity_proxy: float
+    leverage_blocked: bool
+    equity_stop_blocked: bool
+
+
+def _decide(
+    settings: Settings,
+    signal: StrategySignal,
+    current_position: float,
+    last_price: float,
+    account_equity: float | None,
+) -> _Decision:
+    """Turn a unit signal into a share target under the sizing, leverage, and equity-stop rules."""
+    current_unit = _position_unit(current_position)
+    equity_proxy = float(account_equity) if account_equity is not None else settings.target_notional
+    leverage_blocked = False
+    equity_stop_blocked = False
+
+    if signal.target_position == current_unit:
+        # Hold means no trade in beginner-friendly execution mode.
+        target_position = current_position
+    else:
+        raw_target = shares_for_unit_signal(
+            last_price, settings.target_notional, signal.target_position
         )
+        candidate_target = clamp_target_position(raw_target, settings.max_abs_position)
+        is_entry_or_flip = signal.target_position != 0.0 and signal.target_position != current_unit
+        if settings.stop_on_nonpositive_equity and equity_proxy <= 0 and is_entry_or_flip:
+            target_position = current_position
+            equity_stop_blocked = True
+        elif not settings.allow_leverage and is_entry_or_flip:
+            candidate_leverage = _gross_leverage(candidate_target, last_price, equity_proxy)
+            if candidate_leverage > settings.max_gross_leverage:
+                target_position = current_position
+                leverage_blocked = True
+            else:
+                target_position = candidate_target
+        else:
+            target_position = candidate_target
+    return _Decision(
+        target_position=target_position,
+        delta=target_position - current_position,
+        equity_proxy=equity_proxy,
+        leverage_blocked=leverage_blocked,
+        equity_stop_blocked=equity_stop_blocked,
     )
-    broker = TWS_Wrapper_Client(
+
+
+def _make_broker(
+    settings: Settings, *, streaming: bool = False
+) -> TWS_Wrapper_Client | GatewayClient:
+    """Broker for a run; ``streaming`` runs need ``keep_up_to_date`` and always connect to TWS directly."""
+    if settings.ib_gateway_socket and not streaming:
+        return GatewayClient(settings.ib_gateway_socket)
+    return TWS_Wrapper_Client(
         host=settings.ib_host,
         port=settings.ib_port,
         client_id=settings.ib_client_id,
         account=settings.ib_account,
+        contract_cache=ContractCache.from_settings(settings),
     )
-    await broker.connect()
-    try:
-        configured_account = settings.ib_account.strip()
-        managed_accounts = broker.get_managed_accounts()
-        if not dry_run:
-            if not configured_account:
-                raise RuntimeError(
-                    "execution.account is required for non-dry-run live execution."
-                )
-            if managed_accounts and configured_account not in managed_accounts:
-                raise RuntimeError(
-                    f"Configured execution.account '{configured_account}' is not in managed "
-                    f"accounts: {managed_accounts}."
-                )
 
-        current_position = broker.get_position(symbol)
-        current_unit = _position_unit(current_position)
-        signal = strategy.generate_signal(bars, current_position=current_unit)
-        last_price = bars[-1].close
-        account_equity = await _resolve_account_equity(broker)
-        if not dry_run and account_equity is None:
+
+def _make_strategy(settings: Settings) -> MomentumExampleStrategy:
+    return MomentumExampleStrategy(
+        MomentumParams(
+            lookback=settings.strategy_lookback,
+            entry_threshold=settings.strategy_entry_threshold,
+            exit_threshold=settings.strategy_exit_threshold,
+        )
+    )
+
+
+def _validate_account(
+    broker: TWS_Wrapper_Client | GatewayClient, settings: Settings, dry_run: bool
+) -> str:
+    configured_account = settings.ib_account.strip()
+    managed_accounts = broker.get_managed_accounts()
+    if not dry_run:
+        if not configured_account:
+            raise RuntimeError("execution.account is required for non-dry-run live execution.")
+        if managed_accounts and configured_account not in managed_accounts:
             raise RuntimeError(
-                f"Unable to resolve account_equity for execution.account "
-                f"'{configured_account}'."
+                f"Configured execution.account '{configured_account}' is not in managed "
+                f"accounts: {managed_accounts}."
             )
-        equity_proxy = (
-            float(account_equity)
-            if account_equity is not None
-            else settings.target_notional
+    return configured_account
+
+
+async def _resolve_required_equity(
+    broker: TWS_Wrapper_Client | GatewayClient, configured_account: str, dry_run: bool
+) -> float | None:
+    account_equity = await _resolve_account_equity(broker)
+    if not dry_run and account_equity is None:
+        raise RuntimeError(
+            f"Unable to resolve account_equity for execution.account '{configured_account}'."
         )
-        leverage_blocked = False
-        equity_stop_blocked = False
+    return account_equity
 
-        if signal.target_position == current_unit:
-            # Hold means no trade in beginner-friendly execution mode.
-            target_position = current_position
-        else:
-            raw_target = shares_for_unit_signal(
-                last_price, settings.target_notional, signal.target_position
-            )
-            candidate_target = clamp_target_position(
-                raw_target, settings.max_abs_position
-            )
-            is_entry_or_flip = (
-                signal.target_position != 0.0 and signal.target_position != current_unit
-            )
-            if (
-                settings.stop_on_nonpositive_equity
-                and equity_proxy <= 0
-                and is_entry_or_flip
-            ):
-                target_position = current_position
-                equity_stop_blocked = True
-            elif not settings.allow_leverage and is_entry_or_flip:
-                candidate_leverage = _gross_leverage(
-                    candidate_target, last_price, equity_proxy
+
+def _result(
+    settings: Settings,
+    config_path: str,
+    *,
+    run_type: str,
+    dry_run: bool,
+    symbol: str,
+    signal: StrategySignal,
+    decision: _Decision,
+    last_price: float,
+    account_equity: float | None,
+    order_id: str,
+    bar_time: str | None = None,
+    error: str | None = None,
+    tracer: SpanTracer = NULL_TRACER,
+) -> LiveRunResult:
+    result = LiveRunResult(
+        status="ok" if error is None else "error",
+        env=settings.app_env,
+        run_type=run_type,
+        execution_mode=settings.mode,
+        config=config_path,
+        broker=settings.broker,
+        data_dir=str(settings.data_dir),
+        dry_run=dry_run,
+        symbol=symbol,
+        signal_action=signal.action,
+        target_position=round(decision.target_position, 4),
+        delta=round(decision.delta, 4),
+        gross_leverage_estimate=round(
+            _gross_leverage(decision.target_position, last_price, decision.equity_proxy), 6
+        ),
+        account_equity=account_equity,
+        leverage_blocked=decision.leverage_blocked,
+        equity_stop_blocked=decision.equity_stop_blocked,
+        order_id=order_id,
+        bar_time=bar_time,
+        error=error,
+        stage_latency_ms=tracer.stage_ms(),
+    )
+    if tracer.enabled:
+        LatencyLog.from_settings(settings).append(
+            result.stage_latency_ms, run_type=run_type, symbol=symbol, status=result.status
+        )
+    return result
+
+
+def _make_tracer(settings: Settings) -> SpanTracer:
+    return SpanTracer() if settings.latency_tracing else NULL_TRACER
+
+
+async def run_live(config_path: str, dry_run: bool, symbol: str = "AAPL") -> LiveRunResult:
+    """One live decision for ``symbol``; with ``latency_tracing`` each stage is timed.
+
+    Stage durations land in ``LiveRunResult.stage_latency_ms`` and the rolling latency
+    log (``ops/latency.py``). Nested client and pipeline stages are prefixed ``ib.`` and
+    ``history.`` and overlap the runner's own stages.
+    """
+    started = time.perf_counter_ns()
+    settings = load_settings(config_path)
+    tracer = _make_tracer(settings)
+    tracer.record("settings", time.perf_counter_ns() - started)
+    with tracing(tracer):
+        strategy = _make_strategy(settings)
+        broker = _make_broker(settings)
+        with tracer.span("connect"):
+            await broker.connect()
+        try:
+            with tracer.span("history"):
+                bars = await fetch_ibkr_bars_async(settings, client=broker)
+            if not bars:
+                raise ValueError("No bars loaded for live runner.")
+            with tracer.span("account"):
+                configured_account = _validate_account(broker, settings, dry_run)
+                current_position = broker.get_position(symbol)
+                account_equity = await _resolve_required_equity(broker, configured_account, dry_run)
+
+            with tracer.span("signal"):
+                strategy.reset()
+                strategy.warmup(bars[:-1])
+                signal = strategy.on_bar(
+                    bars[-1], current_position=_position_unit(current_position)
+                )
+            last_price = bars[-1].close
+            with tracer.span("risk"):
+                decision = _decide(settings, signal, current_position, last_price, account_equity)
+
+            order_id = "dry-run"
+            if not dry_run and decision.delta != 0:
+                with tracer.span("order"):
+                    order_id = await broker.place_market_order(
+                        symbol=symbol, quantity=decision.delta, price_hint=last_price
+                    )
+            tracer.record("total", time.perf_counter_ns() - started)
+        finally:
+            await broker.disconnect()
+    return _result(
+        settings,
+        config_path,
+        run_type="live",
+        dry_run=dry_run,
+        symbol=symbol,
+        signal=signal,
+        decision=decision,
+        last_price=last_price,
+        account_equity=account_equity,
+        order_id=order_id,
+        tracer=tracer,
+    )
+
+
+async def run_live_symbols(
+    config_path: str,
+    dry_run: bool,
+    symbols: Sequence[str],
+    *,
+    concurrency: int = 50,
+    timeout_s: float = 60.0,
+) -> LiveUniverseResult:
+    """One-shot live run over a symbol list on a single broker connection.
+
+    Each symbol's history fetch and signal runs as its own task (at most ``concurrency``
+    fetches in flight, IB's limit on open historical requests; each bounded by ``timeout_s``). Account equity is read once and
+    positions come from the client's index. Orders are only sent after every signal is in,
+    and then all at once. A symbol whose fetch or order fails is reported in ``errors``
+    (fetch) or as an ``error`` result (order); the others still trade.
+
+    With ``latency_tracing`` every symbol gets its own tracer, as in ``run_live``: the
+    shared ``settings``, ``connect`` and ``account`` stages are recorded in each, and every
+    result is appended to the latency log.
+    """
+    started = time.perf_counter_ns()
+    settings = load_settings(config_path)
+    unique = list(dict.fromkeys(str(symbol) for symbol in symbols))
+    if not unique:
+        raise ValueError("run_live_symbols needs at least one symbol.")
+    tracers = {symbol: _make_tracer(settings) for symbol in unique}
+    shared_ns = {"settings": time.perf_counter_ns() - started}
+    broker = _make_broker(settings)
+    stage_started = time.perf_counter_ns()
+    await broker.connect()
+    shared_ns["connect"] = time.perf_counter_ns() - stage_started
+    try:
+        stage_started = time.perf_counter_ns()
+        configured_account = _validate_account(broker, settings, dry_run)
+        account_equity = await _resolve_required_equity(broker, configured_account, dry_run)
+        shared_ns["account"] = time.perf_counter_ns() - stage_started
+        for tracer in tracers.values():
+            for name, elapsed in shared_ns.items():
+                tracer.record(name, elapsed)
+        gate = asyncio.Semaphore(max(1, int(concurrency)))
+
+        async def decide(symbol: str) -> tuple[float, StrategySignal, _Decision]:
+            tracer = tracers[symbol]
+            with tracing(tracer):
+                async with gate:
+                    with tracer.span("history"):
+                        bars = await asyncio.wait_for(
+                            fetch_ibkr_bars_async(
+                                _symbol_settings(settings, symbol), client=broker
+                            ),
+                            timeout=float(timeout_s),
+                        )
+                with tracer.span("signal"):
+                    strategy = _make_strategy(settings)
+                    strategy.reset()
+                    strategy.warmup(bars[:-1])
+                    current_position = broker.get_position(symbol)
+                    signal = strategy.on_bar(
+                        bars[-1], current_position=_position_unit(current_position)
+                    )
+                last_price = bars[-1].close
+                with tracer.span("risk"):
+                    decision = _decide(
+                        settings, signal, current_position, last_price, account_equity
+                    )
+            return last_price, signal, decision
+
+        async def place(symbol: str) -> str:
+            last_price, _, decision = decided[symbol]
+            tracer = tracers[symbol]
+            with tracing(tracer), tracer.span("order"):
+                return await broker.place_market_order(
+                    symbol=symbol, quantity=decision.delta, price_hint=last_price
                 )
-                if candidate_leverage > settings.max_gross_leverage:
-                    target_position = current_position
-                    leverage_blocked = True
-                else:
-                    target_position = candidate_target
+
+        outcomes = await asyncio.gather(
+            *(decide(symbol) for symbol in unique), return_exceptions=True
+        )
+        errors: dict[str, str] = {}
+        decided: dict[str, tuple[float, StrategySignal, _Decision]] = {}
+        for symbol, outcome in zip(unique, outcomes):
+            if isinstance(outcome, BaseException):
+                errors[symbol] = f"{type(outcome).__name__}: {outcome}"
             else:
-                target_position = candidate_target
-        delta = target_position - current_position
+                decided[symbol] = outcome
+
+        to_trade = [
+            symbol
+            for symbol, (_, _, decision) in decided.items()
+            if not dry_run and decision.delta != 0
+        ]
+        placed = await asyncio.gather(
+            *(place(symbol) for symbol in to_trade), return_exceptions=True
+        )
+        order_ids: dict[str, object] = dict(zip(to_trade, placed))
 
-        order_id = "dry-run"
-        if not dry_run and delta != 0:
-            order_id = await broker.place_market_order(
-                symbol=symbol, quantity=delta, price_hint=last_price
+        results = []
+        for symbol, (last_price, signal, decision) in decided.items():
+            order = order_ids.get(symbol, "dry-run")
+            failed = isinstance(order, BaseException)
+            tracers[symbol].record("total", time.perf_counter_ns() - started)
+            results.append(
+                _result(
+                    settings,
+                    config_path,
+                    run_type="live_universe",
+                    dry_run=dry_run,
+                    symbol=symbol,
+                    signal=signal,
+                    decision=decision,
+                    last_price=last_price,
+                    account_equity=account_equity,
+                    order_id="" if failed else str(order),
+                    error=str(order) if failed else None,
+                    tracer=tracers[symbol],
+                )
             )
+        return LiveUniverseResult(results=results, errors=errors)
+    finally:
+        await broker.disconnect()
+
+
+async def run_live_daemon(
+    config_path: str,
+    dry_run: bool,
+    symbol: str | None = None,
+    *,
+    on_result: Callable[[LiveRunResult], None] | None = None,
+    stop: asyncio.Event | None = None,
+) -> int:
+    """Trade every completed bar over one long-lived TWS session until stopped.
 
-        return LiveRunResult(
-            status="ok",
-            env=settings.app_env,
-            run_type="live",
-            execution_mode=settings.mode,
-            config=config_path,
-            broker=settings.broker,
-            data_dir=str(settings.data_dir),
-            dry_run=dry_run,
-            symbol=symbol,
-            signal_action=signal.action,
-            target_position=round(target_position, 4),
-            delta=round(delta, 4),
-            gross_leverage_estimate=round(
-                _gross_leverage(target_position, last_price, equity_proxy), 6
-            ),
-            account_equity=account_equity,
-            leverage_blocked=leverage_blocked,
-            equity_stop_blocked=equity_stop_blocked,
-            order_id=order_id,
+    History is loaded once and kept in the client's bar store: intraday bar sizes are
+    rolled up from 5-second real-time bars (``request_realtime_bars``) so each bar
+    completes at its close, daily and longer ones use a ``keep_up_to_date``
+    subscription. Each completed bar runs the same strategy, sizing, and risk
+    rules as ``run_live``. Order failures, and bars for which account equity cannot be
+    resolved, are reported through ``on_result`` with ``status="error"`` and do not stop
+    the loop. SIGINT/SIGTERM (or ``stop``) cancel the
+    subscription and disconnect. Returns the number of bars processed.
+    """
+    settings = load_settings(config_path)
+    symbol = symbol or settings.ib_symbol
+    settings = _symbol_settings(settings, symbol)
+    strategy = _make_strategy(settings)
+    stop = stop or asyncio.Event()
+    broker = _make_broker(settings, streaming=True)
+    await broker.connect()
+    processed = 0
+    stopper: asyncio.Task[None] | None = None
+    restore_signals = install_stop_signals(stop)
+    try:
+        configured_account = _validate_account(broker, settings, dry_run)
+        contract = broker.get_contract(
+            symbol=settings.ib_symbol,
+            contract_id=settings.ib_contract_id,
+            exchange=settings.ib_exchange,
         )
+        if bar_size_seconds(settings.ib_bar_size) < 86_400:
+            await broker.request_realtime_bars(
+                contract,
+                settings.ib_duration,
+                settings.ib_bar_size,
+                what_to_show=settings.ib_what_to_show,
+                use_rth=settings.ib_use_rth,
+            )
+        else:
+            await broker.request_historical_data(
+                contract=contract,
+                duration=settings.ib_duration,
+                bar_size=settings.ib_bar_size,
+                what_to_show=settings.ib_what_to_show,
+                use_rth=settings.ib_use_rth,
+                keep_up_to_date=True,
+            )
+        if not await broker.wait_for_historical_data(
+            settings.ib_symbol, settings.ib_bar_size, timeout_s=30.0
+        ):
+            raise TimeoutError("Timed out waiting for IBKR historical bars.")
+        history = broker.bar_view(settings.ib_symbol, settings.ib_bar_size, include_forming=False)
+        stream = broker.stream_bars(settings.ib_symbol, settings.ib_bar_size, start=len(history))
+        strategy.reset()
+        strategy.warmup(history)
+
+        async def cancel_on_stop() -> None:
+            await stop.wait()
+            broker.cancel_historical_subscription(settings.ib_symbol, settings.ib_bar_size)
+
+        stopper = asyncio.create_task(cancel_on_stop())
+        async for bar in stream:
+            result = await _trade_bar(
+                broker,
+                settings,
+                config_path,
+                strategy,
+                bar,
+                symbol=symbol,
+                dry_run=dry_run,
+                configured_account=configured_account,
+            )
+            processed += 1
+            if on_result is not None:
+                on_result(result)
+            if stop.is_set():
+                break
     finally:
+        if stopper is not None:
+            stopper.cancel()
+        restore_signals()
         await broker.disconnect()
+    return processed
+
+
+async def _trade_bar(
+    broker: TWS_Wrapper_Client,
+    settings: Settings,
+    config_path: str,
+    strategy: MomentumExampleStrategy,
+    bar: Bar,
+    *,
+    symbol: str,
+    dry_run: bool,
+    configured_account: str,
+) -> LiveRunResult:
+    started = time.perf_counter_ns()
+    tracer = _make_tracer(settings)
+    with tracing(tracer):
+        with tracer.span("signal"):
+            current_position = broker.get_position(symbol)
+            signal = strategy.on_bar(bar, current_position=_position_unit(current_position))
+        error: str | None = None
+        with tracer.span("account"):
+            try:
+                account_equity = await _resolve_required_equity(broker, configured_account, dry_run)
+            except RuntimeError as exc:
+                account_equity = None
+                error = str(exc)
+        with tracer.span("risk"):
+            decision = _decide(settings, signal, current_position, bar.close, account_equity)
+
+        order_id = "dry-run" if error is None else ""
+        if error is None and not dry_run and decision.delta != 0:
+            try:
+                with tracer.span("order"):
+                    order_id = await broker.place_market_order(
+                        symbol=symbol, quantity=decision.delta, price_hint=bar.close
+                    )
+            except (RuntimeError, TimeoutError, ValueError) as exc:
+                order_id = ""
+                error = str(exc)
+        tracer.record("total", time.perf_counter_ns() - started)
+    return _result(
+        settings,
+        config_path,
+        run_type="live_daemon",
+        dry_run=dry_run,
+        symbol=symbol,
+        signal=signal,
+        decision=decision,
+        last_price=bar.close,
+        account_equity=account_equity,
+        order_id=order_id,
+        bar_time=bar.time.isoformat(),
+        error=error,
+        tracer=tracer,
+    )
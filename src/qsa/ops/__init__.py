@@ -1,2 +1 @@
 """Operational support modules (logging, alerting, telemetry)."""
-
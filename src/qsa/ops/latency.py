@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Iterator, Mapping
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from qsa.config.settings import Settings
+
+_PERCENTILES = (50, 95, 99)
+_COUNT_CHUNK_BYTES = 1 << 20
+
+
+class _Span:
+    __slots__ = ("_durations", "_name", "_started")
+
+    def __init__(self, durations: dict[str, int], name: str) -> None:
+        self._durations = durations
+        self._name = name
+        self._started = 0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter_ns()
+
+    def __exit__(self, *exc_info: object) -> None:
+        elapsed = time.perf_counter_ns() - self._started
+        self._durations[self._name] = self._durations.get(self._name, 0) + elapsed
+
+
+class SpanTracer:
+    """Per-stage wall time on the monotonic ``perf_counter_ns`` clock.
+
+    ``with tracer.span("history"):`` adds the block's duration to that stage; a stage
+    entered several times (or by concurrent tasks) reports the sum.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._durations: dict[str, int] = {}
+
+    def span(self, name: str) -> AbstractContextManager[None]:
+        return _Span(self._durations, name)
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        self._durations[name] = self._durations.get(name, 0) + int(elapsed_ns)
+
+    def stage_ms(self) -> dict[str, float]:
+        return {name: round(elapsed / 1e6, 3) for name, elapsed in self._durations.items()}
+
+
+class _NullTracer(SpanTracer):
+    """Disabled tracer: every span is one shared no-op context manager."""
+
+    enabled = False
+    _NOOP = nullcontext()
+
+    def span(self, name: str) -> AbstractContextManager[None]:
+        return self._NOOP
+
+    def record(self, name: str, elapsed_ns: int) -> None:
+        return None
+
+
+NULL_TRACER: SpanTracer = _NullTracer()
+_TRACER: ContextVar[SpanTracer] = ContextVar("qsa_tracer", default=NULL_TRACER)
+
+
+def current_tracer() -> SpanTracer:
+    return _TRACER.get()
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Time a block against the active tracer; a no-op unless one is installed by :func:`tracing`."""
+    return _TRACER.get().span(name)
+
+
+@contextmanager
+def tracing(tracer: SpanTracer) -> Iterator[SpanTracer]:
+    """Make ``tracer`` the active one for this context and the tasks it starts."""
+    token = _TRACER.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _TRACER.reset(token)
+
+
+def summarize(records: list[Mapping[str, Any]]) -> dict[str, dict[str, float]]:
+    """Count, p50/p95/p99 and max in milliseconds for each stage across ``records``."""
+    stages: dict[str, list[float]] = {}
+    for record in records:
+        for name, elapsed in record.get("stage_latency_ms", {}).items():
+            stages.setdefault(name, []).append(float(elapsed))
+    summary = {}
+    for name, values in sorted(stages.items()):
+        array = np.asarray(values, dtype=np.float64)
+        p50, p95, p99 = np.percentile(array, _PERCENTILES)
+        summary[name] = {
+            "count": len(array),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(array.max()), 3),
+        }
+    return summary
+
+
+class LatencyLog:
+    """Rolling JSON-lines log of per-run stage latencies.
+
+    Appends are a single line write. The file keeps the newest ``max_entries`` records;
+    it is compacted once it reaches twice that, so trimming is amortized. The first append
+    counts the existing lines by scanning the raw bytes for newlines, without decoding them.
+    """
+
+    def __init__(self, path: Path, *, max_entries: int = 10_000) -> None:
+        if max_entries < 1:
+            raise ValueError(f"LatencyLog max_entries must be positive. Got {max_entries}.")
+        self.path = Path(path)
+        self.max_entries = int(max_entries)
+        self._lines: int | None = None
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> LatencyLog:
+        return cls(settings.data_dir / "logs" / "latency.jsonl")
+
+    def append(self, stage_latency_ms: Mapping[str, float], **fields: Any) -> None:
+        record = {
+            "ts": datetime.now(UTC).isoformat(),
+            **fields,
+            "stage_latency_ms": dict(stage_latency_ms),
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self._lines is None:
+            self._lines = self._count_lines()
+        with self.path.open("a") as handle:
+            handle.write(json.dumps(record, sort_keys=True) + "\n")
+        self._lines += 1
+        if self._lines >= 2 * self.max_entries:
+            self._compact()
+
+    def records(self, last: int | None = None) -> list[dict[str, Any]]:
+        """The newest ``last`` records (default ``max_entries``), oldest first."""
+        lines = self._read_lines()[-(last or self.max_entries) :]
+        return [json.loads(line) for line in lines]
+
+    def summary(self, last: int | None = None) -> dict[str, dict[str, float]]:
+        return summarize(self.records(last))
+
+    def _read_lines(self) -> list[str]:
+        if not self.path.exists():
+            return []
+        return [line for line in self.path.read_text().splitlines() if line.strip()]
+
+    def _count_lines(self) -> int:
+        if not self.path.exists():
+            return 0
+        lines = 0
+        with self.path.open("rb") as handle:
+            while chunk := handle.read(_COUNT_CHUNK_BYTES):
+                lines += chunk.count(b"\n")
+        return lines
+
+    def _compact(self) -> None:
+        keep = self._read_lines()[-self.max_entries :]
+        tmp_path = self.path.with_suffix(".tmp.jsonl")
+        tmp_path.write_text("".join(line + "\n" for line in keep))
+        tmp_path.replace(self.path)
+        self._lines = len(keep)
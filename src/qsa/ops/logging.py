@@ -5,4 +5,3 @@ import logging
 
 def configure_logging(level: str = "INFO") -> None:
     logging.basicConfig(level=getattr(logging, level.upper(), logging.INFO))
-
@@ -10,6 +10,7 @@ import pandas as pd
 
 from qsa.config.settings import Settings
 from qsa.schemas.artifacts import RunContext
+from qsa.schemas.data import BarHistory
 
 
 def _utc_stamp() -> str:
@@ -24,35 +25,59 @@ def _read_json(path: Path) -> dict[str, Any]:
     return json.loads(path.read_text())
 
 
-def start_run(settings: Settings, *, config_path: str, initial_cash: float) -> RunContext:
+def _start_run_dir(
+    settings: Settings, kind: str, *, config_path: str, metadata: dict[str, Any]
+) -> RunContext:
+    """Create ``artifacts/<kind>/<run_id>`` with the config snapshot and ``params.json``."""
     run_id = f"{_utc_stamp()}-{uuid.uuid4().hex[:8]}"
-    run_dir = settings.data_dir / "artifacts" / "runs" / run_id
+    run_dir = settings.data_dir / "artifacts" / kind / run_id
     run_dir.mkdir(parents=True, exist_ok=False)
 
     config_src = Path(config_path)
     if config_src.exists():
         (run_dir / "config_snapshot.yaml").write_text(config_src.read_text())
 
-    metadata = {
+    params = {
         "run_id": run_id,
         "created_at": datetime.now(UTC).isoformat(),
-        "initial_cash": float(initial_cash),
         "settings": settings.model_dump(mode="json"),
+        **metadata,
     }
-    _write_json(run_dir / "params.json", metadata)
+    _write_json(run_dir / "params.json", params)
     return RunContext(run_id=run_id, run_dir=run_dir)
 
 
+def start_run(settings: Settings, *, config_path: str, initial_cash: float) -> RunContext:
+    return _start_run_dir(
+        settings, "runs", config_path=config_path, metadata={"initial_cash": float(initial_cash)}
+    )
+
+
+def start_sweep(
+    settings: Settings,
+    *,
+    config_path: str,
+    grid: dict[str, list[Any]],
+    initial_cash: float,
+) -> RunContext:
+    return _start_run_dir(
+        settings,
+        "sweeps",
+        config_path=config_path,
+        metadata={"initial_cash": float(initial_cash), "grid": grid},
+    )
+
+
 def save_dataset_artifacts(
     run_dir: Path,
     *,
     dataset_id: str,
-    bars_frame: pd.DataFrame,
+    bars: BarHistory,
     manifest: dict[str, Any],
 ) -> dict[str, str]:
     run_bars_path = run_dir / "bars.csv"
     run_manifest_path = run_dir / "dataset_manifest.json"
-    bars_frame.to_csv(run_bars_path, index=False)
+    bars.to_frame().to_csv(run_bars_path, index=False)
 
     run_manifest = dict(manifest)
     run_manifest["bars_path"] = str(run_bars_path)
@@ -83,3 +108,9 @@ def save_series_artifacts(
 ) -> None:
     pd.DataFrame(equity_curve).to_csv(run_dir / "equity_curve.csv", index=False)
     pd.DataFrame(trades).to_csv(run_dir / "trades.csv", index=False)
+
+
+def save_sweep_results(run_dir: Path, results: pd.DataFrame) -> str:
+    results_path = run_dir / "results.csv"
+    results.to_csv(results_path, index=False)
+    return str(results_path)
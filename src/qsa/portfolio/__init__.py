@@ -1,2 +1 @@
 """Risk and position sizing utilities."""
-
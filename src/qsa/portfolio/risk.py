@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 
 def clamp_target_position(target: float, max_abs_position: float) -> float:
     """Clamp the target position to the maximum absolute position."""
@@ -9,3 +11,7 @@ def clamp_target_position(target: float, max_abs_position: float) -> float:
         return -max_abs_position
     return target
 
+
+def clamp_target_positions(targets: np.ndarray, max_abs_position: float) -> np.ndarray:
+    """Vectorized ``clamp_target_position`` over an array of targets."""
+    return np.clip(targets, -max_abs_position, max_abs_position)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import numpy as np
+
 
 def size_from_notional(price: float, notional: float) -> float:
     """Calculate the size from the notional value."""
@@ -12,3 +14,9 @@ def shares_for_unit_signal(price: float, notional: float, signal: float) -> floa
     """Calculate the number of shares for a unit signal."""
     return size_from_notional(price=price, notional=notional) * signal
 
+
+def shares_for_unit_signals(prices: np.ndarray, notional: float, signals: np.ndarray) -> np.ndarray:
+    """Vectorized ``shares_for_unit_signal``; non-positive or missing prices size to zero."""
+    sizes = np.zeros(np.shape(prices), dtype=np.float64)
+    np.divide(notional, prices, out=sizes, where=np.asarray(prices) > 0)
+    return sizes * signals
@@ -1,11 +1,13 @@
 """Core shared schemas for market data and run artifacts."""
 
-from qsa.schemas.artifacts import DatasetSnapshot, RunContext
-from qsa.schemas.data import Bar
+from qsa.schemas.artifacts import DatasetPanel, DatasetSnapshot, RunContext
+from qsa.schemas.data import Bar, BarHistory, BarPanel
 
 __all__ = [
     "Bar",
+    "BarHistory",
+    "BarPanel",
+    "DatasetPanel",
     "DatasetSnapshot",
     "RunContext",
 ]
-
@@ -6,19 +6,47 @@ from typing import Any
 
 import pandas as pd
 
-from qsa.schemas.data import Bar
+from qsa.schemas.data import BarHistory, BarPanel
 
 
 @dataclass(frozen=True)
 class DatasetSnapshot:
     dataset_id: str
-    bars_frame: pd.DataFrame
-    bars: list[Bar]
+    bars: BarHistory
     manifest: dict[str, Any]
 
+    @property
+    def bars_frame(self) -> pd.DataFrame:
+        """The bars as a DataFrame, built on request from the columnar history."""
+        return self.bars.to_frame()
+
+
+@dataclass(frozen=True)
+class DatasetPanel:
+    """Per-symbol dataset snapshots fetched together, plus symbols that could not be loaded."""
+
+    datasets: dict[str, DatasetSnapshot]
+    errors: dict[str, str]
+    manifest: dict[str, Any]
+
+    @property
+    def symbols(self) -> tuple[str, ...]:
+        return tuple(self.datasets)
+
+    def __getitem__(self, symbol: str) -> DatasetSnapshot:
+        return self.datasets[symbol]
+
+    def __len__(self) -> int:
+        return len(self.datasets)
+
+    def to_bar_panel(self) -> BarPanel:
+        """Align the loaded symbols on one time axis for ``run_portfolio_engine``."""
+        return BarPanel.from_histories(
+            {symbol: data.bars for symbol, data in self.datasets.items()}
+        )
+
 
 @dataclass(frozen=True)
 class RunContext:
     run_id: str
     run_dir: Path
-
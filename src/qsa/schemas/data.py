@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Mapping, Sequence
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import UTC, datetime, timedelta, tzinfo
+from typing import Any, overload
+
+import numpy as np
+import pandas as pd
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=UTC)
 
 
 @dataclass(frozen=True)
@@ -13,3 +21,295 @@ class Bar:
     close: float
     volume: float = 0.0
 
+
+def datetime_from_ns(ns: int, tz: tzinfo | None = None) -> datetime:
+    """Convert int64 epoch nanoseconds (UTC when ``tz`` is set) back to a datetime."""
+    delta = timedelta(microseconds=int(ns) // 1_000)
+    if tz is None:
+        return _EPOCH + delta
+    return (_EPOCH_UTC + delta).astimezone(tz)
+
+
+def _readonly(values: np.ndarray) -> np.ndarray:
+    view = values.view()
+    view.flags.writeable = False
+    return view
+
+
+def _datetimes_to_ns(times: Any) -> tuple[np.ndarray, tzinfo | None]:
+    index = pd.DatetimeIndex(times).as_unit("ns")
+    return index.asi8.copy(), index.tz
+
+
+class BarHistory(Sequence[Bar]):
+    """Read-only columnar view over a bar series.
+
+    Columns are NumPy arrays (times as int64 nanoseconds since the epoch, UTC
+    for tz-aware series). The view exposes the first ``len(self)`` rows of its
+    columns; :meth:`advance` grows that window in place without copying, which
+    lets the engine hand strategies an expanding history at O(1) per bar.
+    ``Bar`` objects are only built when a row is indexed.
+    """
+
+    __slots__ = ("_close", "_high", "_length", "_low", "_open", "_times", "_tz", "_volume")
+
+    def __init__(
+        self,
+        times: np.ndarray,
+        open: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        *,
+        tz: tzinfo | None = None,
+        length: int | None = None,
+    ) -> None:
+        self._times = _readonly(np.asarray(times, dtype=np.int64))
+        self._open = _readonly(np.asarray(open, dtype=np.float64))
+        self._high = _readonly(np.asarray(high, dtype=np.float64))
+        self._low = _readonly(np.asarray(low, dtype=np.float64))
+        self._close = _readonly(np.asarray(close, dtype=np.float64))
+        self._volume = _readonly(np.asarray(volume, dtype=np.float64))
+        self._tz = tz
+        capacity = len(self._times)
+        for column in (self._open, self._high, self._low, self._close, self._volume):
+            if len(column) != capacity:
+                raise ValueError("BarHistory columns must all have the same length.")
+        self._length = capacity if length is None else max(0, min(int(length), capacity))
+
+    @classmethod
+    def from_bars(cls, bars: Sequence[Bar]) -> BarHistory:
+        """Build a columnar history from Bar objects (returns ``bars`` if already columnar)."""
+        if isinstance(bars, BarHistory):
+            return bars
+        times, tz = _datetimes_to_ns([bar.time for bar in bars])
+        return cls(
+            times,
+            np.fromiter((bar.open for bar in bars), dtype=np.float64, count=len(bars)),
+            np.fromiter((bar.high for bar in bars), dtype=np.float64, count=len(bars)),
+            np.fromiter((bar.low for bar in bars), dtype=np.float64, count=len(bars)),
+            np.fromiter((bar.close for bar in bars), dtype=np.float64, count=len(bars)),
+            np.fromiter((bar.volume for bar in bars), dtype=np.float64, count=len(bars)),
+            tz=tz,
+        )
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> BarHistory:
+        """Build a columnar history from a cleaned OHLCV DataFrame."""
+        times, tz = _datetimes_to_ns(frame["time"])
+        return cls(
+            times,
+            frame["open"].to_numpy(dtype=np.float64),
+            frame["high"].to_numpy(dtype=np.float64),
+            frame["low"].to_numpy(dtype=np.float64),
+            frame["close"].to_numpy(dtype=np.float64),
+            frame["volume"].to_numpy(dtype=np.float64),
+            tz=tz,
+        )
+
+    @property
+    def tz(self) -> tzinfo | None:
+        return self._tz
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows backing this view (the limit for :meth:`advance`)."""
+        return len(self._times)
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[: self._length]
+
+    @property
+    def opens(self) -> np.ndarray:
+        return self._open[: self._length]
+
+    @property
+    def highs(self) -> np.ndarray:
+        return self._high[: self._length]
+
+    @property
+    def lows(self) -> np.ndarray:
+        return self._low[: self._length]
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self._close[: self._length]
+
+    @property
+    def volumes(self) -> np.ndarray:
+        return self._volume[: self._length]
+
+    def expanding(self, length: int = 0) -> BarHistory:
+        """Return a view over the first ``length`` rows that can be grown with :meth:`advance`."""
+        return BarHistory(
+            self._times,
+            self._open,
+            self._high,
+            self._low,
+            self._close,
+            self._volume,
+            tz=self._tz,
+            length=length,
+        )
+
+    def advance(self, count: int = 1) -> None:
+        """Expose the next ``count`` rows of the backing columns."""
+        self._length = min(self._length + int(count), len(self._times))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialize the visible rows as a cleaned-style OHLCV DataFrame (``time`` first)."""
+        times = pd.DatetimeIndex(self.times.astype("datetime64[ns]"))
+        if self._tz is not None:
+            times = times.tz_localize("UTC").tz_convert(self._tz)
+        return pd.DataFrame(
+            {
+                "time": times,
+                "open": self.opens,
+                "high": self.highs,
+                "low": self.lows,
+                "close": self.closes,
+                "volume": self.volumes,
+            }
+        )
+
+    def time_at(self, index: int) -> datetime:
+        """Return the timestamp of row ``index`` as a datetime."""
+        return datetime_from_ns(self.times[index], self._tz)
+
+    def _bar_at(self, index: int) -> Bar:
+        return Bar(
+            time=datetime_from_ns(self._times[index], self._tz),
+            open=float(self._open[index]),
+            high=float(self._high[index]),
+            low=float(self._low[index]),
+            close=float(self._close[index]),
+            volume=float(self._volume[index]),
+        )
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BarHistory):
+            return NotImplemented
+        return self._tz == other._tz and all(
+            np.array_equal(left, right)
+            for left, right in zip(
+                (self.times, self.opens, self.highs, self.lows, self.closes, self.volumes),
+                (other.times, other.opens, other.highs, other.lows, other.closes, other.volumes),
+            )
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    @overload
+    def __getitem__(self, index: int) -> Bar: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> BarHistory: ...
+
+    def __getitem__(self, index: int | slice) -> Bar | BarHistory:
+        if isinstance(index, slice):
+            rows = slice(*index.indices(self._length))
+            return BarHistory(
+                self._times[rows],
+                self._open[rows],
+                self._high[rows],
+                self._low[rows],
+                self._close[rows],
+                self._volume[rows],
+                tz=self._tz,
+            )
+        position = int(index)
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError("BarHistory index out of range")
+        return self._bar_at(position)
+
+    def __iter__(self) -> Iterator[Bar]:
+        for index in range(self._length):
+            yield self._bar_at(index)
+
+    def __repr__(self) -> str:
+        return f"BarHistory(length={self._length}, capacity={len(self._times)})"
+
+
+class BarPanel:
+    """Time-aligned OHLCV panel for several symbols.
+
+    Price columns are ``(len(times), len(symbols))`` float64 arrays on the union of
+    all symbols' timestamps, with NaN where a symbol has no bar at that time.
+    """
+
+    __slots__ = ("closes", "highs", "lows", "opens", "symbols", "times", "tz", "volumes")
+
+    def __init__(
+        self,
+        times: np.ndarray,
+        symbols: Sequence[str],
+        opens: np.ndarray,
+        highs: np.ndarray,
+        lows: np.ndarray,
+        closes: np.ndarray,
+        volumes: np.ndarray,
+        *,
+        tz: tzinfo | None = None,
+    ) -> None:
+        self.times = np.asarray(times, dtype=np.int64)
+        self.symbols = tuple(str(symbol) for symbol in symbols)
+        shape = (len(self.times), len(self.symbols))
+        self.opens = np.asarray(opens, dtype=np.float64)
+        self.highs = np.asarray(highs, dtype=np.float64)
+        self.lows = np.asarray(lows, dtype=np.float64)
+        self.closes = np.asarray(closes, dtype=np.float64)
+        self.volumes = np.asarray(volumes, dtype=np.float64)
+        for column in (self.opens, self.highs, self.lows, self.closes, self.volumes):
+            if column.shape != shape:
+                raise ValueError(f"BarPanel columns must have shape {shape}. Got {column.shape}.")
+        self.tz = tz
+
+    @classmethod
+    def from_histories(cls, histories: Mapping[str, Sequence[Bar]]) -> BarPanel:
+        """Align per-symbol bar series on the union of their timestamps."""
+        columnar = {symbol: BarHistory.from_bars(bars) for symbol, bars in histories.items()}
+        zones = {str(history.tz) for history in columnar.values() if len(history)}
+        if len(zones) > 1:
+            raise ValueError(f"BarPanel symbols must share one timezone. Got {sorted(zones)}.")
+        times = np.unique(
+            np.concatenate([h.times for h in columnar.values()] or [np.empty(0, np.int64)])
+        )
+        shape = (len(times), len(columnar))
+        panel = {
+            name: np.full(shape, np.nan) for name in ("opens", "highs", "lows", "closes", "volumes")
+        }
+        for column, history in enumerate(columnar.values()):
+            rows = np.searchsorted(times, history.times)
+            for name, values in panel.items():
+                values[rows, column] = getattr(history, name)
+        tz = next((h.tz for h in columnar.values() if len(h)), None)
+        return cls(times, list(columnar), tz=tz, **panel)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def has_bar(self) -> np.ndarray:
+        """Boolean ``(T, N)`` mask of rows where each symbol printed a bar."""
+        return ~np.isnan(self.closes)
+
+    def history(self, symbol: str) -> BarHistory:
+        """Return one symbol's own bars (rows where it has data) as a BarHistory."""
+        column = self.symbols.index(symbol)
+        rows = np.flatnonzero(~np.isnan(self.closes[:, column]))
+        return BarHistory(
+            self.times[rows],
+            self.opens[rows, column],
+            self.highs[rows, column],
+            self.lows[rows, column],
+            self.closes[rows, column],
+            self.volumes[rows, column],
+            tz=self.tz,
+        )
@@ -2,5 +2,4 @@
 
 from qsa.strategies.momentum_example import MomentumExampleStrategy, MomentumParams
 
-__all__ = ["MomentumParams", "MomentumExampleStrategy"]
-
+__all__ = ["MomentumExampleStrategy", "MomentumParams"]
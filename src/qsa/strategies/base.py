@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Protocol, Sequence
+from typing import Protocol
 
-from qsa.schemas.data import Bar
+import numpy as np
+
+from qsa.schemas.data import Bar, BarHistory
+
+# Column order of the signal matrix returned by ``VectorizedStrategy.generate_signals``:
+# column ``j`` holds the target when the current unit position is ``SIGNAL_POSITIONS[j]``.
+SIGNAL_POSITIONS = (-1.0, 0.0, 1.0)
 
 
 @dataclass(frozen=True)
@@ -13,6 +20,46 @@ class StrategySignal:
 
 
 class Strategy(Protocol):
-    def generate_signal(self, bars: Sequence[Bar], current_position: float) -> StrategySignal:
-        ...
+    def generate_signal(self, bars: Sequence[Bar], current_position: float) -> StrategySignal: ...
+
+
+class VectorizedStrategy(Strategy, Protocol):
+    """Strategy that can also compute every bar's signal in one array pass.
+
+    ``generate_signals`` returns an ``(len(bars), 3)`` float array. Row ``t`` is the
+    target unit position ``generate_signal(bars[: t + 1], current_position=p)`` would
+    return, with one column per ``p`` in ``SIGNAL_POSITIONS``. Rows only depend on
+    history through ``t``; the engine still fills a row-``t`` signal at bar ``t + 1``.
+
+    The engine only needs ``generate_signal`` for the action label of a recorded fill.
+    A strategy may also define ``signal_actions(bars, rows, current_positions)``
+    returning those labels for many rows at once.
+    """
+
+    def generate_signals(self, bars: BarHistory) -> np.ndarray: ...
+
+
+class IncrementalStrategy(Strategy, Protocol):
+    """Stateful strategy that consumes one completed bar at a time.
+
+    Lifecycle: ``reset()`` clears state, ``warmup(bars)`` primes it from history
+    without emitting signals, then ``on_bar(bar, current_position)`` is called once
+    per completed bar, in time order, and returns the signal for the next bar.
+    Until ``warmup_bars`` bars have been seen, ``on_bar`` keeps the current position.
+    State is bounded by the strategy's window, so per-bar cost does not grow with
+    history length and the same object can move from a backtest into a live loop.
+    """
+
+    @property
+    def warmup_bars(self) -> int: ...
+
+    def reset(self) -> None: ...
+
+    def warmup(self, bars: Sequence[Bar]) -> None: ...
+
+    def on_bar(self, bar: Bar, current_position: float) -> StrategySignal: ...
+
 
+def hold_signals(length: int) -> np.ndarray:
+    """Return a signal matrix where every row keeps the current position."""
+    return np.tile(np.asarray(SIGNAL_POSITIONS, dtype=np.float64), (length, 1))
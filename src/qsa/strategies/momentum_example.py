@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Sequence
 
-from qsa.schemas.data import Bar
-from qsa.strategies.base import StrategySignal
+import numpy as np
+
+from qsa.data.buffers import RingBuffer
+from qsa.schemas.data import Bar, BarHistory
+from qsa.strategies.base import StrategySignal, hold_signals
 
 
 @dataclass(frozen=True)
@@ -17,13 +20,39 @@ class MomentumParams:
 class MomentumExampleStrategy:
     def __init__(self, params: MomentumParams) -> None:
         self.params = params
+        self._closes = RingBuffer(params.lookback + 1)
 
     def generate_signal(self, bars: Sequence[Bar], current_position: float) -> StrategySignal:
         if len(bars) < self.params.lookback + 1:
             return StrategySignal(target_position=current_position, action="insufficient_history")
+        if isinstance(bars, BarHistory):
+            closes = bars.closes
+            return self._decide(
+                float(closes[-1]), float(closes[-1 - self.params.lookback]), current_position
+            )
+        return self._decide(bars[-1].close, bars[-1 - self.params.lookback].close, current_position)
+
+    @property
+    def warmup_bars(self) -> int:
+        return self.params.lookback + 1
+
+    def reset(self) -> None:
+        self._closes.clear()
+
+    def warmup(self, bars: Sequence[Bar]) -> None:
+        window = bars[-self._closes.capacity :]
+        if isinstance(window, BarHistory):
+            self._closes.extend(window.closes)
+        else:
+            self._closes.extend([bar.close for bar in window])
+
+    def on_bar(self, bar: Bar, current_position: float) -> StrategySignal:
+        self._closes.append(bar.close)
+        if not self._closes.full:
+            return StrategySignal(target_position=current_position, action="insufficient_history")
+        return self._decide(float(self._closes[-1]), float(self._closes[0]), current_position)
 
-        latest = bars[-1].close
-        anchor = bars[-1 - self.params.lookback].close
+    def _decide(self, latest: float, anchor: float, current_position: float) -> StrategySignal:
         if anchor <= 0:
             return StrategySignal(target_position=current_position, action="invalid_anchor")
 
@@ -40,3 +69,65 @@ class MomentumExampleStrategy:
         if current_position < 0 and momentum >= -self.params.exit_threshold:
             return StrategySignal(target_position=0.0, action="short_exit")
         return StrategySignal(target_position=current_position, action="hold")
+
+    def generate_signals(self, bars: BarHistory) -> np.ndarray:
+        """Vectorized ``generate_signal`` over every prefix of ``bars`` (see ``VectorizedStrategy``)."""
+        signals = hold_signals(len(bars))
+        lookback = self.params.lookback
+        closes = bars.closes
+        if len(closes) < lookback + 1:
+            return signals
+
+        latest = closes[lookback:]
+        anchor = closes[:-lookback]
+        valid = anchor > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            momentum = latest / anchor - 1.0
+
+        entry = self.params.entry_threshold
+        exit_ = self.params.exit_threshold
+        short, flat, long = signals[lookback:, 0], signals[lookback:, 1], signals[lookback:, 2]
+        flat[valid & (momentum > entry)] = 1.0
+        flat[valid & (momentum < -entry)] = -1.0
+        long[valid & (momentum <= exit_)] = 0.0
+        short[valid & (momentum >= -exit_)] = 0.0
+        return signals
+
+    def signal_actions(
+        self, bars: BarHistory, rows: np.ndarray, current_positions: np.ndarray
+    ) -> list[str]:
+        """Vectorized ``generate_signal(...).action`` for ``bars[: row + 1]`` at each ``rows`` entry."""
+        lookback = self.params.lookback
+        rows = np.asarray(rows, dtype=np.int64)
+        current = np.asarray(current_positions, dtype=np.float64)
+        closes = bars.closes
+        warm = rows >= lookback
+        latest = closes[rows]
+        anchor = closes[np.where(warm, rows - lookback, rows)]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            momentum = latest / anchor - 1.0
+        entry = self.params.entry_threshold
+        exit_ = self.params.exit_threshold
+        flat = current == 0
+        labels = np.select(
+            [
+                ~warm,
+                anchor <= 0,
+                flat & (momentum > entry),
+                flat & (momentum < -entry),
+                flat,
+                (current > 0) & (momentum <= exit_),
+                (current < 0) & (momentum >= -exit_),
+            ],
+            [
+                "insufficient_history",
+                "invalid_anchor",
+                "long_entry",
+                "short_entry",
+                "flat",
+                "long_exit",
+                "short_exit",
+            ],
+            default="hold",
+        )
+        return labels.tolist()
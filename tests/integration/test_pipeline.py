@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 import pandas as pd
+import pytest
 import yaml
 
 from qsa.backtest.run import run_backtest
@@ -13,7 +14,10 @@ from qsa.live import runner
 
 
 class _FakeBroker:
-    def __init__(self, host: str, port: int, client_id: int, account: str) -> None:
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del contract_cache
         self.host = host
         self.port = port
         self.client_id = client_id
@@ -29,16 +33,8 @@ class _FakeBroker:
     async def disconnect(self) -> None:
         return None
 
-    async def request_historical_data(self, *args: object, **kwargs: object) -> None:
-        del args, kwargs
-        return None
-
-    async def wait_for_historical_data(self, symbol: str, timeframe: str, timeout_s: float = 30.0) -> bool:
-        del symbol, timeframe, timeout_s
-        return True
-
-    def get_ohlc_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
-        del symbol, timeframe
+    async def fetch_historical_bars(self, contract: object, **kwargs: object) -> pd.DataFrame:
+        del contract, kwargs
         start = datetime(2025, 1, 1)
         rows: list[dict[str, object]] = []
         for idx in range(45):
@@ -70,6 +66,10 @@ class _FakeBroker:
             "free_margin": 100_000.0,
         }
 
+    async def wait_for_account_equity(self, *, timeout_s: float = 5.0) -> float | None:
+        del timeout_s
+        return self.get_account_data()["account_equity"]
+
     async def place_market_order(
         self,
         symbol: str,
@@ -90,12 +90,14 @@ def _write_isolated_config(tmp_path: Path, template_path: str) -> str:
     return str(out_path)
 
 
-def test_backtest_then_live_dry_run_pipeline(tmp_path: Path) -> None:
-    data_pipeline.TWS_Wrapper_Client = _FakeBroker  # type: ignore[assignment]
+def test_backtest_then_live_dry_run_pipeline(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
     dev_config = _write_isolated_config(tmp_path, "configs/dev.yaml")
     paper_config = _write_isolated_config(tmp_path, "configs/paper.yaml")
     backtest = run_backtest(dev_config, initial_cash=100_000.0)
-    runner.TWS_Wrapper_Client = _FakeBroker
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _FakeBroker)
     live = asyncio.run(runner.run_live(paper_config, dry_run=True, symbol="TEST"))
     assert backtest["status"] == "ok"
     assert live.status == "ok"
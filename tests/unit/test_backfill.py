@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from eventkit import Event
+from ib_async import Contract
+
+from qsa.data.backfill import (
+    BackfillStore,
+    PacingLimiter,
+    TokenBucket,
+    backfill_history,
+    plan_chunks,
+)
+from qsa.data.durations import bar_size_seconds, duration_seconds
+from qsa.execution.fake_ib import FakeIB
+from qsa.execution.tws_client import TWS_Wrapper_Client
+
+
+class _FakeIB:
+    """Serves one-bar-per-interval history for any end/duration and tracks concurrency."""
+
+    def __init__(self, fail_ends: set[datetime] | None = None) -> None:
+        self.calls: list[tuple[datetime, str]] = []
+        self.fail_ends = fail_ends or set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.errorEvent = Event("errorEvent")
+
+    async def qualifyContractsAsync(self, *contracts: Contract) -> list[Contract]:
+        for contract in contracts:
+            contract.conId = 265598
+        return list(contracts)
+
+    async def reqHistoricalDataAsync(self, **kwargs: object) -> list[SimpleNamespace]:
+        end = kwargs["endDateTime"]
+        duration = str(kwargs["durationStr"])
+        assert isinstance(end, datetime)
+        self.calls.append((end, duration))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if end in self.fail_ends:
+            raise RuntimeError(
+                "Error 162: Historical Market Data Service error message:pacing violation"
+            )
+        step = bar_size_seconds(str(kwargs["barSizeSetting"]))
+        start = end - timedelta(seconds=duration_seconds(duration))
+        return [
+            SimpleNamespace(
+                date=start + timedelta(seconds=step * idx),
+                open=100.0,
+                high=101.0,
+                low=99.0,
+                close=100.5,
+                volume=10.0,
+            )
+            for idx in range(duration_seconds(duration) // step)
+        ]
+
+
+def _client(fake_ib: _FakeIB) -> TWS_Wrapper_Client:
+    client = TWS_Wrapper_Client(host="127.0.0.1", port=7497, client_id=1)
+    client.ib = fake_ib  # type: ignore[assignment]
+    return client
+
+
+def _fast_limiter() -> PacingLimiter:
+    return PacingLimiter(global_limit=1_000, key_limit=1_000)
+
+
+START = datetime(2025, 1, 6, 12, 0, tzinfo=UTC)
+END = datetime(2025, 1, 9, 18, 0, tzinfo=UTC)
+
+
+def test_plan_chunks_covers_range_on_aligned_boundaries() -> None:
+    chunks = plan_chunks(START, END, "1 min")
+    assert [chunk.duration for chunk in chunks] == ["64800 S", "86400 S", "86400 S", "43200 S"]
+    assert chunks[0].end == END and chunks[-1].start == START
+    for newer, older in itertools.pairwise(chunks):
+        assert older.end == newer.start
+    assert chunks[1].start == datetime(2025, 1, 8, tzinfo=UTC)
+    assert plan_chunks(START, END + timedelta(hours=1), "1 min")[1:] == chunks[1:]
+    daily = plan_chunks(START, START + timedelta(days=400), "1 day")
+    assert len(daily) == 2 and all(
+        duration_seconds(chunk.duration) <= 365 * 86_400 for chunk in daily
+    )
+
+
+def test_token_bucket_respects_limit_in_every_window() -> None:
+    now = [0.0]
+
+    async def fake_sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    bucket = TokenBucket(6, 2.0, clock=lambda: now[0], sleep=fake_sleep)
+
+    async def drain() -> list[float]:
+        stamps = []
+        for _ in range(30):
+            await bucket.acquire()
+            stamps.append(now[0])
+        return stamps
+
+    stamps = asyncio.run(drain())
+    for idx, stamp in enumerate(stamps):
+        assert sum(1 for other in stamps[idx:] if other < stamp + 2.0) <= 6
+    assert stamps[-1] < 20.0
+
+
+def test_backfill_runs_chunks_concurrently_and_merges(tmp_path: Path) -> None:
+    fake_ib = _FakeIB()
+    store = BackfillStore(tmp_path / "chunks")
+    frame = asyncio.run(
+        backfill_history(
+            _client(fake_ib),
+            SimpleNamespace(conId=1, symbol="TEST"),
+            start=START,
+            end=END,
+            bar_size="1 min",
+            store=store,
+            limiter=_fast_limiter(),
+            concurrency=4,
+        )
+    )
+    assert len(fake_ib.calls) == 4
+    assert fake_ib.max_in_flight > 1
+    assert len(frame) == int((END - START).total_seconds() // 60)
+    assert frame["time"].is_unique and frame["time"].is_monotonic_increasing
+    assert frame["time"].iloc[0] == START
+
+
+def test_backfill_resumes_after_failed_chunk(tmp_path: Path) -> None:
+    store = BackfillStore(tmp_path / "chunks")
+    chunks = plan_chunks(START, END, "1 min")
+    failing = _FakeIB(fail_ends={chunks[2].end})
+    kwargs = {
+        "start": START,
+        "end": END,
+        "bar_size": "1 min",
+        "store": store,
+        "limiter": _fast_limiter(),
+    }
+    with pytest.raises(RuntimeError, match="1 of 4 chunks"):
+        asyncio.run(
+            backfill_history(_client(failing), SimpleNamespace(conId=1, symbol="TEST"), **kwargs)
+        )
+    assert [store.has(chunk) for chunk in chunks] == [True, True, False, True]
+
+    retry = _FakeIB()
+    frame = asyncio.run(
+        backfill_history(_client(retry), SimpleNamespace(conId=1, symbol="TEST"), **kwargs)
+    )
+    assert retry.calls == [(chunks[2].end, chunks[2].duration)]
+    assert len(frame) == int((END - START).total_seconds() // 60)
+
+
+def test_backfill_does_not_store_chunks_that_failed_with_empty_bars(tmp_path: Path) -> None:
+    times = pd.date_range(START, END, freq="1min", inclusive="left")
+    history = pd.DataFrame(
+        {"time": times, "open": 100.0, "high": 101.0, "low": 99.0, "close": 100.5, "volume": 10.0}
+    )
+    # Past the pacing limit FakeIB emits error 162 and returns [] instead of raising.
+    fake_ib = FakeIB({"TEST": history}, pacing_limit=2)
+    client = TWS_Wrapper_Client(host="127.0.0.1", port=7497, client_id=1, ib=fake_ib)
+    store = BackfillStore(tmp_path / "chunks")
+    with pytest.raises(RuntimeError, match="2 of 4 chunks"):
+        asyncio.run(
+            backfill_history(
+                client,
+                Contract(symbol="TEST"),
+                start=START,
+                end=END,
+                bar_size="1 min",
+                store=store,
+                limiter=_fast_limiter(),
+                concurrency=1,
+            )
+        )
+    assert fake_ib.request_count == 4
+    assert sum(store.has(chunk) for chunk in plan_chunks(START, END, "1 min")) == 2
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from datetime import datetime, timedelta
-from typing import Sequence
+from math import sqrt
+from statistics import mean, pstdev
+
+import numpy as np
+import pytest
 
 from qsa.backtest.engine import run_engine
-from qsa.schemas.data import Bar
-from qsa.strategies.base import StrategySignal
+from qsa.backtest.metrics import annualized_sharpe, max_drawdown
+from qsa.schemas.data import Bar, BarHistory
+from qsa.strategies.base import SIGNAL_POSITIONS, StrategySignal
+from qsa.strategies.momentum_example import MomentumExampleStrategy, MomentumParams
 
 
 class _AlwaysLongStrategy:
@@ -60,9 +67,30 @@ def test_engine_enforces_t_minus_1_signal_and_t_trade() -> None:
 def test_engine_passes_unit_position_to_strategy() -> None:
     start = datetime(2025, 1, 1)
     bars = [
-        Bar(time=start + timedelta(days=0), open=100.0, high=100.0, low=100.0, close=100.0, volume=1_000.0),
-        Bar(time=start + timedelta(days=1), open=100.0, high=100.0, low=100.0, close=100.0, volume=1_000.0),
-        Bar(time=start + timedelta(days=2), open=100.0, high=100.0, low=100.0, close=100.0, volume=1_000.0),
+        Bar(
+            time=start + timedelta(days=0),
+            open=100.0,
+            high=100.0,
+            low=100.0,
+            close=100.0,
+            volume=1_000.0,
+        ),
+        Bar(
+            time=start + timedelta(days=1),
+            open=100.0,
+            high=100.0,
+            low=100.0,
+            close=100.0,
+            volume=1_000.0,
+        ),
+        Bar(
+            time=start + timedelta(days=2),
+            open=100.0,
+            high=100.0,
+            low=100.0,
+            close=100.0,
+            volume=1_000.0,
+        ),
     ]
     summary = run_engine(
         bars,
@@ -100,10 +128,31 @@ def test_engine_blocks_entry_when_leverage_cap_exceeded() -> None:
 def test_engine_liquidates_and_stops_after_nonpositive_equity() -> None:
     start = datetime(2025, 1, 1)
     bars = [
-        Bar(time=start + timedelta(days=0), open=100.0, high=100.0, low=100.0, close=100.0, volume=1_000.0),
-        Bar(time=start + timedelta(days=1), open=100.0, high=100.0, low=100.0, close=100.0, volume=1_000.0),
+        Bar(
+            time=start + timedelta(days=0),
+            open=100.0,
+            high=100.0,
+            low=100.0,
+            close=100.0,
+            volume=1_000.0,
+        ),
+        Bar(
+            time=start + timedelta(days=1),
+            open=100.0,
+            high=100.0,
+            low=100.0,
+            close=100.0,
+            volume=1_000.0,
+        ),
         Bar(time=start + timedelta(days=2), open=0.0, high=0.0, low=0.0, close=0.0, volume=1_000.0),
-        Bar(time=start + timedelta(days=3), open=100.0, high=100.0, low=100.0, close=100.0, volume=1_000.0),
+        Bar(
+            time=start + timedelta(days=3),
+            open=100.0,
+            high=100.0,
+            low=100.0,
+            close=100.0,
+            volume=1_000.0,
+        ),
     ]
     summary = run_engine(
         bars,
@@ -120,3 +169,181 @@ def test_engine_liquidates_and_stops_after_nonpositive_equity() -> None:
     assert summary.trades_log[-1]["action"] == "equity_stop_liquidation"
     assert summary.trades_log[-1]["target_position"] == 0.0
     assert summary.final_equity == 0.0
+
+
+class _PerBarMomentum:
+    """Momentum strategy without ``generate_signals``, forcing the per-bar engine loop."""
+
+    def __init__(self, params: MomentumParams) -> None:
+        self._inner = MomentumExampleStrategy(params)
+
+    def generate_signal(self, bars: Sequence[Bar], current_position: float) -> StrategySignal:
+        return self._inner.generate_signal(bars, current_position=current_position)
+
+
+def _random_walk_bars(count: int, seed: int = 7) -> list[Bar]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, count)))
+    start = datetime(2025, 1, 1)
+    return [
+        Bar(time=start + timedelta(minutes=idx), open=close, high=close, low=close, close=close)
+        for idx, close in enumerate(closes.tolist())
+    ]
+
+
+def test_momentum_signal_matrix_matches_scalar_signals() -> None:
+    bars = BarHistory.from_bars(_random_walk_bars(120))
+    strategy = MomentumExampleStrategy(
+        MomentumParams(lookback=5, entry_threshold=0.01, exit_threshold=0.002)
+    )
+    signals = strategy.generate_signals(bars)
+    assert signals.shape == (len(bars), 3)
+    for row in range(len(bars)):
+        for column, unit in enumerate(SIGNAL_POSITIONS):
+            scalar = strategy.generate_signal(bars[: row + 1], current_position=unit)
+            assert signals[row, column] == scalar.target_position
+
+
+def test_vectorized_fast_path_matches_per_bar_loop() -> None:
+    bars = _random_walk_bars(2_000)
+    params = MomentumParams(lookback=10, entry_threshold=0.02, exit_threshold=0.0)
+    for initial_cash in (100_000.0, 2_050.0):
+        kwargs = {
+            "initial_cash": initial_cash,
+            "target_notional": 2_000.0,
+            "max_abs_position": 50.0,
+            "max_gross_leverage": 1.0,
+        }
+        fast = run_engine(bars, strategy=MomentumExampleStrategy(params), **kwargs)  # type: ignore[arg-type]
+        loop = run_engine(bars, strategy=_PerBarMomentum(params), **kwargs)  # type: ignore[arg-type]
+        assert fast.trades > 0
+        assert fast == loop
+
+
+class _IncrementalMomentum(_PerBarMomentum):
+    """Momentum strategy exposing only the incremental ``on_bar`` lifecycle to the engine."""
+
+    @property
+    def warmup_bars(self) -> int:
+        return self._inner.warmup_bars
+
+    def reset(self) -> None:
+        self._inner.reset()
+
+    def warmup(self, bars: Sequence[Bar]) -> None:
+        self._inner.warmup(bars)
+
+    def on_bar(self, bar: Bar, current_position: float) -> StrategySignal:
+        return self._inner.on_bar(bar, current_position=current_position)
+
+
+def test_incremental_path_matches_per_bar_loop() -> None:
+    bars = _random_walk_bars(1_000, seed=11)
+    params = MomentumParams(lookback=8, entry_threshold=0.02, exit_threshold=0.0)
+    kwargs = {"initial_cash": 100_000.0, "target_notional": 2_000.0, "max_abs_position": 50.0}
+    incremental = _IncrementalMomentum(params)
+    first = run_engine(bars, strategy=incremental, **kwargs)  # type: ignore[arg-type]
+    loop = run_engine(bars, strategy=_PerBarMomentum(params), **kwargs)  # type: ignore[arg-type]
+    assert first.trades > 0
+    assert first == loop
+    # The engine resets state, so the same object can be reused for another run.
+    assert run_engine(bars, strategy=incremental, **kwargs) == loop  # type: ignore[arg-type]
+
+
+def test_warmup_then_on_bar_matches_full_history_signal() -> None:
+    bars = _random_walk_bars(300, seed=3)
+    strategy = MomentumExampleStrategy(MomentumParams(lookback=20, entry_threshold=0.01))
+    for current in SIGNAL_POSITIONS:
+        strategy.reset()
+        strategy.warmup(bars[:-1])
+        assert strategy.on_bar(bars[-1], current_position=current) == strategy.generate_signal(
+            bars, current_position=current
+        )
+
+
+def test_summary_only_mode_keeps_scalar_metrics() -> None:
+    bars = _random_walk_bars(500, seed=5)
+    params = MomentumParams(lookback=10, entry_threshold=0.02)
+    kwargs = {"initial_cash": 100_000.0, "target_notional": 2_000.0, "max_abs_position": 50.0}
+    full = run_engine(bars, strategy=MomentumExampleStrategy(params), **kwargs)  # type: ignore[arg-type]
+    scalar = run_engine(
+        bars,
+        strategy=MomentumExampleStrategy(params),
+        record_series=False,
+        **kwargs,  # type: ignore[arg-type]
+    )
+    assert (scalar.trades, scalar.final_equity, scalar.sharpe) == (
+        full.trades,
+        full.final_equity,
+        full.sharpe,
+    )
+    assert scalar.equity_log is None
+    with pytest.raises(ValueError, match="summary-only"):
+        assert not scalar.trades_log
+
+
+def test_series_frames_match_materialized_rows() -> None:
+    bars = _random_walk_bars(300, seed=9)
+    summary = run_engine(
+        bars,
+        strategy=MomentumExampleStrategy(MomentumParams(lookback=5, entry_threshold=0.01)),
+        initial_cash=100_000.0,
+        target_notional=2_000.0,
+        max_abs_position=50.0,
+    )
+    equity = summary.equity_frame()
+    trades = summary.trades_frame()
+    assert len(equity) == len(summary.equity_curve) == len(bars) - 1
+    assert len(trades) == len(summary.trades_log) == summary.trades > 0
+    assert list(trades.columns) == list(summary.trades_log[0].keys())
+    assert equity["time"].iloc[0].isoformat() == summary.equity_curve[0]["time"]
+    assert round(float(trades["price"].iloc[-1]), 6) == summary.trades_log[-1]["price"]
+
+
+def test_array_metrics_match_scalar_definitions() -> None:
+    rng = np.random.default_rng(13)
+    equity = 100_000.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, 5_000)))
+    returns = equity[1:] / equity[:-1] - 1.0
+
+    peak, worst = equity[0], 0.0
+    for value in equity.tolist():
+        peak = max(peak, value)
+        worst = min(worst, value / peak - 1.0)
+    assert max_drawdown(equity) == worst
+    assert max_drawdown(equity.tolist()) == max_drawdown(equity)
+    assert max_drawdown([100.0, 110.0, 120.0]) == 0.0
+    expected = mean(returns.tolist()) / pstdev(returns.tolist()) * sqrt(252)
+    assert annualized_sharpe(returns) == pytest.approx(expected, rel=1e-9)
+    assert annualized_sharpe(np.full(10, 0.001)) == 0.0
+    assert annualized_sharpe([0.01]) == 0.0
+
+
+def test_momentum_signal_actions_match_scalar_labels() -> None:
+    bars = BarHistory.from_bars(_random_walk_bars(120))
+    strategy = MomentumExampleStrategy(
+        MomentumParams(lookback=5, entry_threshold=0.01, exit_threshold=0.002)
+    )
+    rows = np.repeat(np.arange(len(bars)), len(SIGNAL_POSITIONS))
+    units = np.tile(np.asarray(SIGNAL_POSITIONS), len(bars))
+    labels = strategy.signal_actions(bars, rows, units)
+    for row, unit, label in zip(rows.tolist(), units.tolist(), labels):
+        assert label == strategy.generate_signal(bars[: row + 1], current_position=unit).action
+
+
+def test_vectorized_fast_path_matches_per_bar_loop_through_an_equity_stop() -> None:
+    bars = _random_walk_bars(600)
+    crash = [
+        Bar(time=bar.time, open=0.5, high=0.5, low=0.5, close=0.5) if 300 <= idx < 310 else bar
+        for idx, bar in enumerate(bars)
+    ]
+    params = MomentumParams(lookback=10, entry_threshold=0.02, exit_threshold=0.0)
+    kwargs = {
+        "initial_cash": 1_000.0,
+        "target_notional": 10_000.0,
+        "max_abs_position": 1_000.0,
+        "allow_leverage": True,
+    }
+    fast = run_engine(crash, strategy=MomentumExampleStrategy(params), **kwargs)  # type: ignore[arg-type]
+    loop = run_engine(crash, strategy=_PerBarMomentum(params), **kwargs)  # type: ignore[arg-type]
+    assert any(row["action"] == "equity_stop_liquidation" for row in fast.trades_log)
+    assert fast == loop
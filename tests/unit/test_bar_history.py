@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qsa.backtest.engine import run_engine
+from qsa.schemas.data import Bar, BarHistory
+from qsa.strategies.momentum_example import MomentumExampleStrategy, MomentumParams
+
+
+def _bars(count: int, *, tz: bool = False) -> list[Bar]:
+    start = datetime(2025, 1, 1, tzinfo=UTC if tz else None)
+    return [
+        Bar(
+            time=start + timedelta(minutes=idx),
+            open=100.0 + idx,
+            high=101.0 + idx,
+            low=99.0 + idx,
+            close=100.0 + idx + (idx % 7) * 0.25,
+            volume=1_000.0 + idx,
+        )
+        for idx in range(count)
+    ]
+
+
+def test_bar_history_round_trips_bars() -> None:
+    bars = _bars(5)
+    history = BarHistory.from_bars(bars)
+    assert len(history) == 5
+    assert list(history) == bars
+    assert history[-1] == bars[-1]
+    assert list(history[1:3]) == bars[1:3]
+
+
+def test_bar_history_preserves_timezone() -> None:
+    bars = _bars(3, tz=True)
+    history = BarHistory.from_bars(bars)
+    assert history[0].time == bars[0].time
+    assert history[0].time.tzinfo is not None
+
+
+def test_bar_history_from_frame_matches_bars() -> None:
+    bars = _bars(4)
+    frame = pd.DataFrame([bar.__dict__ for bar in bars])
+    assert list(BarHistory.from_frame(frame)) == bars
+
+
+def test_expanding_view_advances_without_copying() -> None:
+    history = BarHistory.from_bars(_bars(10))
+    visible = history.expanding(3)
+    assert len(visible) == 3
+    visible.advance()
+    assert len(visible) == 4
+    assert np.shares_memory(visible.closes, history.closes)
+    np.testing.assert_array_equal(visible.closes[-2:], history.closes[2:4])
+    with pytest.raises(IndexError):
+        visible[4]
+
+
+def test_columns_are_read_only() -> None:
+    history = BarHistory.from_bars(_bars(3))
+    with pytest.raises(ValueError):
+        history.closes[0] = 1.0
+
+
+def test_engine_accepts_list_and_history_identically() -> None:
+    bars = _bars(200)
+    kwargs = {
+        "initial_cash": 100_000.0,
+        "target_notional": 10_000.0,
+        "max_abs_position": 1_000.0,
+    }
+    strategy = MomentumExampleStrategy(MomentumParams(lookback=5, entry_threshold=0.01))
+    from_list = run_engine(bars, strategy=strategy, **kwargs)  # type: ignore[arg-type]
+    from_history = run_engine(BarHistory.from_bars(bars), strategy=strategy, **kwargs)  # type: ignore[arg-type]
+    assert from_list == from_history
+    assert from_list.trades > 0
+
+
+def test_bar_history_to_frame_round_trips_and_compares_by_value() -> None:
+    for tz in (False, True):
+        history = BarHistory.from_bars(_bars(6, tz=tz))
+        frame = history.to_frame()
+        assert list(frame.columns) == ["time", "open", "high", "low", "close", "volume"]
+        assert BarHistory.from_frame(frame) == history
+        assert frame["time"].iloc[-1].to_pydatetime() == history[-1].time
+
+    history = BarHistory.from_bars(_bars(6))
+    assert history[:3] == BarHistory.from_bars(_bars(3))
+    assert history != BarHistory.from_bars(_bars(6, tz=True))
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from qsa.data.buffers import BarAggregator, BarStore, RingBuffer, TickBuffer
+
+
+def test_ring_buffer_keeps_newest_values() -> None:
+    buffer = RingBuffer(3)
+    for value in range(5):
+        buffer.append(value)
+    assert buffer.full
+    assert len(buffer) == 3
+    assert buffer[0] == 2.0
+    assert buffer[-1] == 4.0
+    np.testing.assert_array_equal(buffer.to_array(), [2.0, 3.0, 4.0])
+
+
+def test_ring_buffer_partial_fill_and_clear() -> None:
+    buffer = RingBuffer(4)
+    buffer.extend([1.0, 2.0])
+    assert not buffer.full
+    np.testing.assert_array_equal(buffer.to_array(), [1.0, 2.0])
+    with pytest.raises(IndexError):
+        buffer[2]
+    buffer.clear()
+    assert len(buffer) == 0
+
+
+def _store(rows: int) -> BarStore:
+    times = pd.date_range("2024-01-02 09:30", periods=rows, freq="min")
+    closes = np.arange(rows, dtype=np.float64) + 100.0
+    return BarStore.from_frame(
+        pd.DataFrame(
+            {
+                "time": times,
+                "open": closes,
+                "high": closes + 1,
+                "low": closes - 1,
+                "close": closes,
+                "volume": 10.0,
+            }
+        )
+    )
+
+
+def _ns(minute: int) -> int:
+    return pd.Timestamp(datetime(2024, 1, 2, 9, 30) + timedelta(minutes=minute)).value
+
+
+def test_bar_store_updates_forming_bar_and_appends_in_place() -> None:
+    store = _store(3)
+    view = store.view()
+    assert store.completed == 2
+
+    assert not store.upsert(_ns(2), 102.0, 110.0, 101.0, 109.0, 25.0)
+    assert view.closes[-1] == 109.0
+    assert not store.upsert(_ns(0), 1.0, 1.0, 1.0, 1.0, 1.0)
+    assert view.closes[0] == 100.0
+
+    for minute in range(3, 200):
+        assert store.upsert(_ns(minute), 1.0, 2.0, 0.5, float(minute), 1.0)
+    assert len(store) == 200
+    assert len(view) == 3
+    completed = store.view(include_forming=False)
+    assert len(completed) == 199
+    assert completed.closes[-1] == 198.0
+    assert not completed.closes.flags.writeable
+    assert completed.time_at(-1) == datetime(2024, 1, 2, 12, 48)
+
+
+def test_bar_store_streams_completed_bars_until_closed() -> None:
+    store = _store(2)
+
+    async def scenario() -> list[float]:
+        seen: list[float] = []
+
+        async def consume() -> None:
+            async for bar in store.completed_bars():
+                seen.append(bar.close)
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        store.upsert(_ns(1), 1.0, 1.0, 1.0, 150.0, 1.0)
+        store.upsert(_ns(2), 1.0, 1.0, 1.0, 2.0, 1.0)
+        store.upsert(_ns(3), 1.0, 1.0, 1.0, 3.0, 1.0)
+        await asyncio.sleep(0)
+        store.upsert(_ns(4), 1.0, 1.0, 1.0, 4.0, 1.0)
+        store.close()
+        await asyncio.wait_for(consumer, timeout=1.0)
+        return seen
+
+    assert asyncio.run(scenario()) == [150.0, 2.0, 3.0]
+
+
+def test_tick_buffer_queries_newest_ticks_across_the_wrap() -> None:
+    ticks = TickBuffer(capacity=4)
+    values_before = ticks._values
+    for i in range(6):
+        traded = 10.0 * (i % 2)
+        ticks.append(
+            i, 100 + i, 10.0 + i, 10.5 + i, 10.2 + i, 1.0, 2.0, traded, traded, traded * (10.2 + i)
+        )
+    assert ticks._values is values_before
+    assert (len(ticks), ticks.count) == (4, 6)
+    assert ticks.exchange_times().tolist() == [2, 3, 4, 5]
+    assert ticks.receive_times(2).tolist() == [104, 105]
+    assert ticks.mid(3).tolist() == [13.25, 14.25, 15.25]
+    assert ticks.spread().tolist() == [0.5] * 4
+    # Only the odd updates traded: 10 shares at 13.2 and 10 at 15.2.
+    assert ticks.vwap() == pytest.approx(14.2)
+    assert ticks.vwap(1) == pytest.approx(15.2)
+    assert np.isnan(ticks.vwap(0))
+    assert ticks.column("last", 1).tolist() == [15.2]
+    with pytest.raises(ValueError, match="Unknown tick field"):
+        ticks.column("price")
+    with pytest.raises(ValueError, match="capacity must be positive"):
+        TickBuffer(capacity=0)
+
+
+def _utc_ns(hour: int, minute: int, second: int = 0) -> int:
+    # 2025-01-21 is EST, so New York wall time is UTC-5.
+    return pd.Timestamp(datetime(2025, 1, 21, hour + 5, minute, second, tzinfo=UTC)).value
+
+
+def test_bar_aggregator_rolls_up_rth_bars_and_seals_at_the_close() -> None:
+    store = BarStore(tz=UTC)
+    hourly = BarAggregator(
+        store, 3_600, tz=ZoneInfo("America/New_York"), session=(time(9, 30), time(16, 0))
+    )
+    assert not hourly.add(_utc_ns(9, 29, 55), 1.0, 1.0, 1.0, 1.0, 5.0)
+    assert len(store) == 0
+    for second in range(0, 30 * 60, 5):
+        price = 100.0 + second / 100
+        sealed = hourly.add(
+            _utc_ns(9, 30 + second // 60, second % 60), price, price + 1, price - 1, price, 10.0
+        )
+    # The 09:59:55 bar ends at 10:00, the clipped first bucket's close.
+    assert sealed
+    assert (len(store), store.completed) == (1, 1)
+    bar_time, *ohlcv = store.last_row()  # type: ignore[misc]
+    assert bar_time == _utc_ns(9, 30)
+    assert ohlcv == pytest.approx([100.0, 118.95, 99.0, 117.95, 3_600.0])
+    assert not hourly.add(_utc_ns(10, 0), 50.0, 51.0, 49.0, 50.5, 1.0)
+    assert (len(store), store.completed) == (2, 1)
+    # A missing closing bar still completes the hour when the next one starts.
+    assert not hourly.add(_utc_ns(11, 0, 5), 60.0, 60.0, 60.0, 60.0, 1.0)
+    assert store.completed == 2
+    assert hourly.add(_utc_ns(15, 59, 55), 70.0, 70.0, 70.0, 70.0, 1.0)
+    assert store.last_row()[0] == _utc_ns(15, 0)  # type: ignore[index]
+
+
+def test_bar_aggregator_resumes_the_seeded_forming_bar() -> None:
+    store = BarStore()
+    store.upsert(pd.Timestamp(2025, 1, 21, 10, 5).value, 10.0, 12.0, 9.0, 11.0, 100.0)
+    five_min = BarAggregator(store, 300, tz=ZoneInfo("America/New_York"))
+    five_min.add(_utc_ns(10, 7), 11.0, 13.0, 10.5, 12.5, 20.0)
+    # A naive store keeps New York wall-clock times.
+    assert store.last_row() == (
+        pd.Timestamp(2025, 1, 21, 10, 5).value,
+        10.0,
+        13.0,
+        9.0,
+        12.5,
+        120.0,
+    )
+    assert len(store) == 1
+    with pytest.raises(ValueError, match="multiple of 5s"):
+        BarAggregator(store, 7)
+    with pytest.raises(ValueError, match="open before it closes"):
+        BarAggregator(store, 60, session=(time(16, 0), time(9, 30)))
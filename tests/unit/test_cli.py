@@ -16,7 +16,10 @@ from qsa.live import runner
 
 
 class _FakeBroker:
-    def __init__(self, host: str, port: int, client_id: int, account: str) -> None:
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del contract_cache
         self.host = host
         self.port = port
         self.client_id = client_id
@@ -32,18 +35,8 @@ class _FakeBroker:
     async def disconnect(self) -> None:
         return None
 
-    async def request_historical_data(self, *args: object, **kwargs: object) -> None:
-        del args, kwargs
-        return None
-
-    async def wait_for_historical_data(
-        self, symbol: str, timeframe: str, timeout_s: float = 30.0
-    ) -> bool:
-        del symbol, timeframe, timeout_s
-        return True
-
-    def get_ohlc_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
-        del symbol, timeframe
+    async def fetch_historical_bars(self, contract: object, **kwargs: object) -> pd.DataFrame:
+        del contract, kwargs
         start = datetime(2025, 1, 1)
         rows: list[dict[str, object]] = []
         for idx in range(30):
@@ -75,6 +68,10 @@ class _FakeBroker:
             "free_margin": 100_000.0,
         }
 
+    async def wait_for_account_equity(self, *, timeout_s: float = 5.0) -> float | None:
+        del timeout_s
+        return self.get_account_data()["account_equity"]
+
     async def place_market_order(
         self,
         symbol: str,
@@ -121,8 +118,8 @@ def _write_isolated_config(tmp_path: Path, template_path: str) -> str:
     return str(out_path)
 
 
-def test_backtest_returns_mode_and_metrics(tmp_path: Path) -> None:
-    data_pipeline.TWS_Wrapper_Client = _FakeBroker  # type: ignore[assignment]
+def test_backtest_returns_mode_and_metrics(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
     config_path = _write_isolated_config(tmp_path, "configs/dev.yaml")
     result = run_backtest(config_path=config_path)
     assert result["run_type"] == "backtest"
@@ -130,13 +127,11 @@ def test_backtest_returns_mode_and_metrics(tmp_path: Path) -> None:
     assert "plot_files" not in result
 
 
-def test_live_dry_run_returns_mode(tmp_path: Path) -> None:
-    runner.TWS_Wrapper_Client = _FakeBroker
-    data_pipeline.TWS_Wrapper_Client = _FakeBroker  # type: ignore[assignment]
+def test_live_dry_run_returns_mode(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _FakeBroker)
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
     config_path = _write_isolated_config(tmp_path, "configs/paper.yaml")
-    result = asyncio.run(
-        runner.run_live(config_path=config_path, dry_run=True, symbol="TEST")
-    )
+    result = asyncio.run(runner.run_live(config_path=config_path, dry_run=True, symbol="TEST"))
     assert result.run_type == "live"
     assert result.order_id == "dry-run"
     serialized = asdict(result)
@@ -146,32 +141,62 @@ def test_live_dry_run_returns_mode(tmp_path: Path) -> None:
 
 def test_cli_live_accepts_symbol_argument() -> None:
     parser = _build_parser()
-    args = parser.parse_args(
-        ["live", "--config", "configs/paper.yaml", "--symbol", "AAPL"]
-    )
+    args = parser.parse_args(["live", "--config", "configs/paper.yaml", "--symbol", "AAPL"])
     assert args.command == "live"
     assert args.symbol == "AAPL"
 
 
-def test_live_non_dry_run_requires_account_equity(tmp_path: Path) -> None:
-    runner.TWS_Wrapper_Client = _NoEquityBroker
-    data_pipeline.TWS_Wrapper_Client = _NoEquityBroker  # type: ignore[assignment]
+def test_live_non_dry_run_requires_account_equity(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _NoEquityBroker)
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _NoEquityBroker)
     config_path = _write_isolated_config(tmp_path, "configs/paper.yaml")
     with pytest.raises(RuntimeError, match="account_equity"):
         asyncio.run(runner.run_live(config_path=config_path, dry_run=False, symbol="TEST"))
 
 
-def test_live_non_dry_run_validates_configured_account(tmp_path: Path) -> None:
-    runner.TWS_Wrapper_Client = _UnknownAccountBroker
-    data_pipeline.TWS_Wrapper_Client = _UnknownAccountBroker  # type: ignore[assignment]
+def test_live_non_dry_run_validates_configured_account(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _UnknownAccountBroker)
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _UnknownAccountBroker)
     config_path = _write_isolated_config(tmp_path, "configs/paper.yaml")
     with pytest.raises(RuntimeError, match="not in managed accounts"):
         asyncio.run(runner.run_live(config_path=config_path, dry_run=False, symbol="TEST"))
 
 
-def test_live_non_dry_run_surfaces_order_rejection(tmp_path: Path) -> None:
-    runner.TWS_Wrapper_Client = _RejectingBroker
-    data_pipeline.TWS_Wrapper_Client = _RejectingBroker  # type: ignore[assignment]
+def test_live_non_dry_run_surfaces_order_rejection(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _RejectingBroker)
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _RejectingBroker)
     config_path = _write_isolated_config(tmp_path, "configs/paper.yaml")
     with pytest.raises(RuntimeError, match="IBKR rejected market order"):
         asyncio.run(runner.run_live(config_path=config_path, dry_run=False, symbol="TEST"))
+
+
+def test_cli_sweep_accepts_grid_and_workers() -> None:
+    parser = _build_parser()
+    args = parser.parse_args(["sweep", "--grid", "grid.yaml", "--workers", "4"])
+    assert args.command == "sweep"
+    assert args.grid == "grid.yaml"
+    assert args.workers == 4
+
+
+def test_cli_cache_flags_are_mutually_exclusive() -> None:
+    parser = _build_parser()
+    args = parser.parse_args(["backtest", "--offline"])
+    assert args.offline is True and args.refresh is False
+    args = parser.parse_args(["sweep", "--grid", "grid.yaml", "--refresh"])
+    assert args.refresh is True
+    with pytest.raises(SystemExit):
+        parser.parse_args(["backtest", "--offline", "--refresh"])
+
+
+def test_cli_backfill_parses_dates_as_utc() -> None:
+    args = _build_parser().parse_args(["backfill", "--start", "2024-01-02", "--concurrency", "2"])
+    assert args.command == "backfill"
+    assert args.start.isoformat() == "2024-01-02T00:00:00+00:00"
+    assert args.end is None
+    assert args.concurrency == 2
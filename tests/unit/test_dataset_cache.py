@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, ClassVar
+
+import pandas as pd
+import pytest
+import yaml
+
+from qsa.config.settings import load_settings
+from qsa.data import pipeline as data_pipeline
+from qsa.data.cache import DatasetCache
+from qsa.data.pipeline import _clean_ohlcv, build_versioned_dataset
+from qsa.execution.fake_ib import FakeIB
+from qsa.execution.tws_client import TWS_Wrapper_Client
+
+
+def _raw_frame(rows: int = 20) -> pd.DataFrame:
+    start = datetime(2025, 1, 1)
+    return pd.DataFrame(
+        {
+            "time": [start + timedelta(days=idx) for idx in range(rows)],
+            "open": [100.0 + idx for idx in range(rows)],
+            "high": [101.0 + idx for idx in range(rows)],
+            "low": [99.0 + idx for idx in range(rows)],
+            "close": [100.5 + idx for idx in range(rows)],
+            "volume": [1_000 + idx for idx in range(rows)],
+        }
+    )
+
+
+class _CountingBroker:
+    fetches = 0
+
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del host, port, client_id, account, contract_cache
+
+    @staticmethod
+    def get_contract(symbol: str, contract_id: int, exchange: str) -> dict[str, object]:
+        return {"symbol": symbol, "contract_id": contract_id, "exchange": exchange}
+
+    async def connect(self) -> None:
+        return None
+
+    async def disconnect(self) -> None:
+        return None
+
+    async def fetch_historical_bars(self, contract: object, **kwargs: object) -> pd.DataFrame:
+        del contract, kwargs
+        type(self).fetches += 1
+        return _raw_frame()
+
+
+def _settings(tmp_path: Path, **data_overrides: object):
+    cfg = yaml.safe_load(Path("configs/dev.yaml").read_text())
+    cfg["data"]["root"] = str(tmp_path / "data")
+    cfg["data"].update(data_overrides)
+    path = tmp_path / "dev.yaml"
+    path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    return load_settings(str(path))
+
+
+@pytest.fixture
+def counting_broker(monkeypatch: pytest.MonkeyPatch) -> type[_CountingBroker]:
+    _CountingBroker.fetches = 0
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _CountingBroker)
+    return _CountingBroker
+
+
+def test_cache_round_trips_cleaned_frame(tmp_path: Path) -> None:
+    cache = DatasetCache(tmp_path, ttl_s=3600.0, max_bytes=10_000_000)
+    cleaned = _clean_ohlcv(_raw_frame())
+    cache.store("abc", cleaned, {"dataset_id": "id-1"})
+
+    loaded = cache.load("abc")
+    assert loaded is not None
+    assert not loaded.expired
+    assert loaded.dataset_id == "id-1"
+    pd.testing.assert_frame_equal(loaded.frame, cleaned, check_dtype=False)
+    assert cache.load("missing") is None
+
+
+def test_cache_marks_entries_older_than_ttl_expired(tmp_path: Path) -> None:
+    cache = DatasetCache(tmp_path, ttl_s=60.0, max_bytes=10_000_000)
+    cache.store("abc", _clean_ohlcv(_raw_frame()), {"dataset_id": "id-1", "fetched_at": 0.0})
+    loaded = cache.load("abc")
+    assert loaded is not None and loaded.expired
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cleaned = _clean_ohlcv(_raw_frame(200))
+    probe = DatasetCache(tmp_path / "probe", ttl_s=3600.0, max_bytes=10_000_000)
+    probe.store("x", cleaned, {"dataset_id": "x"})
+    entry_bytes = sum(path.stat().st_size for path in (tmp_path / "probe").iterdir())
+
+    cache = DatasetCache(tmp_path / "cache", ttl_s=3600.0, max_bytes=int(entry_bytes * 2.5))
+    cache.store("a", cleaned, {"dataset_id": "a"})
+    cache.store("b", cleaned, {"dataset_id": "b"})
+    meta_a = tmp_path / "cache" / "a.json"
+    meta_a.write_text(json.dumps({**json.loads(meta_a.read_text()), "last_access": 1e12}))
+    cache.store("c", cleaned, {"dataset_id": "c"})
+
+    assert cache.load("b") is None
+    assert cache.load("a") is not None
+    assert cache.load("c") is not None
+
+
+def test_build_versioned_dataset_reuses_cache(
+    tmp_path: Path, counting_broker: type[_CountingBroker]
+) -> None:
+    settings = _settings(tmp_path)
+    first = build_versioned_dataset(settings)
+    second = build_versioned_dataset(settings)
+
+    assert counting_broker.fetches == 1
+    assert first.manifest["cache"]["hit"] is False
+    assert second.manifest["cache"]["hit"] is True
+    assert second.dataset_id == first.dataset_id
+    assert second.bars == first.bars
+
+    build_versioned_dataset(settings, refresh=True)
+    assert counting_broker.fetches == 2
+
+
+def test_offline_serves_expired_cache_without_connecting(
+    tmp_path: Path, counting_broker: type[_CountingBroker]
+) -> None:
+    settings = _settings(tmp_path, cache_ttl_s=0)
+    fetched = build_versioned_dataset(settings)
+    offline = build_versioned_dataset(settings, offline=True)
+
+    assert counting_broker.fetches == 1
+    assert offline.manifest["cache"]["expired"] is True
+    assert offline.dataset_id == fetched.dataset_id
+
+
+def test_offline_without_cache_raises(
+    tmp_path: Path, counting_broker: type[_CountingBroker]
+) -> None:
+    settings = _settings(tmp_path)
+    with pytest.raises(FileNotFoundError, match="No cached dataset"):
+        build_versioned_dataset(settings, offline=True)
+    assert counting_broker.fetches == 0
+
+
+def test_cache_key_tracks_request_fields(
+    tmp_path: Path, counting_broker: type[_CountingBroker]
+) -> None:
+    build_versioned_dataset(_settings(tmp_path))
+    build_versioned_dataset(_settings(tmp_path, ib_bar_size="1 hour"))
+    assert counting_broker.fetches == 2
+
+
+class _TailBroker(_CountingBroker):
+    durations: ClassVar[list[str]] = []
+    start = datetime.combine(datetime.now().date(), datetime.min.time()) - timedelta(days=30)
+
+    async def fetch_historical_bars(self, contract: object, **kwargs: object) -> pd.DataFrame:
+        del contract
+        type(self).durations.append(str(kwargs["duration"]))
+        frame = _raw_frame(31)
+        frame["time"] = [self.start + timedelta(days=idx) for idx in range(31)]
+        if self.durations[-1] == "90 D":
+            # Initial fetch ends a day early with a partial last bar.
+            frame = frame.iloc[:30].copy()
+            frame.loc[29, "close"] = -1.0
+            return frame
+        return frame.iloc[-3:].reset_index(drop=True)
+
+
+def test_expired_cache_fetches_only_the_tail(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _TailBroker.durations = []
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _TailBroker)
+    settings = _settings(tmp_path, cache_ttl_s=0)
+
+    first = build_versioned_dataset(settings)
+    merged = build_versioned_dataset(settings)
+
+    assert _TailBroker.durations[0] == "90 D"
+    assert _TailBroker.durations[1].endswith(" D")
+    assert len(merged.bars) == 31
+    assert merged.bars[29].close == first.bars[28].close + 1.0
+    assert merged.manifest["cache"]["tail_rows"] == 2
+    assert merged.dataset_id == data_pipeline._dataset_digest(merged.bars_frame)
+    assert merged.dataset_id != first.dataset_id
+
+
+def test_digest_checkpoints_extend_without_rehashing_prefix() -> None:
+    rows = 2 * data_pipeline.DIGEST_BLOCK_ROWS + 17
+    frame = _clean_ohlcv(_raw_frame(rows))
+    prefix = frame.iloc[: data_pipeline.DIGEST_BLOCK_ROWS + 5]
+    reuse = data_pipeline._digest_checkpoints(prefix)
+    assert len(reuse) == 1
+
+    extended = data_pipeline._digest_checkpoints(frame, reuse=reuse)
+    assert extended == data_pipeline._digest_checkpoints(frame)
+    assert data_pipeline._dataset_digest(frame, extended) == data_pipeline._dataset_digest(frame)
+    assert data_pipeline._dataset_digest(prefix) != data_pipeline._dataset_digest(frame)
+
+
+def test_fingerprint_depends_on_values_not_frame_dtypes() -> None:
+    frame = _clean_ohlcv(_raw_frame(50))
+    as_ns = frame.assign(
+        time=frame["time"].astype("datetime64[ns]"), volume=frame["volume"].astype("int64")
+    )
+    assert data_pipeline._dataset_digest(as_ns) == data_pipeline._dataset_digest(frame)
+
+    bumped = frame.copy()
+    bumped.loc[10, "volume"] += 1.0
+    assert data_pipeline._dataset_digest(bumped) != data_pipeline._dataset_digest(frame)
+    aware = frame.assign(time=frame["time"].dt.tz_localize("UTC"))
+    assert data_pipeline._dataset_digest(aware) != data_pipeline._dataset_digest(frame)
+
+
+def test_cached_entries_from_older_fingerprint_versions_are_rehashed(
+    tmp_path: Path, counting_broker: type[_CountingBroker]
+) -> None:
+    settings = _settings(tmp_path)
+    fetched = build_versioned_dataset(settings)
+    meta_path = next((tmp_path / "data" / "cache" / "datasets").glob("*.json"))
+    meta = json.loads(meta_path.read_text())
+    meta.update({"dataset_id": "legacy-csv-digest", "fingerprint_version": 1, "checkpoints": []})
+    meta_path.write_text(json.dumps(meta))
+
+    reloaded = build_versioned_dataset(settings)
+    assert counting_broker.fetches == 1
+    assert reloaded.dataset_id == fetched.dataset_id
+    assert reloaded.manifest["fingerprint_version"] == data_pipeline.DATASET_FINGERPRINT_VERSION
+    assert (
+        json.loads(meta_path.read_text())["fingerprint_version"]
+        == data_pipeline.DATASET_FINGERPRINT_VERSION
+    )
+
+
+def test_empty_tail_refresh_serves_the_cached_dataset(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = _settings(tmp_path, cache_ttl_s=0)
+    frame = _raw_frame()
+    frame["time"] = [_TailBroker.start + timedelta(days=idx) for idx in range(len(frame))]
+    ib = FakeIB({settings.ib_symbol: frame})
+
+    class _FakeIBClient(TWS_Wrapper_Client):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, ib=ib, **kwargs)
+
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeIBClient)
+    first = build_versioned_dataset(settings)
+    # Outside market hours the tail request completes with no bars.
+    ib._history.clear()
+
+    started = time.perf_counter()
+    refreshed = build_versioned_dataset(settings)
+    assert time.perf_counter() - started < 5.0
+    assert ib.request_count == 2
+    assert refreshed.manifest["cache"]["tail_rows"] == 0
+    assert refreshed.dataset_id == first.dataset_id
+    assert refreshed.bars == first.bars
+
+
+def test_tail_refresh_trims_history_to_the_requested_duration(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = _settings(tmp_path, cache_ttl_s=0, ib_duration="10 D")
+    frame = _raw_frame(40)
+    frame["time"] = [_TailBroker.start + timedelta(days=idx) for idx in range(40)]
+    ib = FakeIB({settings.ib_symbol: frame.iloc[:30]})
+
+    class _FakeIBClient(TWS_Wrapper_Client):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, ib=ib, **kwargs)
+
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeIBClient)
+    first = build_versioned_dataset(settings)
+    assert len(first.bars) == 10
+
+    ib._history[settings.ib_symbol] = FakeIB._normalize(frame.iloc[:32])
+    merged = build_versioned_dataset(settings)
+    full = build_versioned_dataset(settings, refresh=True)
+
+    assert merged.manifest["cache"]["tail_rows"] == 2
+    assert merged.manifest["cache"]["trimmed_rows"] == 2
+    assert merged.manifest["request"]["duration"] == "10 D"
+    assert merged.bars == full.bars
+    assert merged.bars[0].time == frame["time"].iloc[22]
+    assert merged.dataset_id == full.dataset_id
+
+
+def test_failed_tail_refresh_serves_the_cached_dataset_as_expired(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = _settings(tmp_path, cache_ttl_s=0)
+    frame = _raw_frame()
+    frame["time"] = [_TailBroker.start + timedelta(days=idx) for idx in range(len(frame))]
+    ib = FakeIB({settings.ib_symbol: frame})
+
+    class _FakeIBClient(TWS_Wrapper_Client):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, ib=ib, **kwargs)
+
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeIBClient)
+    first = build_versioned_dataset(settings)
+    # Every further request is rejected with a pacing violation (error 162).
+    ib.pacing_limit = 0
+
+    stale = build_versioned_dataset(settings)
+    assert stale.manifest["cache"]["expired"] is True
+    assert stale.manifest["cache"]["fetched_at"] == first.manifest["cache"]["fetched_at"]
+    assert "162" in stale.manifest["cache"]["tail_error"]
+    assert stale.dataset_id == first.dataset_id
+
+    ib.pacing_limit = None
+    retried = build_versioned_dataset(settings)
+    assert "tail_error" not in retried.manifest["cache"]
+    assert retried.manifest["cache"]["fetched_at"] > first.manifest["cache"]["fetched_at"]
+
+
+def test_tail_refresh_that_trims_reuses_block_checkpoints(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings = _settings(tmp_path, cache_ttl_s=0, ib_duration="10 D", ib_bar_size="1 min")
+    # End the history on an epoch-aligned block boundary so the rehashed row count is fixed.
+    grid = pd.Timedelta(minutes=data_pipeline.DIGEST_BLOCK_ROWS)
+    end = pd.Timestamp.now().floor(grid) - pd.Timedelta(minutes=1)
+    history = _raw_frame(20_000)
+    history["time"] = pd.date_range(end=end, periods=len(history), freq="min")
+
+    async def fetch_initial(duration: str | None) -> pd.DataFrame:
+        return history.iloc[2_600:17_000]
+
+    async def fetch_tail(duration: str | None) -> pd.DataFrame:
+        return history.iloc[16_990:]
+
+    first = asyncio.run(data_pipeline._build_dataset(settings, fetch_initial))
+    hashed_rows = 0
+    hash_rows = data_pipeline._hash_rows
+
+    def counting_hash_rows(digest: Any, columns: Any, start: int, stop: int) -> None:
+        nonlocal hashed_rows
+        hashed_rows += stop - start
+        hash_rows(digest, columns, start, stop)
+
+    monkeypatch.setattr(data_pipeline, "_hash_rows", counting_hash_rows)
+    merged = asyncio.run(data_pipeline._build_dataset(settings, fetch_tail))
+    monkeypatch.setattr(data_pipeline, "_hash_rows", hash_rows)
+
+    assert merged.manifest["cache"]["trimmed_rows"] == 3_000
+    assert len(merged.bars) == len(first.bars) == 14_400
+    # Only the cut first block and the block holding the new tail are rehashed.
+    first_block = len(merged.bars) - 3 * data_pipeline.DIGEST_BLOCK_ROWS
+    assert hashed_rows == first_block + data_pipeline.DIGEST_BLOCK_ROWS
+    assert merged.dataset_id == data_pipeline._dataset_digest(merged.bars_frame)
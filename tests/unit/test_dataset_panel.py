@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import ClassVar
+
+import pandas as pd
+import pytest
+import yaml
+
+from qsa.config.settings import load_settings
+from qsa.data import pipeline as data_pipeline
+from qsa.data.pipeline import build_dataset_panel
+
+
+class _UniverseBroker:
+    """One fake connection serving many symbols; FLAKY fails once, SLOW never answers in time."""
+
+    connects = 0
+    attempts: ClassVar[dict[str, int]] = {}
+    in_flight = 0
+    max_in_flight = 0
+
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del host, port, client_id, account, contract_cache
+        self._frames: dict[str, pd.DataFrame] = {}
+
+    @staticmethod
+    def get_contract(symbol: str, contract_id: int, exchange: str) -> dict[str, object]:
+        return {"symbol": symbol, "contract_id": contract_id, "exchange": exchange}
+
+    async def connect(self) -> None:
+        type(self).connects += 1
+
+    async def disconnect(self) -> None:
+        return None
+
+    async def fetch_historical_bars(
+        self, contract: dict[str, object], **kwargs: object
+    ) -> pd.DataFrame:
+        del kwargs
+        cls = type(self)
+        symbol = str(contract["symbol"])
+        cls.attempts[symbol] = cls.attempts.get(symbol, 0) + 1
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            await asyncio.sleep(0.5 if symbol == "SLOW" else 0.01)
+        finally:
+            cls.in_flight -= 1
+        if symbol == "FLAKY" and cls.attempts[symbol] == 1:
+            raise ConnectionError("socket reset")
+        start = datetime(2025, 1, 1)
+        base = 50.0 + len(symbol)
+        self._frames[symbol] = pd.DataFrame(
+            {
+                "time": [start + timedelta(days=idx) for idx in range(20)],
+                "open": [base + idx for idx in range(20)],
+                "high": [base + idx + 1 for idx in range(20)],
+                "low": [base + idx - 1 for idx in range(20)],
+                "close": [base + idx + 0.5 for idx in range(20)],
+                "volume": [1_000.0] * 20,
+            }
+        )
+        return self._frames[symbol]
+
+
+@pytest.fixture
+def universe_broker(monkeypatch: pytest.MonkeyPatch) -> type[_UniverseBroker]:
+    _UniverseBroker.connects = 0
+    _UniverseBroker.attempts = {}
+    _UniverseBroker.in_flight = 0
+    _UniverseBroker.max_in_flight = 0
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _UniverseBroker)
+    return _UniverseBroker
+
+
+def _settings(tmp_path: Path):
+    cfg = yaml.safe_load(Path("configs/dev.yaml").read_text())
+    cfg["data"]["root"] = str(tmp_path / "data")
+    path = tmp_path / "dev.yaml"
+    path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    return load_settings(str(path))
+
+
+def test_panel_fetches_universe_over_one_connection(
+    tmp_path: Path, universe_broker: type[_UniverseBroker]
+) -> None:
+    symbols = [f"S{idx:02d}" for idx in range(12)]
+    panel = build_dataset_panel(_settings(tmp_path), symbols, concurrency=4)
+
+    assert universe_broker.connects == 1
+    assert 1 < universe_broker.max_in_flight <= 4
+    assert panel.symbols == tuple(symbols)
+    assert not panel.errors
+    assert panel["S03"].manifest["request"]["symbol"] == "S03"
+    assert panel["S03"].manifest["request"]["contract_id"] == 0
+    assert panel.manifest["dataset_ids"]["S03"] == panel["S03"].dataset_id
+    bar_panel = panel.to_bar_panel()
+    assert bar_panel.closes.shape == (20, 12)
+
+
+def test_panel_retries_and_reports_failures(
+    tmp_path: Path, universe_broker: type[_UniverseBroker]
+) -> None:
+    panel = build_dataset_panel(
+        _settings(tmp_path),
+        ["AAA", "FLAKY", "SLOW"],
+        timeout_s=0.1,
+        retries=1,
+        retry_backoff_s=0.01,
+    )
+    assert panel.symbols == ("AAA", "FLAKY")
+    assert universe_broker.attempts == {"AAA": 1, "FLAKY": 2, "SLOW": 2}
+    assert panel.errors["SLOW"].startswith("TimeoutError")
+
+
+def test_offline_panel_uses_cache_without_connecting(
+    tmp_path: Path, universe_broker: type[_UniverseBroker]
+) -> None:
+    settings = _settings(tmp_path)
+    build_dataset_panel(settings, ["AAA", "BBB"])
+    offline = build_dataset_panel(settings, ["AAA", "BBB", "CCC"], offline=True)
+
+    assert universe_broker.connects == 1
+    assert offline.symbols == ("AAA", "BBB")
+    assert offline.errors["CCC"].startswith("FileNotFoundError")
+    assert offline["AAA"].manifest["cache"]["hit"] is True
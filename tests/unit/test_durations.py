@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from qsa.data.durations import bar_size_seconds, duration_seconds, tail_duration
+
+
+def test_duration_and_bar_size_parsing() -> None:
+    assert duration_seconds("90 D") == 90 * 86_400
+    assert duration_seconds("2 W") == 14 * 86_400
+    assert bar_size_seconds("5 mins") == 300
+    assert bar_size_seconds("1 day") == 86_400
+    with pytest.raises(ValueError, match="Unsupported IB duration"):
+        duration_seconds("90days")
+
+
+def test_tail_duration_covers_gap_plus_last_bar() -> None:
+    now = datetime(2025, 3, 10, 15, 0)
+    assert tail_duration(datetime(2025, 3, 10, 14, 30), "5 mins", now) == "2100 S"
+    assert tail_duration(datetime(2025, 3, 7), "1 day", now) == "5 D"
+    assert tail_duration(datetime(2025, 3, 1), "1 hour", now) == "11 D"
@@ -0,0 +1,363 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from ib_async import RequestError
+
+from qsa.data.backfill import BackfillStore, PacingLimiter, backfill_history
+from qsa.execution.fake_ib import FakeIB
+from qsa.execution.tws_client import TWS_Wrapper_Client
+from qsa.live import runner
+from qsa.ops.latency import LatencyLog
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+def _client(ib: FakeIB) -> TWS_Wrapper_Client:
+    return TWS_Wrapper_Client(
+        host="127.0.0.1", port=7497, client_id=1, ib_account=ib.account, ib=ib
+    )
+
+
+def _fixture_ib(**kwargs: object) -> FakeIB:
+    frame = pd.read_csv(FIXTURES / "sample_ohlc.csv")
+    return FakeIB({"AAPL": frame}, **kwargs)  # type: ignore[arg-type]
+
+
+def test_serves_history_from_files_through_the_client(tmp_path: Path) -> None:
+    (tmp_path / "AAPL.csv").write_text((FIXTURES / "sample_ohlc.csv").read_text())
+    client = _client(FakeIB.from_directory(tmp_path))
+
+    async def scenario() -> pd.DataFrame:
+        await client.connect()
+        contract = client.get_contract("AAPL", 0, "SMART")
+        await client.request_historical_data(contract, "10 D", "1 day")
+        assert await client.wait_for_historical_data("AAPL", "1 day", timeout_s=1.0)
+        return client.get_ohlc_data("AAPL", "1 day")
+
+    frame = asyncio.run(scenario())
+    expected = pd.read_csv(FIXTURES / "sample_ohlc.csv").tail(10)
+    assert frame["close"].tolist() == expected["close"].astype(float).tolist()
+    assert frame["time"].iloc[-1] == pd.Timestamp(expected["time"].iloc[-1])
+
+
+def test_market_order_fills_and_updates_positions_and_equity() -> None:
+    ib = _fixture_ib(commission_per_share=0.01)
+    client = _client(ib)
+    price = float(pd.read_csv(FIXTURES / "sample_ohlc.csv")["close"].iloc[-1])
+
+    async def scenario() -> str:
+        await client.connect()
+        return await client.place_market_order("AAPL", 10.0)
+
+    assert asyncio.run(scenario()) == "ibkr:AAPL:10.0000:1"
+    assert client.get_order_by_id(1)["status"] == "Filled"  # type: ignore[index]
+    assert client.get_position("AAPL") == 10.0
+    account = client.get_account_data()
+    assert account["account_balance"] == pytest.approx(100_000.0 - 10 * price - 0.1)
+    assert account["account_equity"] == pytest.approx(100_000.0 - 0.1)
+    report = client.get_trade_report()
+    assert len(report) == 1
+
+
+def test_closed_positions_leave_the_index_as_they_leave_the_portfolio() -> None:
+    frame = pd.read_csv(FIXTURES / "sample_ohlc.csv")
+    ib = FakeIB({"AAPL": frame, "MSFT": frame})
+    client = _client(ib)
+
+    async def scenario() -> None:
+        await client.connect()
+        await client.place_market_order("AAPL", 10.0)
+        await client.place_market_order("MSFT", 5.0)
+        await client.place_market_order("AAPL", -10.0)
+
+    asyncio.run(scenario())
+    # ib_async removes flat positions from ib.portfolio(), which get_positions() used to scan.
+    assert (
+        set(client.get_positions()) == {item.contract.symbol for item in ib.portfolio()} == {"MSFT"}
+    )
+    assert client.get_position("AAPL") == 0.0
+
+
+def test_rejected_symbols_surface_as_order_rejections() -> None:
+    client = _client(_fixture_ib(reject_symbols=frozenset({"AAPL"})))
+    with pytest.raises(RuntimeError, match="status=Inactive"):
+        asyncio.run(client.place_market_order("AAPL", -3.0))
+
+
+def test_latency_delays_order_acknowledgement() -> None:
+    client = _client(_fixture_ib(latency_s=0.05))
+
+    async def scenario() -> float:
+        started = time.perf_counter()
+        await client.place_market_order("AAPL", 1.0)
+        return time.perf_counter() - started
+
+    assert asyncio.run(scenario()) >= 0.05
+
+
+def test_pacing_violations_return_empty_or_raise() -> None:
+    ib = _fixture_ib(pacing_limit=2)
+    contract = TWS_Wrapper_Client.get_contract("AAPL", 0, "SMART")
+    errors: list[int] = []
+    ib.errorEvent += lambda req_id, code, message, contract: errors.append(code)
+
+    async def request() -> int:
+        bars = await ib.reqHistoricalDataAsync(contract, "", "30 D", "1 day", "TRADES", True)
+        return len(bars)
+
+    assert [asyncio.run(request()) for _ in range(3)] == [20, 20, 0]
+    assert errors == [162]
+    ib.RaiseRequestErrors = True
+    with pytest.raises(RequestError):
+        asyncio.run(request())
+
+
+def test_backfill_resumes_after_pacing_errors(tmp_path: Path) -> None:
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    ib = _fixture_ib(pacing_limit=5)
+    ib.RaiseRequestErrors = True
+    client = _client(ib)
+    store = BackfillStore(tmp_path / "chunks")
+    # A permissive client-side limiter, so the fake's pacing rule is what trips.
+    limiter = PacingLimiter(global_limit=1_000, key_limit=1_000)
+
+    async def backfill() -> pd.DataFrame:
+        return await backfill_history(
+            client,
+            client.get_contract("AAPL", 0, "SMART"),
+            start=start,
+            end=start + timedelta(days=21),
+            bar_size="1 min",
+            store=store,
+            limiter=limiter,
+        )
+
+    with pytest.raises(RuntimeError, match="Backfill failed for 16 of 21 chunks"):
+        asyncio.run(backfill())
+    ib.pacing_limit = None
+    before = ib.request_count
+    frame = asyncio.run(backfill())
+    assert ib.request_count - before == 16
+    assert len(frame) == 20
+
+
+def test_live_daemon_decisions_per_second_on_fake_ib(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ib = _fixture_ib()
+    cfg = yaml.safe_load(Path("configs/paper.yaml").read_text())
+    cfg["data"]["root"] = str(tmp_path / "data")
+    cfg["execution"]["account"] = ib.account
+    cfg["risk"]["target_notional"] = 10_000
+    config_path = tmp_path / "paper.yaml"
+    config_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", functools.partial(TWS_Wrapper_Client, ib=ib))
+    count = 2_000
+    decisions: list[runner.LiveRunResult] = []
+
+    async def scenario() -> float:
+        stop = asyncio.Event()
+        daemon = asyncio.create_task(
+            runner.run_live_daemon(
+                str(config_path), dry_run=False, on_result=decisions.append, stop=stop
+            )
+        )
+        while not ib._subscriptions.get("AAPL"):
+            await asyncio.sleep(0)
+        last = datetime(2025, 1, 20)
+        started = time.perf_counter()
+        for day in range(1, count + 2):
+            close = 120.0 + 10.0 * ((day // 25) % 2)
+            ib.push_bar("AAPL", last + timedelta(days=day), close, close, close, close, 1_000.0)
+            await asyncio.sleep(0)
+        while len(decisions) < count:
+            await asyncio.sleep(0)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.wait_for(daemon, timeout=5.0)
+        return elapsed
+
+    elapsed = asyncio.run(scenario())
+    assert len(decisions) >= count
+    assert any(decision.order_id.startswith("ibkr:") for decision in decisions)
+    assert all(decision.status == "ok" for decision in decisions)
+    # Generous floor so CI catches order-of-magnitude regressions, not noise.
+    assert count / elapsed > 500
+
+
+def test_market_data_ticks_feed_the_tick_buffer() -> None:
+    ib = _fixture_ib()
+    client = _client(ib)
+    when = datetime(2025, 1, 21, 14, 30, tzinfo=UTC)
+
+    async def scenario() -> None:
+        await client.request_market_data(
+            client.get_contract("AAPL", 0, "SMART"), tick_capacity=1_024
+        )
+
+    asyncio.run(scenario())
+    ib.push_tick("AAPL", 100.0, 100.2, when=when)
+    ib.push_tick(
+        "AAPL", 100.1, 100.3, last=100.2, size=300.0, when=when + timedelta(milliseconds=1)
+    )
+    ib.push_tick(
+        "AAPL", 100.0, 100.4, last=100.4, size=100.0, when=when + timedelta(milliseconds=2)
+    )
+    ticks = client.tick_buffer("AAPL")
+    assert ticks.mid().tolist() == pytest.approx([100.1, 100.2, 100.2])
+    assert ticks.spread(2).tolist() == pytest.approx([0.2, 0.4])
+    assert ticks.vwap() == pytest.approx((100.2 * 300 + 100.4 * 100) / 400)
+    exchange = ticks.exchange_times()
+    assert exchange[-1] - exchange[-2] == 1_000_000
+    assert exchange[-1] == pd.Timestamp(when + timedelta(milliseconds=2)).value
+    assert np.all(np.diff(ticks.receive_times()) >= 0)
+    assert client.get_market_data_price("AAPL")["last_size"] == 100.0
+    with pytest.raises(ValueError, match="No market data subscription for MSFT"):
+        client.tick_buffer("MSFT")
+
+    count = 20_000
+    started = time.perf_counter()
+    for i in range(count):
+        ib.push_tick("AAPL", 100.0, 100.01 + (i % 7) * 0.01, last=100.0, size=1.0)
+    elapsed = time.perf_counter() - started
+    assert ticks.count == count + 3
+    assert len(ticks) == 1_024
+    # Includes the fake's own Ticker bookkeeping; a loose floor against regressions.
+    assert count / elapsed > 10_000
+
+
+def test_realtime_bars_complete_at_the_bar_close() -> None:
+    ib = _fixture_ib()
+    client = _client(ib)
+    session_open = datetime(2025, 1, 21, 14, 30, tzinfo=UTC)  # 09:30 in New York
+
+    async def scenario() -> tuple[list[float], pd.DataFrame, float]:
+        await client.request_realtime_bars(client.get_contract("AAPL", 0, "SMART"), "1 D", "5 mins")
+        assert await client.wait_for_historical_data("AAPL", "5 mins", timeout_s=1.0)
+        # Skip the seeded history, including its last bar, which the first live bar completes.
+        stream = client.stream_bars("AAPL", "5 mins", start=len(client.bar_view("AAPL", "5 mins")))
+        first = asyncio.ensure_future(anext(stream))
+        # Pre-market bars are dropped under use_rth.
+        ib.push_realtime_bar("AAPL", session_open - timedelta(seconds=5), 1.0, 1.0, 1.0, 1.0, 1.0)
+        for step in range(60):
+            await asyncio.sleep(0)
+            assert not first.done()
+            price = 120.0 + step
+            started = time.perf_counter()
+            ib.push_realtime_bar(
+                "AAPL", session_open + timedelta(seconds=5 * step), price, price, price, price, 10.0
+            )
+        # The 09:34:55 bar closes the 09:30 bar; nothing from 09:35 is needed to emit it.
+        closes = [(await asyncio.wait_for(first, timeout=1.0)).close]
+        latency = time.perf_counter() - started
+        ib.push_realtime_bar(
+            "AAPL", session_open + timedelta(minutes=5), 200.0, 201.0, 199.0, 200.5, 5.0
+        )
+        frame = client.get_ohlc_data("AAPL", "5 mins")
+        client.cancel_historical_subscription("AAPL", "5 mins")
+        closes.extend([bar.close async for bar in stream])
+        return closes, frame, latency
+
+    closes, frame, latency = asyncio.run(scenario())
+    assert closes == [179.0]
+    assert frame["time"].iloc[-2] == pd.Timestamp(session_open)
+    assert frame.iloc[-2][["open", "high", "low", "close", "volume"]].tolist() == [
+        120.0,
+        179.0,
+        120.0,
+        179.0,
+        600.0,
+    ]
+    assert frame.index[-1] - frame.index[-2] == 300
+    assert not ib._realtime_subscriptions["AAPL"]
+    assert latency < 0.5
+
+
+def test_basket_orders_go_out_together_and_reconcile() -> None:
+    ib = _fixture_ib(latency_s=0.05, reject_symbols=frozenset({"REJ"}), max_fill_shares=40.0)
+    client = _client(ib)
+    symbols = [f"S{i:03d}" for i in range(200)]
+    for symbol in symbols:
+        ib.set_price(symbol, 50.0)
+    basket = {symbol: (30.0 if i % 2 else -25.0) for i, symbol in enumerate(symbols)}
+    basket.update({"AAPL": 10_000.0, "REJ": 5.0})
+
+    async def scenario() -> tuple[float, float]:
+        await client.connect()
+        started = time.perf_counter()
+        tracker = await client.place_basket(basket)
+        sent = time.perf_counter() - started
+        assert len(tracker) == 202 and not tracker.acknowledged
+        fill = await asyncio.wait_for(tracker.result(tracker.order_ids[1]), timeout=1.0)
+        assert (fill.symbol, fill.status, fill.filled, fill.avg_price) == (
+            "S001",
+            "Filled",
+            30.0,
+            50.0,
+        )
+        report = await tracker.wait(timeout_s=0.08)
+        # AAPL fills 40 shares per round trip, so it is still working.
+        assert report.pending == ["AAPL"] and report.partial == ["AAPL"]
+        client.cancel_order(tracker.order_ids[-2])
+        report = await tracker.wait(timeout_s=1.0)
+        assert report.complete
+        assert report.rejected == ["REJ"]
+        assert report.partial == ["AAPL"]
+        assert report.unfilled == {"AAPL": 10_000.0 - report.orders[-2].filled, "REJ": 5.0}
+        assert (
+            report.orders[-2].filled % 40 == 0
+            and client.get_position("AAPL") == report.orders[-2].filled
+        )
+        assert report.orders[-1].message.startswith("201: Order rejected")
+        assert len(report.filled) == 200 and not report.mismatched
+        assert client.get_position("S000") == -25.0
+        return sent, time.perf_counter() - started
+
+    sent, elapsed = asyncio.run(scenario())
+    # One qualification round trip, then every order is in flight at once.
+    assert sent < 0.5
+    assert elapsed < 1.0
+
+
+def test_live_run_reports_stage_latencies(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    ib = _fixture_ib(latency_s=0.01)
+    cfg = yaml.safe_load(Path("configs/paper.yaml").read_text())
+    cfg["app"]["latency_tracing"] = True
+    cfg["data"]["root"] = str(tmp_path / "data")
+    cfg["execution"]["account"] = ib.account
+    cfg["risk"]["target_notional"] = 10_000
+    config_path = tmp_path / "paper.yaml"
+    config_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", functools.partial(TWS_Wrapper_Client, ib=ib))
+    result = asyncio.run(runner.run_live(str(config_path), dry_run=False, symbol="AAPL"))
+    cfg["app"]["latency_tracing"] = False
+    config_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    untraced = asyncio.run(runner.run_live(str(config_path), dry_run=True, symbol="AAPL"))
+    stages = result.stage_latency_ms
+    assert result.order_id.startswith("ibkr:")
+    assert {
+        "settings",
+        "connect",
+        "history",
+        "history.request",
+        "ib.historical_request",
+        "history.clean",
+    } <= set(stages)
+    assert {"account", "signal", "risk", "order", "ib.qualify", "ib.order_ack", "total"} <= set(
+        stages
+    )
+    assert stages["ib.order_ack"] >= 10.0
+    assert stages["total"] >= stages["history"] + stages["order"]
+    assert untraced.stage_latency_ms == {}
+    log = LatencyLog(tmp_path / "data" / "logs" / "latency.jsonl")
+    assert [record["status"] for record in log.records()] == ["ok"]
+    assert log.summary()["total"]["count"] == 1
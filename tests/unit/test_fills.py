@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+
+from eventkit import Event
+from ib_async import Contract, Execution, Fill, MarketOrder, OrderStatus, Trade
+
+from qsa.execution.fills import FillTracker
+
+
+class _Events:
+    def __init__(self) -> None:
+        self.orderStatusEvent = Event("orderStatusEvent")
+        self.execDetailsEvent = Event("execDetailsEvent")
+        self.errorEvent = Event("errorEvent")
+
+
+def _trade(order_id: int, action: str, quantity: float) -> Trade:
+    order = MarketOrder(action, quantity)
+    order.orderId = order_id
+    return Trade(Contract(symbol="AAPL"), order, OrderStatus(orderId=order_id, status="Submitted"))
+
+
+def _fill(trade: Trade, exec_id: str, shares: float, price: float) -> Fill:
+    execution = Execution(execId=exec_id, orderId=trade.order.orderId, shares=shares, price=price)
+    return Fill(trade.contract, execution, None, datetime.now(UTC))  # type: ignore[arg-type]
+
+
+def test_tracker_merges_status_and_executions_in_either_order() -> None:
+    ib = _Events()
+    positions = {"AAPL": 10.0, "MSFT": 0.0}
+
+    async def scenario() -> None:
+        tracker = FillTracker(ib, position_of=positions.__getitem__)
+        sell = _trade(7, "SELL", 10)
+        buy = _trade(8, "BUY", 5)
+        tracker.track("AAPL", -10.0, sell)
+        tracker.track("MSFT", 5.0, buy)
+        assert tracker.acknowledged
+
+        # Executions first, with a duplicate, then the final status.
+        for fill in (
+            _fill(sell, "e1", 4, 100.0),
+            _fill(sell, "e1", 4, 100.0),
+            _fill(sell, "e2", 6, 101.0),
+        ):
+            ib.execDetailsEvent.emit(sell, fill)
+        sell.orderStatus.status, sell.orderStatus.filled = "Filled", 10.0
+        ib.orderStatusEvent.emit(sell)
+        done = await tracker.result(7)
+        assert (done.filled, done.avg_price) == (-10.0, 100.6)
+
+        # Filled reported before the execution arrives.
+        buy.orderStatus.status, buy.orderStatus.filled, buy.orderStatus.avgFillPrice = (
+            "Filled",
+            5.0,
+            20.0,
+        )
+        ib.orderStatusEvent.emit(buy)
+        positions.update(AAPL=0.0, MSFT=4.0)
+        report = await tracker.wait(timeout_s=1.0)
+        assert report.complete and report.filled == ["AAPL", "MSFT"]
+        assert report.orders[1].avg_price == 20.0
+        assert report.mismatched == {"MSFT": -1.0}
+        assert len(ib.orderStatusEvent) == 0
+
+    asyncio.run(scenario())
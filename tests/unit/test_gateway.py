@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+import pytest
+import yaml
+
+from qsa.execution.fake_ib import FakeIB
+from qsa.execution.gateway import BrokerGateway, GatewayClient
+from qsa.execution.tws_client import TWS_Wrapper_Client
+from qsa.live import runner
+
+FIXTURES = Path(__file__).resolve().parents[1] / "fixtures"
+
+
+def _fake_ib(**kwargs: Any) -> FakeIB:
+    return FakeIB({"AAPL": pd.read_csv(FIXTURES / "sample_ohlc.csv")}, **kwargs)
+
+
+def _serve(
+    ib: FakeIB, socket_path: Path, scenario: Callable[[BrokerGateway], Awaitable[Any]]
+) -> Any:
+    client = TWS_Wrapper_Client(
+        host="127.0.0.1", port=7497, client_id=1, ib_account=ib.account, ib=ib
+    )
+    gateway = BrokerGateway(client)
+
+    async def run() -> Any:
+        await gateway.start(socket_path)
+        try:
+            return await scenario(gateway)
+        finally:
+            await gateway.close()
+
+    return asyncio.run(run())
+
+
+def test_history_requests_are_shared_and_cached(tmp_path: Path) -> None:
+    ib = _fake_ib(latency_s=0.02)
+    socket_path = tmp_path / "gw.sock"
+    contract = TWS_Wrapper_Client.get_contract("AAPL", 0, "SMART")
+
+    async def scenario(gateway: BrokerGateway) -> tuple[list[pd.DataFrame], pd.DataFrame]:
+        clients = [GatewayClient(socket_path) for _ in range(3)]
+        await asyncio.gather(*(client.connect() for client in clients))
+        await asyncio.gather(
+            *(client.request_historical_data(contract, "10 D", "1 day") for client in clients)
+        )
+        await clients[0].request_historical_data(contract, "10 D", "1 day")
+        direct = await gateway.client.fetch_historical_bars(
+            contract, end_datetime="", duration="10 D", bar_size="1 day", format_date=1
+        )
+        for client in clients:
+            assert await client.wait_for_historical_data("AAPL", "1 day")
+            await client.disconnect()
+        return [client.get_ohlc_data("AAPL", "1 day") for client in clients], direct
+
+    frames, direct = _serve(ib, socket_path, scenario)
+    # The three concurrent requests share one IB request; the open-ended follow-up is
+    # refetched, and the direct reference fetch makes the third.
+    assert ib.request_count == 3
+    for frame in frames:
+        pd.testing.assert_frame_equal(frame, direct)
+    assert not socket_path.exists()
+
+
+def test_open_ended_history_is_refetched_inside_the_ttl(tmp_path: Path) -> None:
+    ib = _fake_ib()
+    socket_path = tmp_path / "gw.sock"
+    contract = TWS_Wrapper_Client.get_contract("AAPL", 0, "SMART")
+    history = pd.read_csv(FIXTURES / "sample_ohlc.csv")
+    end = pd.Timestamp(history["time"].iloc[-1]).to_pydatetime()
+
+    async def scenario(gateway: BrokerGateway) -> None:
+        gateway._clock = lambda: 0.0
+        client = GatewayClient(socket_path)
+        await client.connect()
+        before = await client.fetch_historical_bars(
+            contract, end_datetime="", duration="10 D", bar_size="1 day"
+        )
+        bounded = await client.fetch_historical_bars(
+            contract, end_datetime=end, duration="10 D", bar_size="1 day"
+        )
+        newest = history.iloc[[-1]].assign(close=history["close"].iloc[-1] + 1.0)
+        ib._history["AAPL"] = FakeIB._normalize(pd.concat([history.iloc[:-1], newest]))
+        after = await client.fetch_historical_bars(
+            contract, end_datetime="", duration="10 D", bar_size="1 day"
+        )
+        assert after["close"].iloc[-1] == before["close"].iloc[-1] + 1.0
+        pd.testing.assert_frame_equal(
+            await client.fetch_historical_bars(
+                contract, end_datetime=end, duration="10 D", bar_size="1 day"
+            ),
+            bounded,
+        )
+        assert gateway.stats["history_fetches"] == 3
+        assert gateway.stats["history_cached"] == 1
+        await client.disconnect()
+
+    _serve(ib, socket_path, scenario)
+
+
+def test_orders_errors_and_positions_cross_the_socket(tmp_path: Path) -> None:
+    ib = _fake_ib(reject_symbols=frozenset({"MSFT"}))
+    socket_path = tmp_path / "gw.sock"
+
+    async def scenario(gateway: BrokerGateway) -> None:
+        client = GatewayClient(socket_path)
+        await client.connect()
+        assert client.get_managed_accounts() == [ib.account]
+        assert await client.place_market_order("AAPL", 5.0) == "ibkr:AAPL:5.0000:1"
+        assert await client.wait_for_account_equity() == pytest.approx(100_000.0)
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert client.get_position("AAPL") == 5.0
+        assert client.get_order_by_id(1)["status"] == "Filled"  # type: ignore[index]
+        with pytest.raises(RuntimeError, match="rejected market order 2 for MSFT"):
+            await client.place_market_order("MSFT", 1.0)
+        with pytest.raises(ValueError, match="at least 1 share"):
+            await client.place_market_order("AAPL", 0.5)
+        with pytest.raises(ValueError, match="keep_up_to_date"):
+            await client.request_historical_data(
+                client.get_contract("AAPL", 0, "SMART"), "1 D", "1 day", keep_up_to_date=True
+            )
+        late = GatewayClient(socket_path)
+        await late.connect()
+        assert late.get_position("AAPL") == 5.0
+        await late.disconnect()
+        await client.disconnect()
+
+    _serve(ib, socket_path, scenario)
+
+
+def test_second_gateway_refuses_a_live_socket_and_replaces_a_stale_one(tmp_path: Path) -> None:
+    socket_path = tmp_path / "gw.sock"
+    socket_path.write_text("stale")
+
+    async def scenario(gateway: BrokerGateway) -> None:
+        del gateway
+        other = BrokerGateway(
+            TWS_Wrapper_Client(host="127.0.0.1", port=7497, client_id=2, ib=_fake_ib())
+        )
+        with pytest.raises(RuntimeError, match="already listening"):
+            await other.start(socket_path)
+
+    _serve(_fake_ib(), socket_path, scenario)
+    with pytest.raises(RuntimeError, match="No qsa gateway is listening"):
+        asyncio.run(GatewayClient(socket_path).connect())
+
+
+def test_live_runs_share_one_gateway_session(tmp_path: Path) -> None:
+    ib = _fake_ib()
+    socket_path = tmp_path / "gw.sock"
+    cfg = yaml.safe_load(Path("configs/paper.yaml").read_text())
+    cfg["data"]["root"] = str(tmp_path / "data")
+    cfg["execution"]["account"] = ib.account
+    cfg["execution"]["gateway_socket"] = str(socket_path)
+    config_path = tmp_path / "paper.yaml"
+    config_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+
+    async def scenario(gateway: BrokerGateway) -> list[runner.LiveRunResult]:
+        results = [await runner.run_live(str(config_path), dry_run=True) for _ in range(3)]
+        # Live runs ask for bars ending now, so each run fetches its own.
+        assert gateway.stats["history_fetches"] == 3
+        assert gateway.stats["history_cached"] == 0
+        return results
+
+    results = _serve(ib, socket_path, scenario)
+    assert ib.request_count == 3
+    assert len({(result.signal_action, result.target_position) for result in results}) == 1
+    assert all(result.status == "ok" for result in results)
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+import yaml
+
+from qsa.config.settings import load_settings
+from qsa.ops.latency import (
+    NULL_TRACER,
+    LatencyLog,
+    SpanTracer,
+    current_tracer,
+    span,
+    summarize,
+    tracing,
+)
+
+
+def test_spans_sum_per_stage_and_follow_tasks() -> None:
+    tracer = SpanTracer()
+
+    async def fetch() -> None:
+        with span("fetch"):
+            await asyncio.sleep(0.01)
+
+    async def scenario() -> None:
+        with tracing(tracer):
+            await asyncio.gather(fetch(), fetch())
+            with span("decide"):
+                pass
+        assert current_tracer() is NULL_TRACER
+
+    asyncio.run(scenario())
+    stages = tracer.stage_ms()
+    assert set(stages) == {"fetch", "decide"}
+    assert stages["fetch"] >= 20.0
+    # Outside tracing() spans are shared no-ops.
+    with span("ignored"):
+        pass
+    assert span("a") is span("b")
+    assert NULL_TRACER.stage_ms() == {}
+
+
+def test_latency_log_rolls_and_summarizes(tmp_path: Path) -> None:
+    log = LatencyLog(tmp_path / "logs" / "latency.jsonl", max_entries=5)
+    for run in range(1, 10):
+        log.append({"order": float(run), "total": 10.0 * run}, run_type="live", symbol="AAPL")
+    lines = (tmp_path / "logs" / "latency.jsonl").read_text().splitlines()
+    # Nothing is trimmed until the file reaches twice max_entries.
+    assert len(lines) == 9
+    log.append({"order": 10.0, "total": 100.0})
+    lines = (tmp_path / "logs" / "latency.jsonl").read_text().splitlines()
+    assert [json.loads(line)["stage_latency_ms"]["order"] for line in lines] == [
+        6.0,
+        7.0,
+        8.0,
+        9.0,
+        10.0,
+    ]
+    summary = log.summary()
+    assert summary["order"] == {"count": 5, "p50": 8.0, "p95": 9.8, "p99": 9.96, "max": 10.0}
+    assert LatencyLog(log.path, max_entries=5).summary(last=2)["total"]["p50"] == 95.0
+    assert summarize([]) == {}
+    with pytest.raises(ValueError, match="must be positive"):
+        LatencyLog(log.path, max_entries=0)
+
+
+def test_latency_log_counts_existing_lines_without_parsing(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    path = tmp_path / "latency.jsonl"
+    path.write_text(
+        "".join(json.dumps({"stage_latency_ms": {"total": 1.0}}) + "\n" for _ in range(8))
+    )
+    log = LatencyLog(path, max_entries=5)
+    with monkeypatch.context() as patch:
+        patch.setattr(LatencyLog, "_read_lines", lambda self: pytest.fail("parsed the log"))
+        log.append({"total": 2.0})
+    assert len(path.read_text().splitlines()) == 9
+    log.append({"total": 3.0})
+    assert len(path.read_text().splitlines()) == 5
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, False), ("false", False), ("Off", False), ("no", False), ("0", False), ("true", True)],
+)
+def test_latency_tracing_is_off_unless_enabled(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, value: str | None, expected: bool
+) -> None:
+    cfg = yaml.safe_load(Path("configs/paper.yaml").read_text())
+    del cfg["app"]["latency_tracing"]
+    config_path = tmp_path / "paper.yaml"
+    config_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    if value is None:
+        monkeypatch.delenv("QSA_LATENCY_TRACING", raising=False)
+    else:
+        monkeypatch.setenv("QSA_LATENCY_TRACING", value)
+    assert load_settings(str(config_path)).latency_tracing is expected
+    monkeypatch.setenv("QSA_LATENCY_TRACING", "maybe")
+    with pytest.raises(ValueError, match="QSA_LATENCY_TRACING"):
+        load_settings(str(config_path))
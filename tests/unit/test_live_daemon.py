@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import ClassVar
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from qsa.cli import _build_parser
+from qsa.data.buffers import BarStore
+from qsa.live import runner
+from qsa.live.runner import LiveRunResult
+
+_START = datetime(2025, 1, 1)
+
+
+def _ns(day: int) -> int:
+    return pd.Timestamp(_START + timedelta(days=day)).value
+
+
+class _StreamingBroker:
+    """Fake client whose keep_up_to_date subscription is a real ``BarStore``."""
+
+    instances: ClassVar[list[_StreamingBroker]] = []
+
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del host, port, client_id, contract_cache
+        self.account = account
+        self.store: BarStore | None = None
+        self.orders: list[float] = []
+        self.position = 0.0
+        self.subscribed = 0
+        self.disconnected = False
+        self.contract: dict[str, object] = {}
+        self.streamed: list[str] = []
+        self.equity: list[float | None] = []
+        _StreamingBroker.instances.append(self)
+
+    @staticmethod
+    def get_contract(symbol: str, contract_id: int, exchange: str) -> dict[str, object]:
+        return {"symbol": symbol, "contract_id": contract_id, "exchange": exchange}
+
+    async def connect(self) -> None:
+        return None
+
+    async def disconnect(self) -> None:
+        self.disconnected = True
+
+    async def request_historical_data(self, *args: object, **kwargs: object) -> None:
+        assert kwargs["keep_up_to_date"] is True
+        del args
+        self.contract = dict(kwargs["contract"])  # type: ignore[call-overload]
+        closes = 10.0 + np.arange(30, dtype=np.float64)
+        frame = pd.DataFrame(
+            {
+                "time": pd.date_range(_START, periods=30, freq="D"),
+                "open": closes,
+                "high": closes + 0.5,
+                "low": closes - 0.5,
+                "close": closes,
+                "volume": 1_000.0,
+            }
+        )
+        self.store = BarStore.from_frame(frame)
+        self.subscribed += 1
+
+    async def wait_for_historical_data(
+        self, symbol: str, timeframe: str, timeout_s: float = 30.0
+    ) -> bool:
+        del symbol, timeframe, timeout_s
+        return True
+
+    def bar_view(self, symbol: str, timeframe: str, *, include_forming: bool = True):  # type: ignore[no-untyped-def]
+        del symbol, timeframe
+        assert self.store is not None
+        return self.store.view(include_forming=include_forming)
+
+    def stream_bars(self, symbol: str, timeframe: str, *, start: int | None = None):  # type: ignore[no-untyped-def]
+        del timeframe
+        self.streamed.append(symbol)
+        assert self.store is not None
+        return self.store.completed_bars(start=start)
+
+    def cancel_historical_subscription(self, symbol: str, timeframe: str) -> None:
+        del symbol, timeframe
+        assert self.store is not None
+        self.store.close()
+
+    def get_position(self, symbol: str) -> float:
+        del symbol
+        return self.position
+
+    def get_managed_accounts(self) -> list[str]:
+        return [self.account]
+
+    async def wait_for_account_equity(self, *, timeout_s: float = 5.0) -> float | None:
+        del timeout_s
+        return self.equity.pop(0) if self.equity else 100_000.0
+
+    async def place_market_order(
+        self, symbol: str, quantity: float, price_hint: float | None = None
+    ) -> str:
+        del price_hint
+        if len(self.orders) == 1:
+            raise RuntimeError(f"IBKR rejected market order 2 for {symbol}: status=Inactive.")
+        self.orders.append(quantity)
+        self.position += quantity
+        return f"fake:{len(self.orders)}"
+
+
+@pytest.fixture(autouse=True)
+def _streaming_broker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _StreamingBroker)
+    _StreamingBroker.instances.clear()
+
+
+def _config(tmp_path: Path) -> str:
+    cfg = yaml.safe_load(Path("configs/paper.yaml").read_text())
+    cfg["data"]["root"] = str(tmp_path / "data")
+    path = tmp_path / "paper.yaml"
+    path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    return str(path)
+
+
+def test_daemon_trades_each_completed_bar_until_stopped(tmp_path: Path) -> None:
+    config_path = _config(tmp_path)
+    results: list[LiveRunResult] = []
+
+    async def scenario() -> int:
+        stop = asyncio.Event()
+        daemon = asyncio.create_task(
+            runner.run_live_daemon(config_path, dry_run=False, on_result=results.append, stop=stop)
+        )
+        while not _StreamingBroker.instances or _StreamingBroker.instances[0].store is None:
+            await asyncio.sleep(0)
+        store = _StreamingBroker.instances[0].store
+        await asyncio.sleep(0)
+        for day, close in ((30, 40.0), (31, 41.0), (32, 5.0)):
+            store.upsert(_ns(day), close, close, close, close, 1_000.0)
+            await asyncio.sleep(0)
+        # Day 32 is still forming, so only days 29 to 31 have completed.
+        for _ in range(10):
+            await asyncio.sleep(0)
+        stop.set()
+        return await asyncio.wait_for(daemon, timeout=1.0)
+
+    processed = asyncio.run(scenario())
+    broker = _StreamingBroker.instances[0]
+    assert processed == 3
+    assert broker.subscribed == 1
+    assert broker.disconnected
+    assert [result.bar_time for result in results] == [
+        (_START + timedelta(days=day)).isoformat() for day in (29, 30, 31)
+    ]
+    assert all(result.run_type == "live_daemon" for result in results)
+    assert results[0].order_id == "fake:1"
+    assert broker.orders == [pytest.approx(results[0].delta, abs=1e-4)]
+    assert all(result.order_id == "dry-run" for result in results[1:] if result.delta == 0)
+
+
+def test_daemon_reports_order_failures_and_keeps_running(tmp_path: Path) -> None:
+    config_path = _config(tmp_path)
+    results: list[LiveRunResult] = []
+
+    async def scenario() -> int:
+        stop = asyncio.Event()
+        daemon = asyncio.create_task(
+            runner.run_live_daemon(config_path, dry_run=False, on_result=results.append, stop=stop)
+        )
+        while not _StreamingBroker.instances or _StreamingBroker.instances[0].store is None:
+            await asyncio.sleep(0)
+        store = _StreamingBroker.instances[0].store
+        await asyncio.sleep(0)
+        # Day 29 enters long; the crash to 1.0 on day 31 triggers an exit the broker rejects.
+        for day, close in ((30, 40.0), (31, 1.0), (32, 1.0), (33, 1.0)):
+            store.upsert(_ns(day), close, close, close, close, 1_000.0)
+            await asyncio.sleep(0)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        stop.set()
+        return await asyncio.wait_for(daemon, timeout=1.0)
+
+    processed = asyncio.run(scenario())
+    assert processed == 4
+    failed = [result for result in results if result.status == "error"]
+    assert failed
+    assert "rejected" in str(failed[0].error)
+    assert results[-1].bar_time == (_START + timedelta(days=32)).isoformat()
+
+
+def _run_daemon(
+    config_path: str,
+    closes: tuple[float, ...],
+    *,
+    symbol: str | None = None,
+    equity: tuple[float | None, ...] = (),
+) -> tuple[int, list[LiveRunResult]]:
+    results: list[LiveRunResult] = []
+
+    async def scenario() -> int:
+        stop = asyncio.Event()
+        daemon = asyncio.create_task(
+            runner.run_live_daemon(
+                config_path, dry_run=False, symbol=symbol, on_result=results.append, stop=stop
+            )
+        )
+        while not _StreamingBroker.instances or _StreamingBroker.instances[0].store is None:
+            await asyncio.sleep(0)
+        broker = _StreamingBroker.instances[0]
+        broker.equity.extend(equity)
+        await asyncio.sleep(0)
+        for day, close in enumerate(closes, start=30):
+            assert broker.store is not None
+            broker.store.upsert(_ns(day), close, close, close, close, 1_000.0)
+            await asyncio.sleep(0)
+        for _ in range(10):
+            await asyncio.sleep(0)
+        stop.set()
+        return await asyncio.wait_for(daemon, timeout=1.0)
+
+    return asyncio.run(scenario()), results
+
+
+def test_daemon_subscribes_to_the_requested_symbol(tmp_path: Path) -> None:
+    processed, results = _run_daemon(_config(tmp_path), (40.0, 41.0), symbol="MSFT")
+    broker = _StreamingBroker.instances[0]
+    assert processed == 2
+    assert broker.contract["symbol"] == "MSFT"
+    # The configured contract id belongs to the configured symbol, not to MSFT.
+    assert broker.contract["contract_id"] == 0
+    assert broker.streamed == ["MSFT"]
+    assert {result.symbol for result in results} == {"MSFT"}
+
+
+def test_daemon_reports_unresolved_equity_and_keeps_running(tmp_path: Path) -> None:
+    processed, results = _run_daemon(_config(tmp_path), (40.0, 41.0, 42.0), equity=(None,))
+    broker = _StreamingBroker.instances[0]
+    assert processed == 3
+    assert results[0].status == "error"
+    assert "account_equity" in str(results[0].error)
+    assert results[0].order_id == ""
+    assert results[0].account_equity is None
+    assert all(result.status == "ok" for result in results[1:])
+    assert len(broker.orders) == 1
+
+
+def test_cli_live_accepts_daemon_flag() -> None:
+    args = _build_parser().parse_args(["live", "--daemon", "--dry-run"])
+    assert args.daemon is True
+    assert args.dry_run is True
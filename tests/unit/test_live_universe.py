@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import ClassVar
+
+import pandas as pd
+import pytest
+import yaml
+
+from qsa.cli import _build_parser
+from qsa.data import pipeline as data_pipeline
+from qsa.live import runner
+from qsa.ops.latency import LatencyLog
+
+_LATENCY_S = 0.05
+
+
+class _UniverseBroker:
+    """Fake client with fixed per-request latency that logs every call."""
+
+    instances: ClassVar[list[_UniverseBroker]] = []
+
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del host, port, client_id, contract_cache
+        self.account = account
+        self.calls: list[tuple[str, str]] = []
+        self.frames: dict[str, pd.DataFrame] = {}
+        _UniverseBroker.instances.append(self)
+
+    @staticmethod
+    def get_contract(symbol: str, contract_id: int, exchange: str) -> dict[str, object]:
+        return {"symbol": symbol, "contract_id": contract_id, "exchange": exchange}
+
+    async def connect(self) -> None:
+        self.calls.append(("connect", ""))
+
+    async def disconnect(self) -> None:
+        self.calls.append(("disconnect", ""))
+
+    async def fetch_historical_bars(
+        self, contract: dict[str, object], **kwargs: object
+    ) -> pd.DataFrame:
+        del kwargs
+        symbol = str(contract["symbol"])
+        if symbol == "BROKEN":
+            raise TimeoutError("no data")
+        await asyncio.sleep(_LATENCY_S)
+        # Rising names go long, flat names hold.
+        step = 0.0 if symbol.startswith("FLAT") else 1.0
+        start = datetime(2025, 1, 1)
+        self.frames[symbol] = pd.DataFrame(
+            [
+                {
+                    "time": start + timedelta(days=idx),
+                    "open": 50 + step * idx,
+                    "high": 51 + step * idx,
+                    "low": 49 + step * idx,
+                    "close": 50 + step * idx,
+                    "volume": 1_000,
+                }
+                for idx in range(30)
+            ]
+        )
+        self.calls.append(("history", symbol))
+        return self.frames[symbol]
+
+    def get_position(self, symbol: str) -> float:
+        del symbol
+        return 0.0
+
+    def get_managed_accounts(self) -> list[str]:
+        return [self.account]
+
+    async def wait_for_account_equity(self, *, timeout_s: float = 5.0) -> float | None:
+        del timeout_s
+        self.calls.append(("equity", ""))
+        return 100_000.0
+
+    async def place_market_order(
+        self, symbol: str, quantity: float, price_hint: float | None = None
+    ) -> str:
+        del price_hint
+        self.calls.append(("order", symbol))
+        await asyncio.sleep(_LATENCY_S)
+        if symbol == "UP_REJECT":
+            raise RuntimeError(f"IBKR rejected market order 7 for {symbol}: status=Inactive.")
+        return f"fake:{symbol}:{quantity:.4f}"
+
+
+@pytest.fixture(autouse=True)
+def _universe_broker(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(runner, "TWS_Wrapper_Client", _UniverseBroker)
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _UniverseBroker)
+
+
+def _config(tmp_path: Path, *, latency_tracing: bool = False) -> str:
+    cfg = yaml.safe_load(Path("configs/paper.yaml").read_text())
+    cfg["app"]["latency_tracing"] = latency_tracing
+    cfg["data"]["root"] = str(tmp_path / "data")
+    cfg["risk"]["target_notional"] = 1_000
+    path = tmp_path / "paper.yaml"
+    path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    return str(path)
+
+
+def _run(
+    config_path: str, symbols: list[str], **kwargs: object
+) -> tuple[runner.LiveUniverseResult, float]:
+    _UniverseBroker.instances.clear()
+    started = time.perf_counter()
+    result = asyncio.run(runner.run_live_symbols(config_path, False, symbols, **kwargs))  # type: ignore[arg-type]
+    return result, time.perf_counter() - started
+
+
+def test_universe_shares_one_connection_and_batches_orders(tmp_path: Path) -> None:
+    config_path = _config(tmp_path)
+    result, _ = _run(config_path, ["UP1", "FLAT1", "UP_REJECT", "BROKEN", "UP1"])
+
+    assert len(_UniverseBroker.instances) == 1
+    calls = _UniverseBroker.instances[0].calls
+    assert [name for name, _ in calls].count("connect") == 1
+    assert [name for name, _ in calls].count("equity") == 1
+    first_order = next(index for index, (name, _) in enumerate(calls) if name == "order")
+    assert all(name != "history" for name, _ in calls[first_order:])
+    assert sorted(symbol for name, symbol in calls if name == "order") == ["UP1", "UP_REJECT"]
+
+    by_symbol = {item.symbol: item for item in result.results}
+    assert list(by_symbol) == ["UP1", "FLAT1", "UP_REJECT"]
+    assert by_symbol["UP1"].order_id.startswith("fake:UP1:")
+    assert by_symbol["FLAT1"].order_id == "dry-run"
+    assert by_symbol["UP_REJECT"].status == "error"
+    assert "rejected" in str(by_symbol["UP_REJECT"].error)
+    assert set(result.errors) == {"BROKEN"}
+
+
+def test_universe_wall_time_does_not_scale_with_symbols(tmp_path: Path) -> None:
+    config_path = _config(tmp_path)
+    _, single = _run(config_path, ["UP0"])
+    result, hundred = _run(config_path, [f"UP{index}" for index in range(100)], concurrency=100)
+    assert len(result.results) == 100
+    assert not result.errors
+    # Sequential requests would take 100 history plus 100 order round trips; concurrently
+    # the extra cost over one symbol is only the per-symbol cleaning and signal CPU time.
+    assert hundred < single + 20 * _LATENCY_S
+
+
+def test_universe_traces_each_symbol(tmp_path: Path) -> None:
+    config_path = _config(tmp_path, latency_tracing=True)
+    result, _ = _run(config_path, ["UP1", "FLAT1"])
+
+    by_symbol = {item.symbol: item for item in result.results}
+    assert set(by_symbol["UP1"].stage_latency_ms) >= {
+        "connect",
+        "account",
+        "history",
+        "signal",
+        "order",
+        "total",
+    }
+    assert "order" not in by_symbol["FLAT1"].stage_latency_ms
+    assert by_symbol["FLAT1"].stage_latency_ms["history"] > 0
+    log = LatencyLog(tmp_path / "data" / "logs" / "latency.jsonl")
+    assert [(record["symbol"], record["run_type"]) for record in log.records()] == [
+        ("UP1", "live_universe"),
+        ("FLAT1", "live_universe"),
+    ]
+
+
+def test_cli_live_parses_symbol_list() -> None:
+    args = _build_parser().parse_args(["live", "--symbols", "AAPL, MSFT,,SPY"])
+    assert args.symbols == ["AAPL", "MSFT", "SPY"]
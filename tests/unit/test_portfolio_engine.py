@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from qsa.backtest.engine import run_engine
+from qsa.backtest.portfolio import run_portfolio_engine
+from qsa.schemas.data import Bar, BarPanel
+from qsa.strategies.momentum_example import MomentumExampleStrategy, MomentumParams
+
+
+def _walk(count: int, seed: int, *, start_day: int = 0) -> list[Bar]:
+    rng = np.random.default_rng(seed)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, count)))
+    start = datetime(2025, 1, 1) + timedelta(days=start_day)
+    return [
+        Bar(time=start + timedelta(days=idx), open=close, high=close, low=close, close=close)
+        for idx, close in enumerate(closes.tolist())
+    ]
+
+
+_STRATEGY = MomentumExampleStrategy(MomentumParams(lookback=10, entry_threshold=0.02))
+_KWARGS = {
+    "target_notional": 2_000.0,
+    "max_abs_position": 50.0,
+    "commission_per_share": 0.005,
+    "slippage_bps": 1.0,
+}
+
+
+def test_single_symbol_panel_matches_run_engine() -> None:
+    bars = _walk(600, seed=1)
+    for initial_cash in (100_000.0, 2_050.0):
+        expected = run_engine(bars, strategy=_STRATEGY, initial_cash=initial_cash, **_KWARGS)  # type: ignore[arg-type]
+        summary = run_portfolio_engine(
+            BarPanel.from_histories({"AAA": bars}),
+            strategy=_STRATEGY,
+            initial_cash=initial_cash,
+            **_KWARGS,  # type: ignore[arg-type]
+        )
+        assert summary.trades == expected.trades > 0
+        assert summary.final_equity == expected.final_equity
+        assert summary.total_commission == expected.total_commission
+        np.testing.assert_array_equal(summary.equity, expected.equity_log.equity)  # type: ignore[union-attr]
+
+
+def test_panel_aligns_symbols_with_gaps() -> None:
+    panel = BarPanel.from_histories({"AAA": _walk(5, seed=1), "BBB": _walk(3, seed=2, start_day=3)})
+    assert len(panel) == 6
+    assert panel.has_bar[:, 1].tolist() == [False, False, False, True, True, True]
+    assert len(panel.history("BBB")) == 3
+
+
+def test_book_leverage_cap_admits_entries_in_symbol_order() -> None:
+    histories = {f"S{idx}": _walk(300, seed=idx) for idx in range(6)}
+    summary = run_portfolio_engine(
+        BarPanel.from_histories(histories),
+        strategy=_STRATEGY,
+        initial_cash=5_000.0,
+        max_gross_leverage=1.0,
+        **_KWARGS,  # type: ignore[arg-type]
+    )
+    gross = np.abs(summary.positions * BarPanel.from_histories(histories).closes[1:]).sum(axis=1)
+    # Entries are sized against pre-trade equity, so allow for one bar of price drift.
+    assert np.all(gross <= summary.equity * 1.05)
+    assert summary.trades > 0
+    table = summary.symbol_summary()
+    assert list(table["symbol"]) == list(histories)
+    assert table["trades"].sum() == summary.trades
+    np.testing.assert_allclose(
+        summary.equity, 5_000.0 + summary.symbol_equity.sum(axis=1), rtol=0, atol=1e-6
+    )
+    assert list(summary.equity_frame().columns[:2]) == ["time", "equity"]
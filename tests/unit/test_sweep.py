@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from qsa.backtest.engine import run_engine
+from qsa.backtest.run import build_strategy, engine_options
+from qsa.backtest.sweep import expand_grid, load_sweep_grid, run_sweep, sweep_engine
+from qsa.config.settings import load_settings
+from qsa.data import pipeline as data_pipeline
+from qsa.schemas.data import Bar, BarHistory
+
+
+def _history(count: int = 400) -> BarHistory:
+    rng = np.random.default_rng(5)
+    closes = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, count)))
+    start = datetime(2025, 1, 1)
+    return BarHistory.from_bars(
+        [
+            Bar(time=start + timedelta(days=idx), open=close, high=close, low=close, close=close)
+            for idx, close in enumerate(closes.tolist())
+        ]
+    )
+
+
+class _FakeBroker:
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del host, port, client_id, account, contract_cache
+
+    @staticmethod
+    def get_contract(symbol: str, contract_id: int, exchange: str) -> dict[str, object]:
+        return {"symbol": symbol, "contract_id": contract_id, "exchange": exchange}
+
+    async def connect(self) -> None:
+        return None
+
+    async def disconnect(self) -> None:
+        return None
+
+    async def fetch_historical_bars(self, contract: object, **kwargs: object) -> pd.DataFrame:
+        del contract, kwargs
+        history = _history(60)
+        return pd.DataFrame([bar.__dict__ for bar in history])
+
+
+def test_expand_grid_is_cartesian_product() -> None:
+    combos = expand_grid({"strategy_lookback": [5, 10], "slippage_bps": [0.0, 1.0, 2.0]})
+    assert len(combos) == 6
+    assert combos[0] == {"strategy_lookback": 5, "slippage_bps": 0.0}
+    with pytest.raises(ValueError, match="Unsupported"):
+        expand_grid({"ib_symbol": ["AAPL"]})
+
+
+def test_sweep_matches_individual_runs_across_workers() -> None:
+    bars = _history()
+    settings = load_settings("configs/dev.yaml")
+    grid = {"strategy_lookback": [5, 10], "strategy_entry_threshold": [0.01, 0.03]}
+
+    parallel = sweep_engine(bars, settings, grid, workers=2)
+    serial = sweep_engine(bars, settings, grid, workers=1)
+    pd.testing.assert_frame_equal(parallel, serial)
+    assert len(parallel) == 4
+
+    first = settings.model_copy(update={"strategy_lookback": 5, "strategy_entry_threshold": 0.01})
+    expected = run_engine(
+        bars, strategy=build_strategy(first), initial_cash=100_000.0, **engine_options(first)
+    )
+    assert parallel.loc[0, "trades"] == expected.trades
+    assert parallel.loc[0, "final_equity"] == expected.final_equity
+
+
+def test_load_sweep_grid_rejects_non_mapping_sections(tmp_path: Path) -> None:
+    grid_path = tmp_path / "grid.yaml"
+    grid_path.write_text(yaml.safe_dump({"strategy": [5, 10]}))
+    with pytest.raises(TypeError, match="section 'strategy' must be a mapping"):
+        load_sweep_grid(str(grid_path))
+
+    grid_path.write_text(yaml.safe_dump([5, 10]))
+    with pytest.raises(TypeError, match="must be a mapping"):
+        load_sweep_grid(str(grid_path))
+
+
+def test_run_sweep_writes_results_table(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
+    cfg = yaml.safe_load(Path("configs/dev.yaml").read_text())
+    cfg["data"]["root"] = str(tmp_path / "data")
+    config_path = tmp_path / "dev.yaml"
+    config_path.write_text(yaml.safe_dump(cfg, sort_keys=False))
+    grid_path = tmp_path / "grid.yaml"
+    grid_path.write_text(
+        yaml.safe_dump(
+            {"strategy": {"lookback": [5, 10]}, "costs": {"slippage_bps": [0.0, 2.0]}},
+            sort_keys=False,
+        )
+    )
+
+    assert load_sweep_grid(str(grid_path)) == {
+        "strategy_lookback": [5, 10],
+        "slippage_bps": [0.0, 2.0],
+    }
+    result = run_sweep(str(config_path), str(grid_path), workers=1)
+    table = pd.read_csv(result["results_path"])
+    assert result["combinations"] == 4
+    assert list(table.columns[:2]) == ["strategy_lookback", "slippage_bps"]
+    assert Path(result["run_dir"]).parent.name == "sweeps"
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 import pandas as pd
+import pytest
 import yaml
 
 from qsa.backtest.run import run_backtest
@@ -12,8 +13,10 @@ from qsa.data import pipeline as data_pipeline
 
 
 class _FakeBroker:
-    def __init__(self, host: str, port: int, client_id: int, account: str) -> None:
-        del host, port, client_id, account
+    def __init__(
+        self, host: str, port: int, client_id: int, account: str, contract_cache: object = None
+    ) -> None:
+        del host, port, client_id, account, contract_cache
 
     @staticmethod
     def get_contract(symbol: str, contract_id: int, exchange: str) -> dict[str, object]:
@@ -25,16 +28,8 @@ class _FakeBroker:
     async def disconnect(self) -> None:
         return None
 
-    async def request_historical_data(self, *args: object, **kwargs: object) -> None:
-        del args, kwargs
-        return None
-
-    async def wait_for_historical_data(self, symbol: str, timeframe: str, timeout_s: float = 30.0) -> bool:
-        del symbol, timeframe, timeout_s
-        return True
-
-    def get_ohlc_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
-        del symbol, timeframe
+    async def fetch_historical_bars(self, contract: object, **kwargs: object) -> pd.DataFrame:
+        del contract, kwargs
         start = datetime(2025, 1, 1)
         rows: list[dict[str, object]] = []
         for idx in range(40):
@@ -62,8 +57,8 @@ def _write_isolated_config(tmp_path: Path, template_path: str) -> str:
     return str(out_path)
 
 
-def test_backtest_persists_run_artifacts(tmp_path: Path) -> None:
-    data_pipeline.TWS_Wrapper_Client = _FakeBroker  # type: ignore[assignment]
+def test_backtest_persists_run_artifacts(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
     config_path = _write_isolated_config(tmp_path, "configs/dev.yaml")
     result = run_backtest(config_path, initial_cash=100_000.0)
     run_dir = Path(result["run_dir"])
@@ -96,8 +91,10 @@ def test_backtest_persists_run_artifacts(tmp_path: Path) -> None:
     assert not (run_dir / "equity_with_trades.png").exists()
 
 
-def test_backtest_with_plot_creates_chart_artifacts(tmp_path: Path) -> None:
-    data_pipeline.TWS_Wrapper_Client = _FakeBroker  # type: ignore[assignment]
+def test_backtest_with_plot_creates_chart_artifacts(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
     config_path = _write_isolated_config(tmp_path, "configs/dev.yaml")
     result = run_backtest(config_path, initial_cash=100_000.0, plot=True)
     run_dir = Path(result["run_dir"])
@@ -112,8 +109,10 @@ def test_backtest_with_plot_creates_chart_artifacts(tmp_path: Path) -> None:
         assert path.stat().st_size > 0
 
 
-def test_backtest_writes_dataset_artifacts_inside_run_dir(tmp_path: Path) -> None:
-    data_pipeline.TWS_Wrapper_Client = _FakeBroker  # type: ignore[assignment]
+def test_backtest_writes_dataset_artifacts_inside_run_dir(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(data_pipeline, "TWS_Wrapper_Client", _FakeBroker)
     config_path = _write_isolated_config(tmp_path, "configs/dev.yaml")
     result = run_backtest(config_path, initial_cash=100_000.0)
 
@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from eventkit import Event
+from ib_async import Contract
+
+from qsa.execution.contracts import ContractCache
+from qsa.execution.tws_client import TWS_Wrapper_Client
+
+
+def _client() -> TWS_Wrapper_Client:
+    return TWS_Wrapper_Client.__new__(TWS_Wrapper_Client)
+
+
+def _bars(dates: list[object]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            date=value, open=10.0 + i, high=11.0 + i, low=9.0 + i, close=10.5 + i, volume=100 + i
+        )
+        for i, value in enumerate(dates)
+    ]
+
+
+def _legacy_bars_to_df(bars: list[SimpleNamespace]) -> pd.DataFrame:
+    """The previous row-at-a-time builder, kept as the reference for decoding."""
+    df = pd.DataFrame(columns=["time", "open", "high", "low", "close", "volume"])
+    for bar in bars:
+        time_key, time_dt = TWS_Wrapper_Client._to_epoch_and_dt(bar.date)
+        df.loc[time_key, ["time", "open", "high", "low", "close", "volume"]] = [
+            time_dt,
+            bar.open,
+            bar.high,
+            bar.low,
+            bar.close,
+            str(bar.volume),
+        ]
+    return df.sort_index()
+
+
+def _assert_matches_legacy(dates: list[object]) -> None:
+    bars = _bars(dates)
+    decoded = _client()._bars_to_df(bars)
+    legacy = _legacy_bars_to_df(bars)
+    assert decoded.index.tolist() == legacy.index.tolist()
+    assert decoded["time"].tolist() == [pd.Timestamp(value) for value in legacy["time"]]
+    for column in ("open", "high", "low", "close", "volume"):
+        assert decoded[column].tolist() == [float(value) for value in legacy[column]]
+        assert decoded[column].dtype == "float64"
+
+
+@pytest.mark.parametrize(
+    "dates",
+    [
+        [date(2025, 1, 3), date(2025, 1, 1), date(2025, 1, 2)],
+        [datetime(2025, 1, 1, 9, 30, tzinfo=UTC) + timedelta(minutes=5 * i) for i in range(5)],
+        [datetime(2025, 1, 1, 9, 30), datetime(2025, 1, 1, 9, 35), datetime(2025, 1, 1, 9, 30)],
+        ["20250102", "20250101"],
+        ["20250101  09:30:00", "20250101 09:35:00"],
+        ["20250101", "20250101 09:30:00", "1735725600"],
+    ],
+)
+def test_bars_to_df_matches_row_builder(dates: list[object]) -> None:
+    _assert_matches_legacy(dates)
+
+
+def test_bars_to_df_resolves_local_offsets_across_dst(monkeypatch: pytest.MonkeyPatch) -> None:
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is unavailable")
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        start = datetime(2025, 3, 8, 12, 0)
+        _assert_matches_legacy([start + timedelta(minutes=30 * i) for i in range(96)])
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+
+def test_bars_to_df_empty_has_typed_columns() -> None:
+    frame = _client()._bars_to_df([])
+    assert list(frame.columns) == ["time", "open", "high", "low", "close", "volume"]
+    assert frame.empty
+
+
+class _EventIB:
+    """Just the ib_async surface the event waits and indexes touch."""
+
+    def __init__(self) -> None:
+        self.updatePortfolioEvent = Event("updatePortfolioEvent")
+        self.newOrderEvent = Event("newOrderEvent")
+        self.orderModifyEvent = Event("orderModifyEvent")
+        self.openOrderEvent = Event("openOrderEvent")
+        self.orderStatusEvent = Event("orderStatusEvent")
+        self.cancelOrderEvent = Event("cancelOrderEvent")
+        self.accountValueEvent = Event("accountValueEvent")
+        self.disconnectedEvent = Event("disconnectedEvent")
+        self.pendingTickersEvent = Event("pendingTickersEvent")
+        self.values: list[SimpleNamespace] = []
+        self.placed: list[SimpleNamespace] = []
+        self.held: list[SimpleNamespace] = []
+        self.cancelled: list[object] = []
+        self.qualified: list[str] = []
+
+    async def qualifyContractsAsync(self, *contracts: Contract) -> list[Contract | None]:
+        await asyncio.sleep(0)
+        self.qualified.extend(contract.symbol for contract in contracts)
+        for contract in contracts:
+            contract.conId = 1000 + len(self.qualified)
+            contract.primaryExchange = "NASDAQ"
+        return [None if contract.symbol == "AMBIG" else contract for contract in contracts]
+
+    def accountValues(self, account: str | None = None) -> list[SimpleNamespace]:
+        del account
+        return self.values
+
+    def portfolio(self, account: str = "") -> list[SimpleNamespace]:
+        del account
+        return self.held
+
+    def trades(self) -> list[SimpleNamespace]:
+        return self.placed
+
+    def placeOrder(self, contract: object, order: object) -> SimpleNamespace:
+        trade = SimpleNamespace(
+            contract=contract,
+            order=SimpleNamespace(
+                orderId=len(self.placed) + 1, action=getattr(order, "action", None)
+            ),
+            orderStatus=SimpleNamespace(status="PendingSubmit"),
+        )
+        self.placed.append(trade)
+        self.newOrderEvent.emit(trade)
+        return trade
+
+    def cancelOrder(self, order: object) -> None:
+        self.cancelled.append(order)
+
+
+def _event_client(cache: ContractCache | None = None) -> tuple[TWS_Wrapper_Client, _EventIB]:
+    ib = _EventIB()
+    if cache is None:
+        # AAPL is already qualified, so the order tests see placeOrder on the first loop turn.
+        cache = ContractCache()
+        cache.put(
+            "STK:AAPL:SMART:USD",
+            Contract(conId=265598, symbol="AAPL", secType="STK", exchange="SMART", currency="USD"),
+        )
+    client = TWS_Wrapper_Client(
+        host="127.0.0.1",
+        port=7497,
+        client_id=1,
+        ib_account="DU1",
+        ib=ib,
+        contract_cache=cache,  # type: ignore[arg-type]
+    )
+    return client, ib
+
+
+def _portfolio_item(symbol: str, position: float, account: str = "DU1") -> SimpleNamespace:
+    return SimpleNamespace(
+        contract=SimpleNamespace(symbol=symbol, localSymbol=symbol),
+        position=position,
+        marketPrice=100.0,
+        marketValue=100.0 * position,
+        averageCost=99.0,
+        unrealizedPNL=1.0,
+        realizedPNL=0.0,
+        account=account,
+    )
+
+
+def _set_status(ib: _EventIB, trade: SimpleNamespace, status: str) -> None:
+    trade.orderStatus.status = status
+    ib.orderStatusEvent.emit(trade)
+
+
+def test_wait_for_historical_data_wakes_on_upsert() -> None:
+    client, _ = _event_client()
+
+    async def scenario() -> tuple[bool, float]:
+        waiter = asyncio.create_task(
+            client.wait_for_historical_data("AAPL", "1 min", timeout_s=5.0)
+        )
+        await asyncio.sleep(0)
+        started = time.perf_counter()
+        client._upsert_hist_data("AAPL", "1 min", _bars([datetime(2024, 1, 2, 9, 30, tzinfo=UTC)]))
+        return await waiter, time.perf_counter() - started
+
+    ready, elapsed = asyncio.run(scenario())
+    assert ready
+    assert elapsed < 0.05
+    assert asyncio.run(client.wait_for_historical_data("AAPL", "1 min", timeout_s=0.0))
+    assert not asyncio.run(client.wait_for_historical_data("MSFT", "1 min", timeout_s=0.01))
+
+
+def test_place_market_order_returns_on_ack_event() -> None:
+    client, ib = _event_client()
+    listeners = len(ib.orderStatusEvent)
+
+    async def scenario() -> str:
+        order = asyncio.create_task(client.place_market_order("AAPL", 10.0, ack_timeout_s=5.0))
+        await asyncio.sleep(0)
+        _set_status(
+            ib,
+            SimpleNamespace(order=SimpleNamespace(orderId=99), orderStatus=SimpleNamespace()),
+            "Submitted",
+        )
+        await asyncio.sleep(0)
+        assert not order.done()
+        _set_status(ib, ib.placed[0], "PreSubmitted")
+        return await order
+
+    assert asyncio.run(scenario()) == "ibkr:AAPL:10.0000:1"
+    assert len(ib.orderStatusEvent) == listeners
+
+
+def test_place_market_order_raises_on_reject_event() -> None:
+    client, ib = _event_client()
+
+    async def scenario() -> str:
+        order = asyncio.create_task(client.place_market_order("AAPL", -5.0))
+        await asyncio.sleep(0)
+        _set_status(ib, ib.placed[0], "Inactive")
+        return await order
+
+    with pytest.raises(RuntimeError, match="status=Inactive"):
+        asyncio.run(scenario())
+
+
+def test_place_market_order_times_out_without_ack() -> None:
+    client, ib = _event_client()
+    listeners = len(ib.orderStatusEvent)
+    with pytest.raises(TimeoutError, match="did not acknowledge order 1"):
+        asyncio.run(client.place_market_order("AAPL", 1.0, ack_timeout_s=0.01))
+    assert len(ib.orderStatusEvent) == listeners
+
+
+def test_wait_for_account_equity_wakes_on_account_value() -> None:
+    client, ib = _event_client()
+    equity = SimpleNamespace(
+        account="DU1", tag="NetLiquidationByCurrency", value="125000", currency="BASE"
+    )
+
+    async def scenario() -> float | None:
+        waiter = asyncio.create_task(client.wait_for_account_equity(timeout_s=5.0))
+        await asyncio.sleep(0)
+        ib.accountValueEvent.emit(
+            SimpleNamespace(
+                account="DU2", tag="NetLiquidationByCurrency", value="1", currency="BASE"
+            )
+        )
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        ib.values.append(equity)
+        ib.accountValueEvent.emit(equity)
+        return await waiter
+
+    assert asyncio.run(scenario()) == 125_000.0
+    assert asyncio.run(client.wait_for_account_equity(timeout_s=0.0)) == 125_000.0
+    ib.values.clear()
+    assert asyncio.run(client.wait_for_account_equity(timeout_s=0.01)) is None
+
+
+def test_position_index_follows_portfolio_events() -> None:
+    client, ib = _event_client()
+    ib.held.append(_portfolio_item("AAPL", 10.0))
+    client._seed_indexes()
+    view = client.positions_view
+    assert client.get_position("AAPL") == 10.0
+
+    ib.updatePortfolioEvent.emit(_portfolio_item("MSFT", -3.0))
+    ib.updatePortfolioEvent.emit(_portfolio_item("TSLA", 7.0, account="DU2"))
+    assert client.get_position("MSFT") == -3.0
+    assert client.get_position("TSLA") == 0.0
+    assert set(view) == {"AAPL", "MSFT"}
+
+    ib.updatePortfolioEvent.emit(_portfolio_item("AAPL", 0.0))
+    assert client.get_position("AAPL") == 0.0
+    assert set(client.get_positions()) == {"MSFT"}
+    with pytest.raises(TypeError):
+        view["AAPL"] = {}  # type: ignore[index]
+
+
+def test_order_index_follows_order_events_and_cancels_by_id() -> None:
+    client, ib = _event_client()
+    view = client.orders_view
+    asyncio.run(client.send_market_order(client.get_contract("AAPL", 0, "SMART"), "BUY", 5))
+    assert view[1]["status"] == "PendingSubmit"
+    assert view[1]["local_symbol"] == "AAPL"
+
+    _set_status(ib, ib.placed[0], "Submitted")
+    assert client.get_order_by_id(1)["status"] == "Submitted"  # type: ignore[index]
+    assert client.get_order_by_id(2) is None
+
+    client.cancel_order(1)
+    client.cancel_order(2)
+    assert ib.cancelled == [ib.placed[0].order]
+
+
+class _LiveBars(list):  # type: ignore[type-arg]
+    def __init__(self, bars: list[SimpleNamespace]) -> None:
+        super().__init__(bars)
+        self.updateEvent = Event("updateEvent")
+
+    def tick(self, minute: int, close: float) -> None:
+        bar = _bars([datetime(2024, 1, 2, 9, minute)])[0]
+        bar.close = close
+        has_new_bar = not self or self[-1].date != bar.date
+        if has_new_bar:
+            self.append(bar)
+        else:
+            self[-1] = bar
+        self.updateEvent.emit(self, has_new_bar)
+
+
+def test_keep_up_to_date_subscription_feeds_bar_store() -> None:
+    client, ib = _event_client()
+    live = _LiveBars(_bars([datetime(2024, 1, 2, 9, minute) for minute in range(3)]))
+
+    async def request(**kwargs: object) -> _LiveBars:
+        del kwargs
+        return live
+
+    ib.reqHistoricalDataAsync = request  # type: ignore[attr-defined]
+    ib.cancelHistoricalData = lambda bars: None  # type: ignore[attr-defined]
+    contract = client.get_contract("AAPL", 0, "SMART")
+
+    async def scenario() -> list[float]:
+        await client.request_historical_data(contract, "1 D", "1 min", keep_up_to_date=True)
+        stream = client.stream_bars("AAPL", "1 min")
+        first = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        live.tick(2, 99.0)
+        live.tick(3, 13.0)
+        bar = await asyncio.wait_for(first, timeout=1.0)
+        client.cancel_historical_subscription("AAPL", "1 min")
+        return [bar.close] + [rest.close async for rest in stream]
+
+    assert asyncio.run(scenario()) == [99.0]
+
+
+def test_get_ohlc_data_updates_only_after_changes() -> None:
+    client, ib = _event_client()
+    live = _LiveBars(_bars([datetime(2024, 1, 2, 9, minute) for minute in range(3)]))
+
+    async def request(**kwargs: object) -> _LiveBars:
+        del kwargs
+        return live
+
+    ib.reqHistoricalDataAsync = request  # type: ignore[attr-defined]
+    asyncio.run(
+        client.request_historical_data(
+            client.get_contract("AAPL", 0, "SMART"), "1 D", "1 min", keep_up_to_date=True
+        )
+    )
+    first = client.get_ohlc_data("AAPL", "1 min")
+    assert client.get_ohlc_data("AAPL", "1 min") is first
+
+    live.tick(3, 42.0)
+    frame = client.get_ohlc_data("AAPL", "1 min")
+    assert frame is not first
+    assert frame["close"].iloc[-1] == 42.0
+    pd.testing.assert_frame_equal(frame, client._bars_to_df(live))
+    live.tick(3, 43.0)
+    live.tick(4, 44.0)
+    live.tick(5, 45.0)
+    pd.testing.assert_frame_equal(client.get_ohlc_data("AAPL", "1 min"), client._bars_to_df(live))
+    view = client.bar_view("AAPL", "1 min")
+    assert len(view) == 6
+    assert view.closes[-1] == 45.0
+    assert len(client.bar_view("AAPL", "1 min", include_forming=False)) == 5
+    with pytest.raises(ValueError, match="No keep_up_to_date subscription"):
+        client.bar_view("MSFT", "1 min")
+
+
+def test_contracts_are_qualified_once_and_persisted(tmp_path: Path) -> None:
+    path = tmp_path / "cache" / "contracts.json"
+    client, ib = _event_client(ContractCache(path))
+
+    async def scenario() -> list[Contract]:
+        requests = [
+            client.qualify_contract(client.get_contract("MSFT", 0, "SMART")) for _ in range(5)
+        ]
+        return list(await asyncio.gather(*requests))
+
+    qualified = asyncio.run(scenario())
+    assert ib.qualified == ["MSFT"]
+    assert {contract.conId for contract in qualified} == {1001}
+    asyncio.run(client.send_market_order(client.get_contract("MSFT", 0, "SMART"), "BUY", 2))
+    assert ib.placed[0].contract.conId == 1001
+    assert ib.qualified == ["MSFT"]
+
+    fresh, fresh_ib = _event_client(ContractCache(path))
+    contract = asyncio.run(fresh.qualify_contract(fresh.get_contract("MSFT", 0, "SMART")))
+    assert (contract.conId, contract.primaryExchange, contract.exchange) == (
+        1001,
+        "NASDAQ",
+        "SMART",
+    )
+    assert fresh_ib.qualified == []
+    pinned = fresh.get_contract("IBM", 8314, "SMART")
+    assert asyncio.run(fresh.qualify_contract(pinned)) is pinned
+
+
+def test_unresolvable_contract_raises_and_is_not_cached() -> None:
+    client, ib = _event_client(ContractCache())
+    for _ in range(2):
+        with pytest.raises(ValueError, match="unique contract for STK:AMBIG:SMART:USD"):
+            asyncio.run(client.qualify_contract(client.get_contract("AMBIG", 0, "SMART")))
+    assert ib.qualified == ["AMBIG", "AMBIG"]
+    assert len(client.contracts) == 0